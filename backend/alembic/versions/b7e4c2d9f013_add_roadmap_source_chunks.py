@@ -0,0 +1,39 @@
+"""add_roadmap_source_chunks
+
+Revision ID: b7e4c2d9f013
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4c2d9f013'
+down_revision: Union[str, None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'roadmap_source_chunks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('roadmap_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('term_counts', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['roadmap_id'], ['roadmaps.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_roadmap_source_chunks_id'), 'roadmap_source_chunks', ['id'], unique=False)
+    op.create_index(op.f('ix_roadmap_source_chunks_roadmap_id'), 'roadmap_source_chunks', ['roadmap_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_roadmap_source_chunks_roadmap_id'), table_name='roadmap_source_chunks')
+    op.drop_index(op.f('ix_roadmap_source_chunks_id'), table_name='roadmap_source_chunks')
+    op.drop_table('roadmap_source_chunks')
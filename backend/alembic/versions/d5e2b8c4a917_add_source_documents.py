@@ -0,0 +1,46 @@
+"""add_source_documents
+
+Revision ID: d5e2b8c4a917
+Revises: c3f8a1e5d240
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e2b8c4a917'
+down_revision: Union[str, None] = 'c3f8a1e5d240'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'source_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('extension', sa.String(length=10), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('text_compressed', sa.LargeBinary(), nullable=False),
+        sa.Column('text_length', sa.Integer(), nullable=False),
+        sa.Column('extraction', sa.JSON(), nullable=True),
+        sa.Column('roadmap_id', sa.Integer(), nullable=True),
+        sa.Column('upload_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['roadmap_id'], ['roadmaps.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_source_documents_id'), 'source_documents', ['id'], unique=False)
+    op.create_index(op.f('ix_source_documents_sha256'), 'source_documents', ['sha256'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_source_documents_sha256'), table_name='source_documents')
+    op.drop_index(op.f('ix_source_documents_id'), table_name='source_documents')
+    op.drop_table('source_documents')
@@ -0,0 +1,9 @@
+"""
+Merq backend.
+.env is loaded here, once, before any app module is imported: modules read
+their settings from the environment (os.getenv) at import time.
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
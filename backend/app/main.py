@@ -1,5 +1,9 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
 from app.routers import (
@@ -9,12 +13,33 @@ from app.routers import (
     node_router,
     ai_router,
 )
+from app.services.ai_service import gateway
+from app.services.job_queue import job_workers
+from app.services.model_warmup import model_warmup
+from app.services.semantic_cache import node_content_cache
+from app.utils.metrics import PROMETHEUS_CONTENT_TYPE, registry as metrics_registry
+from app.utils.pdf_extraction import shutdown_pool as shutdown_pdf_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await model_warmup.start()
+    await asyncio.to_thread(node_content_cache.warm)
+    await job_workers.start()
+    yield
+    await job_workers.stop()
+    await model_warmup.stop()
+    shutdown_pdf_pool()
+    # Commit the AI cache's queued disk writes
+    await asyncio.to_thread(gateway.cache.flush)
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Plataforma de roadmaps educativos con IA",
     version=settings.VERSION,
     debug=settings.DEBUG,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -35,3 +60,19 @@ app.include_router(ai_router)
 @app.get("/")
 def health_check():
     return {"status": "ok", "message": "Merq API is running"}
+
+
+@app.get("/ready")
+def readiness_check():
+    """Ready only once the local models are loaded (see OLLAMA_WARMUP_ENABLED)."""
+    warmup = model_warmup.status()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if warmup["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if warmup["ready"] else "warming_up", "models": warmup}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text format: AI latency, tokens, retries, parse failures, fallbacks."""
+    return PlainTextResponse(metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
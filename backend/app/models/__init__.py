@@ -1,5 +1,7 @@
 from app.models.user import User, UserRole
-from app.models.roadmap import Roadmap, RoadmapNode, NodeConnection, NodeLevel
+from app.models.roadmap import Roadmap, RoadmapNode, NodeConnection, NodeLevel, RoadmapSourceChunk
+from app.models.job import GenerationJob, JobStatus
+from app.models.document import SourceDocument
 
 __all__ = [
     "User",
@@ -8,4 +10,8 @@ __all__ = [
     "RoadmapNode",
     "NodeConnection",
     "NodeLevel",
+    "RoadmapSourceChunk",
+    "GenerationJob",
+    "JobStatus",
+    "SourceDocument",
 ]
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class SourceDocument(Base):
+    """Uploaded document deduplicated by the SHA-256 of its bytes (text stored zlib-compressed)."""
+    __tablename__ = "source_documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    filename = Column(String(255))
+    extension = Column(String(10), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    text_compressed = Column(LargeBinary, nullable=False)
+    text_length = Column(Integer, nullable=False)
+    extraction = Column(JSON)
+    roadmap_id = Column(Integer, ForeignKey("roadmaps.id", ondelete="SET NULL"), nullable=True)
+    upload_count = Column(Integer, default=1, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Enum as SQLEnum
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class GenerationJob(Base):
+    """Background AI job (e.g. roadmap generation) shared by all API replicas."""
+    __tablename__ = "generation_jobs"
+
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(SQLEnum(JobStatus), default=JobStatus.QUEUED, nullable=False, index=True)
+    stage = Column(String(50))
+    progress = Column(Integer, default=0, nullable=False)
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON)
+    error = Column(Text)
+    attempts = Column(Integer, default=0, nullable=False)
+    worker_id = Column(String(100))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    started_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
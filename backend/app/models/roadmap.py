@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum as SQLEnum, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum as SQLEnum, DateTime, Boolean, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -24,6 +24,7 @@ class Roadmap(Base):
 
     creator = relationship("User", back_populates="roadmaps")
     nodes = relationship("RoadmapNode", back_populates="roadmap", cascade="all, delete-orphan")
+    source_chunks = relationship("RoadmapSourceChunk", back_populates="roadmap", cascade="all, delete-orphan")
 
 
 class RoadmapNode(Base):
@@ -64,3 +65,16 @@ class NodeConnection(Base):
 
     from_node = relationship("RoadmapNode", foreign_keys=[from_node_id], back_populates="connections_from")
     to_node = relationship("RoadmapNode", foreign_keys=[to_node_id], back_populates="connections_to")
+
+
+class RoadmapSourceChunk(Base):
+    """Chunk of the source document with its term counts (BM25 retrieval)."""
+    __tablename__ = "roadmap_source_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    roadmap_id = Column(Integer, ForeignKey("roadmaps.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    term_counts = Column(JSON, nullable=False)
+
+    roadmap = relationship("Roadmap", back_populates="source_chunks")
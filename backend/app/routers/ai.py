@@ -1,12 +1,39 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, Depends
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, Depends, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
-
-from app.core.database import get_db
-from app.services.ai_service import extract_text_from_pdf, generate_roadmap, generate_node_content, generate_content_summary
-from app.services.roadmap_service import RoadmapService, NodeService
-from app.models import NodeLevel
+import asyncio
+import json
+import time
+import uuid
+
+from app.core.database import get_db, SessionLocal
+from app.services.ai_service import (
+    gateway,
+    parse_stats,
+    aextract_text_from_pdf,
+    build_digest,
+    generate_roadmap,
+    generate_node_content,
+    generate_nodes_content_batch,
+    generate_content_summary,
+    stream_node_content,
+    strip_markdown_fence,
+    MAX_CONTENT_LENGTH,
+)
+from app.services.roadmap_service import RoadmapService, NodeService, SourceChunkService
+from app.services.retrieval import ChunkIndex
+from app.services.semantic_cache import node_content_cache
+from app.services.job_service import JobService
+from app.services.document_service import SourceDocumentService
+from app.services.job_queue import JobContext, UploadTooLarge, job_workers, save_upload, remove_upload
+from app.models import NodeLevel, Roadmap
+from app.utils.timing import stage_timer, timed, log_timing
+from app.utils.file_type import SNIFF_BYTES, detect_mime, matches_extension
+from app.utils.pdf_extraction import format_page_ranges
+from app.utils.text import normalize_text
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
@@ -23,6 +50,18 @@ PADDING = 80
 LEVEL_GAP = 160  # Espacio vertical entre niveles
 
 
+def node_material(chunk_index: ChunkIndex | None, fallback: str, title: str, description: str) -> str:
+    """
+    Material para el prompt de un nodo: los fragmentos del documento más
+    relevantes (BM25) para su título y descripción, o el resumen si no hay índice.
+    """
+    if chunk_index:
+        material = chunk_index.material_for(f"{title} {description}")
+        if material:
+            return material
+    return fallback
+
+
 def calculate_node_positions(nodes_data: list[dict]) -> dict[int, tuple[int, int]]:
     """
     Calcula posiciones óptimas para nodos considerando:
@@ -80,16 +119,250 @@ def calculate_node_positions(nodes_data: list[dict]) -> dict[int, tuple[int, int
     return positions
 
 
-@router.post("/generate-roadmap")
+def build_graph_rows(nodes_data: list[dict]) -> tuple[list[dict], list[tuple[int, int]]]:
+    """
+    Filas de nodos (con posiciones ya calculadas) y conexiones para
+    RoadmapService.create_graph. Las conexiones salen de los prerrequisitos
+    (por "order") y se expresan como índices en la lista de nodos.
+    """
+    node_positions = calculate_node_positions(nodes_data)
+    valid_levels = [l.value for l in NodeLevel]
+
+    rows = []
+    index_by_order = {}
+    for node_data in nodes_data:
+        level_str = node_data.get("level", "beginner")
+        level = NodeLevel(level_str) if level_str in valid_levels else NodeLevel.BEGINNER
+
+        order = node_data.get("order", 0)
+        position_x, position_y = node_positions.get(order, (0, 0))
+
+        index_by_order[order] = len(rows)
+        rows.append({
+            "title": node_data["title"],
+            "description": node_data.get("description"),
+            "level": level,
+            "position_x": position_x,
+            "position_y": position_y,
+            "order_index": order,
+        })
+
+    edges = [
+        (index_by_order[prereq_order], index_by_order[node_data.get("order", 0)])
+        for node_data in nodes_data
+        for prereq_order in node_data.get("prerequisites") or []
+        if prereq_order in index_by_order
+    ]
+    return rows, edges
+
+
+GENERATE_ROADMAP_JOB = "generate_roadmap"
+
+
+async def _extract_upload(payload: dict) -> tuple[str, dict | None]:
+    """Extrae y normaliza el texto del archivo subido. Devuelve (texto, páginas usadas)."""
+    if payload["extension"] != "pdf":
+        with open(payload["upload_path"], "rb") as f:
+            return normalize_text(f.read().decode("utf-8", errors="ignore")), None
+    try:
+        # CPU-bound: pages are extracted in worker processes, which open the
+        # file from its path; only as many as the prompt budget needs
+        extraction = await aextract_text_from_pdf(payload["upload_path"])
+    except Exception as e:
+        raise ValueError(f"Error al procesar el PDF: {str(e)}")
+    source_pages = {
+        "mode": extraction.mode,
+        "used": len(extraction.pages_used),
+        "total": extraction.page_count,
+        "pages": format_page_ranges(extraction.pages_used),
+    }
+    print(f"[AI ROUTER] PDF pages used ({extraction.mode}): {source_pages}", flush=True)
+    return extraction.text, source_pages
+
+
+async def _run_generate_roadmap_job(job: JobContext) -> dict:
+    """
+    Trabajo en segundo plano: extrae el texto del archivo subido, genera el
+    roadmap y el resumen con IA y guarda nodos y conexiones.
+    Si el mismo archivo (mismo SHA-256) ya se subió antes, reutiliza el texto
+    extraído y, con reuse_roadmap, clona el roadmap generado entonces.
+    """
+    payload = job.payload
+    title = payload["title"]
+    filename = payload["filename"]
+    sha256 = payload["sha256"]
+    pipeline_start = time.perf_counter()
+    timings: dict[str, float] = {}
+
+    db = SessionLocal()
+    try:
+        documents = SourceDocumentService(db)
+        document = documents.get_by_hash(sha256)
+        if document:
+            documents.mark_used(document)
+            print(f"[AI ROUTER] Known document {sha256[:12]} (uploads: {document.upload_count})", flush=True)
+
+        if document and document.roadmap_id and payload.get("reuse_roadmap"):
+            await job.report("clone", 50)
+            with stage_timer("clone", timings):
+                cloned = RoadmapService(db).clone(document.roadmap_id, title, payload["creator_id"])
+            if cloned:
+                timings["total"] = round((time.perf_counter() - pipeline_start) * 1000, 1)
+                log_timing(f"generate-roadmap pipeline (clone of {document.roadmap_id}): {timings}")
+                return {
+                    "roadmap_id": cloned.id,
+                    "title": cloned.title,
+                    "nodes_count": len(cloned.nodes),
+                    "message": "Roadmap creado a partir de un documento ya procesado",
+                    "source_pages": document.extraction,
+                    "reused_from": document.roadmap_id,
+                    "deduplicated": True,
+                    "timings_ms": timings
+                }
+
+        if document:
+            text_content = documents.get_text(document)
+            source_pages = document.extraction
+            document_id = document.id
+        else:
+            document_id = None
+    finally:
+        db.close()
+
+    deduplicated = document_id is not None
+    if not deduplicated:
+        if not payload.get("upload_path"):
+            raise ValueError("El documento ya no está disponible. Vuelve a subir el archivo.")
+        await job.report("extract", 10)
+        with stage_timer("extract", timings):
+            text_content, source_pages = await _extract_upload(payload)
+
+    if len(text_content.strip()) < 100:
+        raise ValueError(
+            "El contenido extraído es muy corto. Asegúrate de que el archivo tenga texto legible."
+        )
+
+    if not deduplicated:
+        db = SessionLocal()
+        try:
+            document_id = SourceDocumentService(db).create(
+                sha256=sha256,
+                filename=filename,
+                extension=payload["extension"],
+                size_bytes=payload["size_bytes"],
+                text=text_content,
+                extraction=source_pages
+            ).id
+        finally:
+            db.close()
+
+    # Documentos largos: resumen por partes (map-reduce) para que todo el
+    # documento influya en el roadmap, no solo los primeros caracteres
+    ai_content = text_content
+    if len(text_content) > MAX_CONTENT_LENGTH:
+        await job.report("digest", 20)
+        with stage_timer("digest", timings):
+            ai_content = await build_digest(text_content, title)
+
+    # Roadmap y resumen en paralelo: el resumen no depende de los nodos generados
+    await job.report("ai", 40)
+    with stage_timer("ai", timings):
+        roadmap_result, summary_result = await asyncio.gather(
+            timed("ai_roadmap", generate_roadmap(ai_content, title), timings),
+            timed("ai_summary", generate_content_summary(content=ai_content, roadmap_title=title), timings),
+            return_exceptions=True
+        )
+
+    if isinstance(roadmap_result, ValueError):
+        raise roadmap_result
+    if isinstance(roadmap_result, Exception):
+        raise RuntimeError(f"Error al generar el roadmap con IA: {str(roadmap_result)}")
+    roadmap_data = roadmap_result
+
+    if isinstance(summary_result, Exception):
+        content_summary = text_content[:2500] + "..." if len(text_content) > 2500 else text_content
+    else:
+        content_summary = summary_result
+
+    await job.report("persist", 85)
+    persist_start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        nodes_data = roadmap_data.get("nodes", [])
+        node_rows, edges = build_graph_rows(nodes_data)
+
+        # Roadmap, nodos, conexiones e índice de fragmentos (para recuperar
+        # material relevante por nodo) en una sola transacción
+        roadmap = RoadmapService(db).create_graph(
+            Roadmap(
+                title=title,
+                description=roadmap_data.get("description", f"Roadmap generado a partir de {filename}"),
+                source_content=content_summary,
+                creator_id=payload["creator_id"]
+            ),
+            node_rows,
+            edges,
+            source_text=text_content
+        )
+
+        # Próximas subidas del mismo archivo pueden clonar este roadmap
+        documents = SourceDocumentService(db)
+        document = documents.get_by_id(document_id)
+        if document:
+            documents.set_roadmap(document, roadmap.id)
+
+        roadmap_id = roadmap.id
+        roadmap_title = roadmap.title
+    finally:
+        db.close()
+
+    timings["persist"] = round((time.perf_counter() - persist_start) * 1000, 1)
+    timings["total"] = round((time.perf_counter() - pipeline_start) * 1000, 1)
+    log_timing(f"generate-roadmap pipeline: {timings}")
+
+    return {
+        "roadmap_id": roadmap_id,
+        "title": roadmap_title,
+        "nodes_count": len(nodes_data),
+        "message": "Roadmap creado exitosamente",
+        "source_pages": source_pages,
+        "deduplicated": deduplicated,
+        "timings_ms": timings
+    }
+
+
+job_workers.register(GENERATE_ROADMAP_JOB, _run_generate_roadmap_job)
+
+
+def _job_response(job) -> dict:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status.value,
+        "stage": job.stage,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+@router.post("/generate-roadmap", status_code=status.HTTP_202_ACCEPTED)
 async def generate_roadmap_from_file(
     file: UploadFile = File(...),
     title: str = Form(...),
     creator_id: int = Form(...),
+    reuse_roadmap: bool = Form(True),
     db: Session = Depends(get_db)
 ):
     """
-    Recibe un PDF o TXT, extrae el contenido y genera un roadmap de aprendizaje
-    con nodos organizados por niveles y conexiones entre ellos.
+    Recibe un PDF o TXT y encola la generación del roadmap de aprendizaje.
+    Responde 202 con el id del trabajo; el progreso se consulta en GET /ai/jobs/{job_id}.
+    Un archivo ya subido antes (mismo contenido) no se vuelve a extraer y, con
+    reuse_roadmap, se clona el roadmap que se generó a partir de él.
     """
     extension = file.filename.split(".")[-1].lower() if file.filename else ""
     if extension not in ALLOWED_EXTENSIONS:
@@ -98,108 +371,72 @@ async def generate_roadmap_from_file(
             detail=f"Tipo de archivo no permitido. Use: {', '.join(ALLOWED_EXTENSIONS)}"
         )
 
-    file_content = await file.read()
-    if len(file_content) > MAX_FILE_SIZE:
+    # El tipo se comprueba por los primeros bytes, no solo por la extensión
+    head = await file.read(SNIFF_BYTES)
+    await file.seek(0)
+    if not matches_extension(detect_mime(head), extension):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="El archivo excede el tamaño máximo de 10MB"
-        )
-
-    if extension == "pdf":
-        try:
-            text_content = extract_text_from_pdf(file_content)
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Error al procesar el PDF: {str(e)}"
-            )
-    else:
-        text_content = file_content.decode("utf-8", errors="ignore")
-
-    if len(text_content.strip()) < 100:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="El contenido extraído es muy corto. Asegúrate de que el archivo tenga texto legible."
+            detail=f"El contenido del archivo no corresponde a un .{extension}"
         )
 
+    # Copia por bloques (hash y límite de tamaño sobre la marcha), sin cargar el archivo en memoria
+    job_id = str(uuid.uuid4())
     try:
-        roadmap_data = generate_roadmap(text_content, title)
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+        upload_path, size_bytes, sha256 = await run_in_threadpool(
+            save_upload, job_id, extension, file.file, MAX_FILE_SIZE
         )
-    except Exception as e:
+    except UploadTooLarge:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al generar el roadmap con IA: {str(e)}"
-        )
-
-    roadmap_service = RoadmapService(db)
-    node_service = NodeService(db)
-
-    nodes_data = roadmap_data.get("nodes", [])
-    
-    # Generar resumen del contenido
-    try:
-        content_summary = generate_content_summary(
-            content=text_content,
-            roadmap_title=title,
-            nodes_info=nodes_data
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El archivo excede el tamaño máximo de 10MB"
         )
-    except Exception:
-        content_summary = text_content[:2500] + "..." if len(text_content) > 2500 else text_content
 
-    roadmap = roadmap_service.create(
-        title=title,
-        description=roadmap_data.get("description", f"Roadmap generado a partir de {file.filename}"),
-        source_content=content_summary,
-        creator_id=creator_id
+    known_document = SourceDocumentService(db).get_by_hash(sha256) is not None
+    # El texto de un documento conocido ya está guardado: no hace falta el archivo
+    if known_document:
+        await run_in_threadpool(remove_upload, upload_path)
+        upload_path = None
+
+    job = JobService(db).create(
+        job_id=job_id,
+        kind=GENERATE_ROADMAP_JOB,
+        payload={
+            "title": title,
+            "creator_id": creator_id,
+            "filename": file.filename,
+            "extension": extension,
+            "upload_path": upload_path,
+            "size_bytes": size_bytes,
+            "sha256": sha256,
+            "reuse_roadmap": reuse_roadmap,
+        }
     )
-
-    # Calcular posiciones con el nuevo algoritmo
-    node_positions = calculate_node_positions(nodes_data)
-    
-    created_nodes = {}
-    for node_data in nodes_data:
-        level_str = node_data.get("level", "beginner")
-        level = NodeLevel(level_str) if level_str in [l.value for l in NodeLevel] else NodeLevel.BEGINNER
-        
-        order = node_data.get("order", 0)
-        position_x, position_y = node_positions.get(order, (0, 0))
-
-        node = node_service.create(
-            roadmap_id=roadmap.id,
-            title=node_data["title"],
-            description=node_data.get("description"),
-            level=level,
-            position_x=position_x,
-            position_y=position_y,
-            order_index=order
-        )
-        created_nodes[order] = node
-
-    # Crear conexiones
-    for node_data in nodes_data:
-        node_order = node_data.get("order", 0)
-        prerequisites = node_data.get("prerequisites", [])
-        
-        if node_order in created_nodes:
-            for prereq_order in prerequisites:
-                if prereq_order in created_nodes:
-                    node_service.create_connection(
-                        from_node_id=created_nodes[prereq_order].id,
-                        to_node_id=created_nodes[node_order].id
-                    )
+    job_workers.notify()
 
     return {
-        "roadmap_id": roadmap.id,
-        "title": roadmap.title,
-        "nodes_count": len(nodes_data),
-        "message": "Roadmap creado exitosamente"
+        "job_id": job.id,
+        "status": job.status.value,
+        "status_url": f"/ai/jobs/{job.id}",
+        "deduplicated": known_document,
+        "message": "Generación del roadmap en cola"
     }
 
 
+@router.get("/jobs/{job_id}")
+def get_job_status(job_id: str, db: Session = Depends(get_db)):
+    """
+    Estado de un trabajo en segundo plano: etapa, progreso y resultado.
+    """
+    job = JobService(db).get_by_id(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trabajo no encontrado"
+        )
+    return _job_response(job)
+
+
 @router.post("/nodes/{node_id}/generate-content")
 async def generate_node_content_endpoint(
     node_id: int,
@@ -225,9 +462,16 @@ async def generate_node_content_endpoint(
             detail="El roadmap no tiene contenido fuente para generar"
         )
 
+    material = node_material(
+        SourceChunkService(db).get_index(roadmap.id),
+        roadmap.source_content,
+        node.title,
+        node.description or ""
+    )
+
     try:
-        content_data = generate_node_content(
-            source_content=roadmap.source_content,
+        content_data = await generate_node_content(
+            source_content=material,
             node_title=node.title,
             node_description=node.description or ""
         )
@@ -246,6 +490,193 @@ async def generate_node_content_endpoint(
     }
 
 
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/nodes/{node_id}/generate-content/stream")
+async def stream_node_content_endpoint(
+    node_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Genera el contenido de un nodo y lo envía token a token (Server-Sent Events).
+    Eventos: `token` ({"text"}), `done` ({"node_id"}), `error` ({"detail"}).
+    El texto completo se guarda en el nodo al terminar.
+    """
+    node_service = NodeService(db)
+    roadmap_service = RoadmapService(db)
+
+    node = node_service.get_by_id(node_id)
+    if not node:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nodo no encontrado")
+
+    existing_content = node.content
+    node_title = node.title
+    node_description = node.description or ""
+
+    roadmap = roadmap_service.get_by_id(node.roadmap_id)
+    if not existing_content and (not roadmap or not roadmap.source_content):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El roadmap no tiene contenido fuente para generar"
+        )
+    source_content = ""
+    if not existing_content:
+        source_content = node_material(
+            SourceChunkService(db).get_index(roadmap.id),
+            roadmap.source_content,
+            node_title,
+            node_description
+        )
+
+    async def event_stream():
+        if existing_content:
+            yield _sse_event("token", {"text": existing_content})
+            yield _sse_event("done", {"node_id": node_id})
+            return
+
+        parts = []
+        try:
+            async for token in stream_node_content(source_content, node_title, node_description):
+                parts.append(token)
+                yield _sse_event("token", {"text": token})
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error al generar contenido: {str(e)}"})
+            return
+
+        # Sesión propia: la del request puede cerrarse antes de terminar el stream
+        stream_db = SessionLocal()
+        try:
+            NodeService(stream_db).update(node_id, content=strip_markdown_fence("".join(parts)))
+        finally:
+            stream_db.close()
+        yield _sse_event("done", {"node_id": node_id})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Roadmaps con generación masiva en curso (evita lanzar dos veces el mismo trabajo)
+_bulk_generation_in_progress: set[int] = set()
+
+
+async def _generate_all_content_task(roadmap_id: int, source_content: str, nodes: list[dict]):
+    """
+    Tarea en segundo plano: genera el contenido de todos los nodos pendientes
+    y guarda cada resultado en cuanto termina.
+    """
+    db = SessionLocal()
+    node_service = NodeService(db)
+    generated = 0
+    try:
+        async for node_id, content_data, error in generate_nodes_content_batch(source_content, nodes):
+            if error is not None:
+                print(f"[AI ROUTER] Node {node_id} content failed: {error}", flush=True)
+                continue
+            node_service.update(node_id, content=content_data.get("content", ""))
+            generated += 1
+        print(f"[AI ROUTER] Roadmap {roadmap_id}: {generated}/{len(nodes)} nodes generated", flush=True)
+    finally:
+        _bulk_generation_in_progress.discard(roadmap_id)
+        db.close()
+
+
+@router.post("/{roadmap_id}/generate-all-content", status_code=status.HTTP_202_ACCEPTED)
+async def generate_all_content_endpoint(
+    roadmap_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Genera en segundo plano el contenido de todos los nodos sin contenido,
+    varios nodos por llamada (AI_CONTENT_BATCH_*) y con concurrencia limitada
+    (AI_CONTENT_CONCURRENCY).
+    """
+    roadmap_service = RoadmapService(db)
+    node_service = NodeService(db)
+
+    roadmap = roadmap_service.get_by_id(roadmap_id)
+    if not roadmap:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Roadmap no encontrado")
+
+    if not roadmap.source_content:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El roadmap no tiene contenido fuente para generar"
+        )
+
+    if roadmap_id in _bulk_generation_in_progress:
+        return {"message": "La generación de contenido ya está en curso", "roadmap_id": roadmap_id}
+
+    chunk_index = SourceChunkService(db).get_index(roadmap_id)
+    pending_nodes = [
+        {
+            "id": node.id,
+            "title": node.title,
+            "description": node.description,
+            "material": node_material(chunk_index, roadmap.source_content, node.title, node.description or ""),
+        }
+        for node in node_service.get_by_roadmap(roadmap_id)
+        if not node.content
+    ]
+    if not pending_nodes:
+        return {"message": "Todos los nodos ya tienen contenido", "roadmap_id": roadmap_id, "nodes_pending": 0}
+
+    _bulk_generation_in_progress.add(roadmap_id)
+    background_tasks.add_task(_generate_all_content_task, roadmap_id, roadmap.source_content, pending_nodes)
+
+    return {
+        "message": "Generación de contenido iniciada",
+        "roadmap_id": roadmap_id,
+        "nodes_pending": len(pending_nodes)
+    }
+
+
+@router.get("/providers/health")
+def get_providers_health():
+    """
+    Estado de los proveedores de IA (circuit breaker: closed, open, half_open).
+    """
+    return gateway.health()
+
+
+@router.get("/providers/hedging")
+def get_hedging_stats():
+    """
+    Estadísticas de hedging: cuántas veces se lanzó la petición secundaria y cuántas ganó.
+    """
+    primary = gateway.gemini.name if gateway.gemini.is_available else gateway.ollama.name
+    return gateway.hedging.stats(primary=primary)
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """
+    Estadísticas de la caché de respuestas de IA (aciertos, fallos, desalojos).
+    """
+    return gateway.cache.stats()
+
+
+@router.get("/cache/semantic-stats")
+def get_semantic_cache_stats():
+    """
+    Estadísticas de la caché semántica de contenido de nodos (servidos, borradores, fallos).
+    """
+    return node_content_cache.stats()
+
+
+@router.get("/providers/parse-stats")
+def get_parse_stats():
+    """
+    Tasa de respuestas JSON que no se pudieron parsear, por proveedor.
+    """
+    return parse_stats.stats()
+
+
 @router.post("/{roadmap_id}/auto-layout")
 async def auto_layout_roadmap(
     roadmap_id: int,
@@ -340,7 +771,6 @@ async def import_roadmap_from_json(
     - Cada nivel (beginner, intermediate, advanced) debe tener entre 2 y 8 nodos
     """
     roadmap_service = RoadmapService(db)
-    node_service = NodeService(db)
 
     if not request.data.nodes:
         raise HTTPException(
@@ -374,45 +804,18 @@ async def import_roadmap_from_json(
                 detail=f"El nivel '{level}' tiene {count} nodos. Se permiten máximo {MAX_NODES_PER_LEVEL} nodos por nivel."
             )
 
-    roadmap = roadmap_service.create(
-        title=request.title,
-        description=request.data.description or f"Roadmap importado: {request.title}",
-        source_content=None,
-        creator_id=request.creator_id
+    node_rows, edges = build_graph_rows([node.model_dump() for node in request.data.nodes])
+    roadmap = roadmap_service.create_graph(
+        Roadmap(
+            title=request.title,
+            description=request.data.description or f"Roadmap importado: {request.title}",
+            source_content=None,
+            creator_id=request.creator_id
+        ),
+        node_rows,
+        edges
     )
 
-    # Preparar datos para calcular posiciones
-    nodes_dict_list = [
-        {"order": n.order, "level": n.level, "title": n.title}
-        for n in request.data.nodes
-    ]
-    node_positions = calculate_node_positions(nodes_dict_list)
-
-    created_nodes = {}
-    for node_data in request.data.nodes:
-        level = NodeLevel(node_data.level)
-        position_x, position_y = node_positions.get(node_data.order, (0, 0))
-
-        node = node_service.create(
-            roadmap_id=roadmap.id,
-            title=node_data.title,
-            description=node_data.description,
-            level=level,
-            position_x=position_x,
-            position_y=position_y,
-            order_index=node_data.order
-        )
-        created_nodes[node_data.order] = node
-
-    for node_data in request.data.nodes:
-        if node_data.order in created_nodes:
-            for prereq_order in node_data.prerequisites:
-                if prereq_order in created_nodes:
-                    node_service.create_connection(
-                        from_node_id=created_nodes[prereq_order].id,
-                        to_node_id=created_nodes[node_data.order].id
-                    )
-
     return {
         "roadmap_id": roadmap.id,
         "title": roadmap.title,
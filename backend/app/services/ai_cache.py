@@ -0,0 +1,275 @@
+"""
+AI Response Cache
+Content-addressed cache for LLM responses.
+- Key: provider + model + json_mode + prompt hash (+ response schema)
+- Tier 1: in-process LRU (OrderedDict)
+- Tier 2: persistent SQLite store under AI_CACHE_DIR
+Both tiers honour the same TTL; each tier has its own size limit.
+Disk writes are write-behind: a background thread applies them in batches
+(one commit per batch), so callers never wait on SQLite. Async callers read
+the disk tier through aget(), off the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+AI_CACHE_DIR = os.getenv("AI_CACHE_DIR", ".cache/ai")
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "256"))
+AI_CACHE_DISK_MAX_ENTRIES = int(os.getenv("AI_CACHE_DISK_MAX_ENTRIES", "5000"))
+AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", "86400"))
+# Expired disk rows are swept at most this often (reads also skip them)
+DISK_SWEEP_INTERVAL_SECONDS = 60
+
+
+def log_cache(msg):
+    print(f"[AI CACHE] {msg}", flush=True)
+
+
+def make_cache_key(provider: str, model: str, json_mode: bool, prompt: str, schema: dict | None = None) -> str:
+    """Build a content-addressed key for a prompt sent to a given provider/model."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    raw = f"{provider}|{model}|{int(json_mode)}|{prompt_hash}"
+    if schema:
+        raw += "|" + json.dumps(schema, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AIResponseCache:
+    """Two-tier (memory LRU + SQLite) cache with TTL and size eviction."""
+
+    def __init__(
+        self,
+        enabled: bool = AI_CACHE_ENABLED,
+        cache_dir: str | None = AI_CACHE_DIR,
+        max_entries: int = AI_CACHE_MAX_ENTRIES,
+        disk_max_entries: int = AI_CACHE_DISK_MAX_ENTRIES,
+        ttl_seconds: int = AI_CACHE_TTL_SECONDS,
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Guards the connection; never held by the memory tier
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._disk_rows = 0
+        self._last_sweep = 0.0
+        self._writes: queue.Queue = queue.Queue()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0,
+        }
+
+        if enabled and cache_dir:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                self._conn = sqlite3.connect(
+                    os.path.join(cache_dir, "responses.sqlite3"),
+                    check_same_thread=False
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS ix_responses_last_access ON responses (last_access)"
+                )
+                self._conn.commit()
+                self._disk_rows = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                threading.Thread(target=self._write_loop, name="ai-cache-writer", daemon=True).start()
+                log_cache(f"Disk tier enabled ({cache_dir})")
+            except Exception as e:
+                self._conn = None
+                log_cache(f"Disk tier disabled: {e}")
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, value: str):
+        """Insert into the memory tier, evicting least recently used entries."""
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def _memory_get(self, key: str, now: float) -> str | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                created_at, value = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self._stats["expired"] += 1
+            return None
+
+    def _disk_get(self, key: str, now: float) -> str | None:
+        """Blocking disk tier lookup; the last-access update is queued."""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        with self._lock:
+            if row:
+                value, created_at = row
+                if not self._is_expired(created_at, now):
+                    self._writes.put(("touch", key, now))
+                    self._remember(key, created_at, value)
+                    self._stats["disk_hits"] += 1
+                    return value
+                self._writes.put(("delete", key))
+                self._stats["expired"] += 1
+            return None
+
+    def _miss(self) -> None:
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def get(self, key: str) -> str | None:
+        """Blocking lookup; use aget() from async code."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is None and self._conn is not None:
+            value = self._disk_get(key, now)
+        return value if value is not None else self._miss()
+
+    async def aget(self, key: str) -> str | None:
+        """Async lookup: the disk tier is read in a worker thread."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is None and self._conn is not None:
+            value = await asyncio.to_thread(self._disk_get, key, now)
+        return value if value is not None else self._miss()
+
+    def set(self, key: str, value: str):
+        if not self.enabled or not value:
+            return
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] == value:
+                # Re-storing a value just served from the cache
+                self._memory.move_to_end(key)
+                return
+            self._remember(key, now, value)
+            self._stats["writes"] += 1
+
+        if self._conn is not None:
+            self._writes.put(("put", key, value, now))
+
+    def _write_loop(self):
+        """Writer thread: apply queued disk writes in batches, one commit each."""
+        while True:
+            batch = [self._writes.get()]
+            while True:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._db_lock:
+                    for op in batch:
+                        self._apply(op)
+                    self._evict_disk(time.time())
+                    self._conn.commit()
+            except Exception as e:
+                log_cache(f"Disk write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+
+    def _apply(self, op: tuple):
+        kind = op[0]
+        if kind == "put":
+            _, key, value, now = op
+            cursor = self._conn.execute(
+                "UPDATE responses SET value = ?, created_at = ?, last_access = ? WHERE key = ?",
+                (value, now, now, key)
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO responses (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+                self._disk_rows += 1
+        elif kind == "touch":
+            _, key, now = op
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        elif kind == "delete":
+            cursor = self._conn.execute("DELETE FROM responses WHERE key = ?", (op[1],))
+            self._disk_rows -= max(cursor.rowcount, 0)
+        elif kind == "clear":
+            self._conn.execute("DELETE FROM responses")
+            self._disk_rows = 0
+
+    def _evict_disk(self, now: float):
+        """Drop expired rows (periodically), then least recently used rows above the size limit."""
+        if self.ttl_seconds > 0 and now - self._last_sweep > DISK_SWEEP_INTERVAL_SECONDS:
+            self._last_sweep = now
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            removed = max(cursor.rowcount, 0)
+            self._disk_rows -= removed
+            self._stats["disk_evictions"] += removed
+
+        overflow = self._disk_rows - self.disk_max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            removed = max(cursor.rowcount, 0)
+            self._disk_rows -= removed
+            self._stats["disk_evictions"] += removed
+
+    def flush(self):
+        """Block until every queued disk write is committed."""
+        if self._conn is not None:
+            self._writes.join()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._conn is not None:
+            self._writes.put(("clear",))
+            self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                "enabled": self.enabled,
+                **self._stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_rows,
+                "pending_disk_writes": self._writes.qsize(),
+            }
@@ -0,0 +1,155 @@
+"""
+AI Metrics
+Instrumentation of the AI layer, exposed at GET /metrics.
+- Latency histogram and request count per provider/model/task/outcome
+- Prompt and completion tokens as reported by the provider, prompt tokens
+  served from a provider-side cache, and prompt evaluation time (Ollama)
+- Retries, JSON parse failures, provider fallbacks, limiter rejections
+  and cache hits
+The task label (roadmap, summary, node_content...) is carried in a
+contextvar set by ai_service, so the gateway and providers need no extra
+arguments; asyncio tasks inherit it when they are created.
+"""
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.utils.metrics import registry
+
+_current_task: ContextVar[str] = ContextVar("ai_task", default="other")
+
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+REQUEST_SECONDS = registry.histogram(
+    "merq_ai_request_duration_seconds",
+    "Latency of LLM provider calls.",
+    ("provider", "model", "task", "outcome"),
+    buckets=LATENCY_BUCKETS
+)
+PROMPT_TOKENS = registry.counter(
+    "merq_ai_prompt_tokens_total",
+    "Prompt tokens reported by the provider.",
+    ("provider", "model", "task")
+)
+COMPLETION_TOKENS = registry.counter(
+    "merq_ai_completion_tokens_total",
+    "Completion tokens reported by the provider.",
+    ("provider", "model", "task")
+)
+CACHED_PROMPT_TOKENS = registry.counter(
+    "merq_ai_cached_prompt_tokens_total",
+    "Prompt tokens served from the provider's context cache (Gemini cached content).",
+    ("provider", "model", "task")
+)
+PROMPT_EVAL_SECONDS = registry.histogram(
+    "merq_ai_prompt_eval_seconds",
+    "Time the provider spent evaluating the prompt (drops when a shared prefix is reused).",
+    ("provider", "model", "task"),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+RETRIES = registry.counter(
+    "merq_ai_retries_total",
+    "Extra attempts made by the JSON retry loop.",
+    ("task",)
+)
+PARSE_FAILURES = registry.counter(
+    "merq_ai_json_parse_failures_total",
+    "JSON-mode responses that could not be parsed.",
+    ("provider", "task")
+)
+FALLBACKS = registry.counter(
+    "merq_ai_fallbacks_total",
+    "Calls that failed on a provider and moved on to the next one.",
+    ("provider", "task")
+)
+LIMITER_REJECTIONS = registry.counter(
+    "merq_ai_limiter_rejections_total",
+    "Calls rejected by the provider's adaptive concurrency limiter.",
+    ("provider", "task")
+)
+SEMANTIC_CACHE = registry.counter(
+    "merq_ai_semantic_cache_lookups_total",
+    "Node content semantic cache lookups by result (hit, draft, miss).",
+    ("result",)
+)
+CACHE_HITS = registry.counter(
+    "merq_ai_cache_hits_total",
+    "Responses served from the AI response cache.",
+    ("provider", "task")
+)
+
+
+def current_task() -> str:
+    return _current_task.get()
+
+
+@contextmanager
+def ai_task(name: str):
+    """Label every AI call made inside the block (and tasks spawned from it)."""
+    token = _current_task.set(name)
+    try:
+        yield
+    finally:
+        _current_task.reset(token)
+
+
+def labelled(name: str):
+    """Decorator: run a coroutine function inside ai_task(name)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with ai_task(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe_request(provider: str, model: str, seconds: float, ok: bool):
+    REQUEST_SECONDS.observe(
+        seconds, provider=provider, model=model, task=current_task(), outcome="success" if ok else "error"
+    )
+
+
+def record_tokens(
+    provider: str,
+    model: str,
+    prompt_tokens: int | None,
+    completion_tokens: int | None,
+    cached_tokens: int | None = None
+):
+    if prompt_tokens:
+        PROMPT_TOKENS.inc(prompt_tokens, provider=provider, model=model, task=current_task())
+    if completion_tokens:
+        COMPLETION_TOKENS.inc(completion_tokens, provider=provider, model=model, task=current_task())
+    if cached_tokens:
+        CACHED_PROMPT_TOKENS.inc(cached_tokens, provider=provider, model=model, task=current_task())
+
+
+def observe_prompt_eval(provider: str, model: str, seconds: float | None):
+    if seconds is not None:
+        PROMPT_EVAL_SECONDS.observe(seconds, provider=provider, model=model, task=current_task())
+
+
+def record_retry():
+    RETRIES.inc(task=current_task())
+
+
+def record_parse_failure(provider: str):
+    PARSE_FAILURES.inc(provider=provider, task=current_task())
+
+
+def record_fallback(provider: str):
+    FALLBACKS.inc(provider=provider, task=current_task())
+
+
+def record_limiter_rejection(provider: str):
+    LIMITER_REJECTIONS.inc(provider=provider, task=current_task())
+
+
+def record_semantic_lookup(result: str):
+    SEMANTIC_CACHE.inc(result=result)
+
+
+def record_cache_hit(provider: str):
+    CACHE_HITS.inc(provider=provider, task=current_task())
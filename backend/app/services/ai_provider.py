@@ -3,24 +3,110 @@ AI Provider Module
 Handles connections to different AI backends (Gemini, Ollama).
 """
 
+import asyncio
+import copy
+import hashlib
 import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from dotenv import load_dotenv
-from ollama import Client
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import AsyncIterator
+from ollama import AsyncClient
 
-# Force load .env
-load_dotenv()
+from . import ai_metrics
+from .ai_cache import AIResponseCache, make_cache_key
+from .circuit_breaker import CircuitBreaker
+from .concurrency_limiter import AI_LIMITER_QUEUE_TIMEOUT_SECONDS, AdaptiveLimiter, LimiterRejected
+from .hedging import HedgingPolicy, LatencyTracker
+
+# Replace Gemini/Ollama with the deterministic FakeProvider (load tests)
+AI_FAKE_PROVIDER = os.getenv("AI_FAKE_PROVIDER", "false").lower() == "true"
+
+# Max time a background recovery probe may take
+AI_BREAKER_PROBE_TIMEOUT = float(os.getenv("AI_BREAKER_PROBE_TIMEOUT", "15"))
+AI_BREAKER_PROBE_PROMPT = "Responde solo: ok"
+
+# Gemini context caching of long shared prompt prefixes (see shared_prefix()).
+# The API rejects caches below a minimum size, so shorter prefixes are sent
+# inline. Node material is at most MAX_CONTENT_LENGTH (25k chars, ~6k tokens):
+# 1.5 models (32k token minimum) never cache it, 2.x models (1k-4k) do.
+# Unset = the minimum for GEMINI_MODEL's family.
+GEMINI_CACHE_ENABLED = os.getenv("GEMINI_CACHE_ENABLED", "true").lower() == "true"
+GEMINI_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_CACHE_MIN_TOKENS", "0"))
+GEMINI_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CACHE_TTL_SECONDS", "900"))
+# Longest wait for a context cache another call is creating before sending inline
+GEMINI_CACHE_CREATE_WAIT_SECONDS = 30
+# Ollama context window; unset keeps the model default (too small for long material)
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "0"))
+
+# Prompt head shared by a series of calls (e.g. the roadmap material)
+_shared_prefix: ContextVar[str | None] = ContextVar("ai_shared_prefix", default=None)
 
 # Logger setup
 def log_provider(msg):
     print(f"[AI PROVIDER] {msg}", flush=True)
 
+
+@contextmanager
+def shared_prefix(prefix: str):
+    """
+    Declare that prompts sent inside the block start with `prefix`, which
+    other calls will repeat. Gemini caches a long enough prefix server-side
+    and only sends the rest; Ollama reuses it from its KV cache as long as
+    it is the literal start of the prompt and the model stays loaded.
+    """
+    token = _shared_prefix.set(prefix)
+    try:
+        yield
+    finally:
+        _shared_prefix.reset(token)
+
+
+def _gemini_usage(response) -> tuple[int | None, int | None, int | None]:
+    usage = getattr(response, "usage_metadata", None)
+    return (
+        getattr(usage, "prompt_token_count", None),
+        getattr(usage, "candidates_token_count", None),
+        getattr(usage, "cached_content_token_count", None),
+    )
+
+
+def _gemini_chunk_text(chunk) -> str:
+    """
+    Text of a streamed Gemini chunk. Chunks without parts (e.g. one carrying
+    only the finish reason or usage) have none: chunk.text raises on them.
+    """
+    candidates = chunk.candidates
+    if not candidates or not candidates[0].content.parts:
+        return ""
+    return chunk.text
+
+
+def _ollama_usage(response) -> tuple[int | None, int | None]:
+    return getattr(response, "prompt_eval_count", None), getattr(response, "eval_count", None)
+
+
+def _ollama_prompt_eval_seconds(response) -> float | None:
+    duration = getattr(response, "prompt_eval_duration", None)
+    return duration / 1e9 if duration else None
+
 class AIProvider(ABC):
     """Abstract base class for AI providers."""
     
     @abstractmethod
-    def generate(self, prompt: str, json_mode: bool = False) -> str:
-        """Generate content from the provider."""
+    async def agenerate(self, prompt: str, json_mode: bool = False, schema: dict | None = None) -> str:
+        """
+        Generate content without blocking the event loop.
+        json_mode forces JSON output; schema (JSON Schema) constrains its shape.
+        """
+        pass
+
+    @abstractmethod
+    def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream plain-text content as it is generated."""
         pass
 
     @property
@@ -29,6 +115,12 @@ class AIProvider(ABC):
         """Provider name."""
         pass
 
+    @property
+    @abstractmethod
+    def model(self) -> str:
+        """Model name used by the provider."""
+        pass
+
     @property
     @abstractmethod
     def is_available(self) -> bool:
@@ -43,12 +135,22 @@ class GeminiProvider(AIProvider):
         self._api_key = os.getenv("GEMINI_API_KEY", "")
         self._model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
         self._client = None
+        self._genai = None
         self._available = False
+        # sha256(prefix) -> (model bound to the cached content or None if caching failed, expiry)
+        self._prefix_models: dict[str, tuple[object | None, float]] = {}
+        # sha256(prefix) -> set once the call creating that cache is done
+        self._prefix_pending: dict[str, threading.Event] = {}
+        self._prefix_lock = threading.Lock()
+        self._cache_min_tokens = GEMINI_CACHE_MIN_TOKENS or (
+            32768 if self._model_name.startswith("gemini-1.") else 4096
+        )
         
         if self._api_key:
             try:
                 import google.generativeai as genai
                 genai.configure(api_key=self._api_key)
+                self._genai = genai
                 self._client = genai.GenerativeModel(self._model_name)
                 self._available = True
                 log_provider(f"Gemini initialized ({self._model_name})")
@@ -63,14 +165,15 @@ class GeminiProvider(AIProvider):
     def name(self) -> str:
         return "Gemini"
 
+    @property
+    def model(self) -> str:
+        return self._model_name
+
     @property
     def is_available(self) -> bool:
         return self._available and self._client is not None
 
-    def generate(self, prompt: str, json_mode: bool = False) -> str:
-        if not self.is_available:
-            raise ConnectionError("Gemini is not available")
-            
+    def _generation_config(self, json_mode: bool, schema: dict | None = None) -> dict:
         generation_config = {
             "temperature": 0.7,
             "max_output_tokens": 4096,
@@ -78,13 +181,119 @@ class GeminiProvider(AIProvider):
         
         if json_mode:
             generation_config["response_mime_type"] = "application/json"
-            
-        response = self._client.generate_content(
+            if schema:
+                # The SDK rewrites the schema in place when converting it
+                generation_config["response_schema"] = copy.deepcopy(schema)
+        
+        return generation_config
+
+    def _cacheable_prefix(self, prompt: str) -> str | None:
+        """The shared prefix of `prompt`, if it is worth a Gemini context cache (~4 chars per token)."""
+        prefix = _shared_prefix.get()
+        if not GEMINI_CACHE_ENABLED or not prefix or not prompt.startswith(prefix):
+            return None
+        return prefix if len(prefix) // 4 >= self._cache_min_tokens else None
+
+    def _create_prefix_model(self, prefix: str):
+        try:
+            cached = self._genai.caching.CachedContent.create(
+                model=self._model_name,
+                contents=[prefix],
+                ttl=timedelta(seconds=GEMINI_CACHE_TTL_SECONDS)
+            )
+            log_provider(f"Gemini context cache created ({len(prefix)} chars, ttl {GEMINI_CACHE_TTL_SECONDS}s)")
+            return self._genai.GenerativeModel.from_cached_content(cached)
+        except Exception as e:
+            # e.g. model without context caching support: send prompts inline until the entry expires
+            log_provider(f"Gemini context cache unavailable: {e}")
+            return None
+
+    def _split_prompt(self, prompt: str) -> tuple[object, str]:
+        """
+        (model, prompt to send): with a cacheable shared prefix, the model bound
+        to its cached content and the rest of the prompt; otherwise the plain
+        model and the whole prompt. Blocking (may create the cache).
+        """
+        prefix = self._cacheable_prefix(prompt)
+        if prefix is None:
+            return self._client, prompt
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        with self._prefix_lock:
+            entry = self._prefix_models.get(key)
+            if entry is not None and entry[1] > now:
+                return self._bind_prefix(entry[0], prefix, prompt)
+            for stale in [k for k, (_, expires) in self._prefix_models.items() if expires <= now]:
+                del self._prefix_models[stale]
+            pending = self._prefix_pending.get(key)
+            creating = pending is None
+            if creating:
+                pending = self._prefix_pending[key] = threading.Event()
+
+        # The API call runs outside the lock; concurrent calls for the same
+        # prefix wait for it instead of creating a second cache
+        if not creating:
+            pending.wait(GEMINI_CACHE_CREATE_WAIT_SECONDS)
+            with self._prefix_lock:
+                entry = self._prefix_models.get(key)
+            return self._bind_prefix(entry[0] if entry else None, prefix, prompt)
+        try:
+            model = self._create_prefix_model(prefix)
+            with self._prefix_lock:
+                # Expire locally a bit before the server does
+                self._prefix_models[key] = (model, time.monotonic() + GEMINI_CACHE_TTL_SECONDS * 0.9)
+        finally:
+            with self._prefix_lock:
+                del self._prefix_pending[key]
+            pending.set()
+        return self._bind_prefix(model, prefix, prompt)
+
+    def _bind_prefix(self, model, prefix: str, prompt: str) -> tuple[object, str]:
+        if model is None:
+            return self._client, prompt
+        return model, prompt[len(prefix):]
+
+    async def _asplit_prompt(self, prompt: str) -> tuple[object, str]:
+        if self._cacheable_prefix(prompt) is None:
+            return self._client, prompt
+        return await asyncio.to_thread(self._split_prompt, prompt)
+
+    async def agenerate(self, prompt: str, json_mode: bool = False, schema: dict | None = None) -> str:
+        if not self.is_available:
+            raise ConnectionError("Gemini is not available")
+
+        model, prompt = await self._asplit_prompt(prompt)
+        response = await model.generate_content_async(
             prompt,
-            generation_config=generation_config
+            generation_config=self._generation_config(json_mode, schema)
         )
+        ai_metrics.record_tokens(self.name, self.model, *_gemini_usage(response))
         return response.text
 
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        if not self.is_available:
+            raise ConnectionError("Gemini is not available")
+
+        model, prompt = await self._asplit_prompt(prompt)
+        response = await model.generate_content_async(
+            prompt,
+            generation_config=self._generation_config(json_mode=False),
+            stream=True
+        )
+        last_chunk = None
+        emitted = False
+        async for chunk in response:
+            last_chunk = chunk
+            text = _gemini_chunk_text(chunk)
+            if text:
+                emitted = True
+                yield text
+        if not emitted:
+            # e.g. a blocked prompt: fail so the gateway can fall back
+            raise ValueError(f"Gemini stream returned no text: {getattr(last_chunk, 'prompt_feedback', None)}")
+        # Usage metadata on the last chunk covers the whole response
+        ai_metrics.record_tokens(self.name, self.model, *_gemini_usage(last_chunk))
+
 
 class OllamaProvider(AIProvider):
     """Ollama Local Provider."""
@@ -92,7 +301,10 @@ class OllamaProvider(AIProvider):
     def __init__(self):
         self._host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
         self._model_name = os.getenv("OLLAMA_MODEL", "gemma2")
-        self._client = Client(host=self._host)
+        # How long Ollama keeps the model loaded after each call ("30m", "-1" = forever)
+        keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+        self._keep_alive = int(keep_alive) if keep_alive.lstrip("-").isdigit() else keep_alive
+        self._async_client = AsyncClient(host=self._host)
         # Ollama is always considered "available" to try connecting
         log_provider(f"Ollama configured ({self._host})")
 
@@ -100,51 +312,385 @@ class OllamaProvider(AIProvider):
     def name(self) -> str:
         return "Ollama"
 
+    @property
+    def model(self) -> str:
+        return self._model_name
+
     @property
     def is_available(self) -> bool:
         return True
 
-    def generate(self, prompt: str, json_mode: bool = False) -> str:
-        response = self._client.generate(
+    def _options(self) -> dict:
+        # Keep options identical across calls: a change reloads the model and drops the KV cache
+        options = {
+            "temperature": 0.7,
+            "num_predict": 4096,
+        }
+        if OLLAMA_NUM_CTX:
+            options["num_ctx"] = OLLAMA_NUM_CTX
+        return options
+
+    def _record_usage(self, response):
+        ai_metrics.record_tokens(self.name, self.model, *_ollama_usage(response))
+        ai_metrics.observe_prompt_eval(self.name, self.model, _ollama_prompt_eval_seconds(response))
+
+    def _format(self, json_mode: bool, schema: dict | None) -> dict | str | None:
+        """Ollama structured output: a JSON schema, plain "json", or free text."""
+        if not json_mode:
+            return None
+        return schema or "json"
+
+    async def agenerate(self, prompt: str, json_mode: bool = False, schema: dict | None = None) -> str:
+        response = await self._async_client.generate(
             model=self._model_name,
             prompt=prompt,
-            options={
-                "temperature": 0.7,
-                "num_predict": 4096,
-            }
+            format=self._format(json_mode, schema),
+            options=self._options(),
+            keep_alive=self._keep_alive
         )
+        self._record_usage(response)
         return response["response"]
 
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        stream = await self._async_client.generate(
+            model=self._model_name,
+            prompt=prompt,
+            options=self._options(),
+            keep_alive=self._keep_alive,
+            stream=True
+        )
+        async for part in stream:
+            if part["response"]:
+                yield part["response"]
+            if part.get("done"):
+                self._record_usage(part)
+
+    async def aload(self, model: str | None = None):
+        """Load a model into memory (or refresh its keep-alive) without generating."""
+        await self._async_client.generate(model=model or self._model_name, keep_alive=self._keep_alive)
+
 
 class AIGateway:
     """
     Gateway to manage AI providers with fallback strategy.
     Default: Gemini -> Ollama
+    Responses are cached per provider/model/json_mode/prompt (see ai_cache.py).
+    Each provider sits behind a circuit breaker: while a breaker is open the
+    provider is skipped, and a background probe decides when it
+    can take traffic again.
+    Optional hedging (AI_HEDGING_ENABLED): if the primary is slower than its
+    recent latency percentile, the secondary is raced against it.
+    Calls pass through a per-provider adaptive concurrency limiter
+    (see concurrency_limiter.py); a call it rejects falls back like a failure
+    but is not counted against the provider's breaker.
+    AI_FAKE_PROVIDER=true routes every call to FakeProvider instead.
     """
     
     def __init__(self):
         self.gemini = GeminiProvider()
         self.ollama = OllamaProvider()
+        self.fake = None
+        if AI_FAKE_PROVIDER:
+            from .fake_provider import FakeProvider
+            self.fake = FakeProvider()
+            log_provider("Fake provider enabled: Gemini and Ollama will not be called")
+        self.cache = AIResponseCache()
+        self.breakers = {
+            provider.name: CircuitBreaker(provider.name)
+            for provider in self._providers()
+        }
+        self.limiters = {
+            provider.name: AdaptiveLimiter(provider.name)
+            for provider in self._providers()
+        }
+        self._probe_tasks: dict[str, asyncio.Task] = {}
+        self.latencies = LatencyTracker()
+        self.hedging = HedgingPolicy(self.latencies)
+
+    def _providers(self) -> list[AIProvider]:
+        return [self.gemini, self.ollama] + ([self.fake] if self.fake else [])
+
+    def _candidates(self) -> list[AIProvider]:
+        """Providers in fallback order."""
+        if self.fake:
+            return [self.fake]
+        if self.gemini.is_available:
+            return [self.gemini, self.ollama]
+        return [self.ollama]
+
+    async def _acache_lookup(
+        self, prompt: str, json_mode: bool, schema: dict | None = None
+    ) -> tuple[str, str] | None:
+        """Cached response from any candidate provider; disk reads run off the event loop."""
+        for provider in self._candidates():
+            key = make_cache_key(provider.name, provider.model, json_mode, prompt, schema)
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                log_provider(f"Cache hit ({provider.name})")
+                ai_metrics.record_cache_hit(provider.name)
+                return cached, provider.name
+        return None
+
+    def _cache_store(
+        self, provider: AIProvider, prompt: str, json_mode: bool, response: str, schema: dict | None = None
+    ):
+        key = make_cache_key(provider.name, provider.model, json_mode, prompt, schema)
+        self.cache.set(key, response)
+
+    def cache_response(
+        self, provider_name: str, prompt: str, json_mode: bool, response: str, schema: dict | None = None
+    ):
+        """Store a response fetched with store=False, once the caller has validated it."""
+        for provider in self._providers():
+            if provider.name == provider_name:
+                self._cache_store(provider, prompt, json_mode, response, schema)
+                return
+
+    def _no_provider_error(self, last_error: Exception | None) -> Exception:
+        if last_error:
+            return last_error
+        return ConnectionError("No AI provider available (all circuit breakers open)")
+
+    def _schedule_probe(self, provider: AIProvider):
+        """Start a background recovery probe for an open breaker (once at a time)."""
+        task = self._probe_tasks.get(provider.name)
+        if task and not task.done():
+            return
+        self._probe_tasks[provider.name] = asyncio.create_task(self._probe(provider))
+
+    async def _probe(self, provider: AIProvider):
+        breaker = self.breakers[provider.name]
+        if not breaker.allow_request():
+            return
+        log_provider(f"Probing {provider.name}...")
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(
+                provider.agenerate(AI_BREAKER_PROBE_PROMPT),
+                timeout=AI_BREAKER_PROBE_TIMEOUT
+            )
+            breaker.record_success(time.monotonic() - start)
+        except Exception as e:
+            breaker.record_failure(e)
+
+    def _allowed(self, provider: AIProvider) -> bool:
+        """Breaker check: due breakers are probed, not tried live."""
+        breaker = self.breakers[provider.name]
+        if breaker.probe_due():
+            self._schedule_probe(provider)
+            return False
+        return breaker.allow_request()
+
+    async def _acquire_slot(self, provider: AIProvider):
+        """Wait for a concurrency slot; a rejection frees the breaker's trial slot."""
+        try:
+            await self.limiters[provider.name].acquire(deadline=time.monotonic() + AI_LIMITER_QUEUE_TIMEOUT_SECONDS)
+        except (LimiterRejected, asyncio.CancelledError) as e:
+            self.breakers[provider.name].release()
+            if isinstance(e, LimiterRejected):
+                ai_metrics.record_limiter_rejection(provider.name)
+                log_provider(str(e))
+            raise
 
-    def generate(self, prompt: str, json_mode: bool = False) -> tuple[str, str]:
+    async def _acall_provider(
+        self, provider: AIProvider, prompt: str, json_mode: bool, schema: dict | None = None, store: bool = True
+    ) -> str:
+        """Call one provider with concurrency limiting, breaker accounting, latency tracking and caching."""
+        breaker = self.breakers[provider.name]
+        limiter = self.limiters[provider.name]
+        await self._acquire_slot(provider)
+        start = time.monotonic()
+        try:
+            log_provider(f"Using {provider.name}...")
+            response = await provider.agenerate(prompt, json_mode, schema)
+        except asyncio.CancelledError:
+            limiter.release()
+            breaker.release()
+            # Lower bound: the call would have taken at least this long
+            self.latencies.record(provider.name, time.monotonic() - start)
+            raise
+        except Exception as e:
+            elapsed = time.monotonic() - start
+            limiter.release(elapsed, error=e)
+            breaker.record_failure(e)
+            ai_metrics.observe_request(provider.name, provider.model, elapsed, ok=False)
+            self.latencies.record(provider.name, elapsed)
+            log_provider(f"{provider.name} failed: {e}")
+            raise
+        latency = time.monotonic() - start
+        limiter.release(latency)
+        breaker.record_success(latency)
+        ai_metrics.observe_request(provider.name, provider.model, latency, ok=True)
+        self.latencies.record(provider.name, latency)
+        if store:
+            self._cache_store(provider, prompt, json_mode, response, schema)
+        return response
+
+    async def _hedged_generate(
+        self,
+        primary: AIProvider,
+        secondary: AIProvider,
+        prompt: str,
+        json_mode: bool,
+        schema: dict | None = None,
+        store: bool = True
+    ) -> tuple[str, str]:
+        """
+        Race primary against a delayed secondary. The secondary starts early
+        if the primary fails before the hedge delay (plain fallback).
+        """
+        self.hedging.record_request()
+        delay = self.hedging.delay_for(primary.name)
+        tasks = {asyncio.create_task(self._acall_provider(primary, prompt, json_mode, schema, store)): primary}
+        primary_task = next(iter(tasks))
+        hedge_fired = False
+
+        try:
+            done, _ = await asyncio.wait(tasks.keys(), timeout=delay)
+            if primary_task in done and primary_task.exception() is None:
+                return primary_task.result(), primary.name
+
+            if self._allowed(secondary):
+                if not done:
+                    log_provider(f"{primary.name} slower than {delay:.1f}s, hedging with {secondary.name}")
+                    self.hedging.record_fired()
+                    hedge_fired = True
+                tasks[asyncio.create_task(self._acall_provider(secondary, prompt, json_mode, schema, store))] = secondary
+
+            last_error = primary_task.exception() if primary_task.done() else None
+            pending = {task for task in tasks if not task.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = tasks[task]
+                        if hedge_fired:
+                            self.hedging.record_winner(hedge_won=winner is secondary)
+                        return task.result(), winner.name
+                    last_error = task.exception()
+            raise self._no_provider_error(last_error)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def health(self) -> dict:
+        """Breaker state per provider, for monitoring."""
+        return {
+            provider.name: {
+                "available": provider.is_available,
+                "model": provider.model,
+                **self.breakers[provider.name].snapshot(),
+                "concurrency": self.limiters[provider.name].snapshot(),
+            }
+            for provider in self._providers()
+        }
+
+    async def agenerate(
+        self,
+        prompt: str,
+        json_mode: bool = False,
+        use_cache: bool = True,
+        schema: dict | None = None,
+        store: bool = True
+    ) -> tuple[str, str]:
         """
-        Generate content using available providers.
+        Generate content using available providers, in fallback order.
+        use_cache=False skips the cache lookup (the fresh response is still stored).
+        store=False leaves storing to the caller (cache_response(), e.g. once
+        a JSON response has parsed).
+        schema (with json_mode) constrains the output shape on every provider.
         Returns: (response_text, provider_name)
         """
-        # Try Gemini
-        if self.gemini.is_available:
+        if use_cache:
+            cached = await self._acache_lookup(prompt, json_mode, schema)
+            if cached:
+                return cached
+
+        last_error = None
+        remaining = self._candidates()
+        while remaining:
+            provider = remaining.pop(0)
+            if not self._allowed(provider):
+                log_provider(f"Skipping {provider.name} (circuit {self.breakers[provider.name].state.value})")
+                continue
             try:
-                log_provider("Using Gemini...")
-                response = self.gemini.generate(prompt, json_mode)
-                return response, self.gemini.name
+                if self.hedging.enabled and remaining:
+                    return await self._hedged_generate(provider, remaining.pop(0), prompt, json_mode, schema, store)
+                return await self._acall_provider(provider, prompt, json_mode, schema, store), provider.name
             except Exception as e:
-                log_provider(f"Gemini failed: {e}. Falling back...")
-        
-        # Fallback to Ollama
-        try:
-            log_provider("Using Ollama...")
-            response = self.ollama.generate(prompt, json_mode)
-            return response, self.ollama.name
-        except Exception as e:
-            log_provider(f"Ollama failed: {e}")
-            raise e
+                if remaining:
+                    ai_metrics.record_fallback(provider.name)
+                log_provider(f"Falling back after: {e}")
+                last_error = e
+
+        raise self._no_provider_error(last_error)
+
+    async def astream(self, prompt: str, use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Stream plain-text content token by token.
+        Falls back to the next provider only if the previous one failed
+        before emitting anything; a mid-stream failure is re-raised.
+        The complete text is stored in the cache once the stream ends.
+        """
+        if use_cache:
+            cached = await self._acache_lookup(prompt, json_mode=False)
+            if cached:
+                yield cached[0]
+                return
+
+        last_error = None
+        candidates = self._candidates()
+        for index, provider in enumerate(candidates):
+            if not self._allowed(provider):
+                log_provider(f"Skipping {provider.name} (circuit {self.breakers[provider.name].state.value})")
+                continue
+            breaker = self.breakers[provider.name]
+            try:
+                await self._acquire_slot(provider)
+            except LimiterRejected as e:
+                last_error = e
+                continue
+            # Stream length depends on the output, so only errors adapt the limit
+            stream_error = None
+            parts = []
+            start = time.monotonic()
+            try:
+                log_provider(f"Streaming from {provider.name}...")
+                async for token in provider.astream(prompt):
+                    parts.append(token)
+                    yield token
+            except GeneratorExit:
+                # Consumer stopped early (e.g. JSON object already closed)
+                if parts:
+                    latency = time.monotonic() - start
+                    breaker.record_success(latency)
+                    ai_metrics.observe_request(provider.name, provider.model, latency, ok=True)
+                else:
+                    breaker.release()
+                raise
+            except asyncio.CancelledError:
+                # Client went away: not the provider's fault
+                breaker.release()
+                raise
+            except Exception as e:
+                stream_error = e
+                breaker.record_failure(e)
+                ai_metrics.observe_request(provider.name, provider.model, time.monotonic() - start, ok=False)
+                if parts:
+                    log_provider(f"{provider.name} stream interrupted: {e}")
+                    raise
+                if index < len(candidates) - 1:
+                    ai_metrics.record_fallback(provider.name)
+                log_provider(f"{provider.name} stream failed: {e}. Falling back...")
+                last_error = e
+                continue
+            finally:
+                self.limiters[provider.name].release(error=stream_error)
+            latency = time.monotonic() - start
+            breaker.record_success(latency)
+            ai_metrics.observe_request(provider.name, provider.model, latency, ok=True)
+            self._cache_store(provider, prompt, False, "".join(parts))
+            return
+
+        raise self._no_provider_error(last_error)
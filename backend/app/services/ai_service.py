@@ -5,11 +5,19 @@ Business Logic Layer
 - Handles Prompt Engineering & Parsing
 """
 
+import asyncio
 import json
+import os
 import re
-from io import BytesIO
-import pdfplumber
-from .ai_provider import AIGateway
+import threading
+from contextlib import aclosing
+from . import ai_metrics
+from .ai_metrics import labelled
+from .ai_provider import AIGateway, shared_prefix
+from app.services.retrieval import MATERIAL_SEPARATOR, chunk_text
+from app.services.semantic_cache import SemanticMatch, node_content_cache
+from app.utils.pdf_extraction import PDF_EXTRACT_MODE, ExtractionResult, PdfSource, aextract_pdf
+from app.utils.text import normalize_text
 
 # Initialize Gateway (handles Gemini/Ollama connections)
 gateway = AIGateway()
@@ -19,55 +27,176 @@ MAX_CONTENT_LENGTH = 25000
 MAX_SUMMARY_LENGTH = 2000
 MAX_RETRIES = 3
 
+# Max node-content LLM calls in flight during bulk generation
+AI_CONTENT_CONCURRENCY = int(os.getenv("AI_CONTENT_CONCURRENCY", "4"))
+
+# Batched node content: several nodes per call, sized to the output token budget
+AI_CONTENT_BATCH_OUTPUT_TOKENS = int(os.getenv("AI_CONTENT_BATCH_OUTPUT_TOKENS", "4096"))
+AI_CONTENT_BATCH_MAX = int(os.getenv("AI_CONTENT_BATCH_MAX", "6"))
+AI_CONTENT_TOKENS_PER_NODE = int(os.getenv("AI_CONTENT_TOKENS_PER_NODE", "700"))
+CHARS_PER_TOKEN = 4
+
+# Longest draft (semantic cache near-match) included in a node content prompt
+MAX_DRAFT_LENGTH = 3000
+
+# Map-reduce digest for documents longer than MAX_CONTENT_LENGTH
+AI_MAP_REDUCE_ENABLED = os.getenv("AI_MAP_REDUCE_ENABLED", "true").lower() == "true"
+AI_MAP_REDUCE_CHUNK_SIZE = int(os.getenv("AI_MAP_REDUCE_CHUNK_SIZE", "12000"))
+AI_MAP_REDUCE_CONCURRENCY = int(os.getenv("AI_MAP_REDUCE_CONCURRENCY", "4"))
+# Longest source text the map step will read (also the PDF extraction budget)
+AI_MAP_REDUCE_MAX_CHARS = int(os.getenv("AI_MAP_REDUCE_MAX_CHARS", "300000"))
+MIN_CHUNK_DIGEST_LENGTH = 400
+
+# Characters of source text worth extracting: everything the map step can cover
+SOURCE_BUDGET = AI_MAP_REDUCE_MAX_CHARS if AI_MAP_REDUCE_ENABLED else MAX_CONTENT_LENGTH
+# With map-reduce, pages are sampled over the whole document instead of read
+# from the start, so the digest covers a long book to its last chapter
+SOURCE_EXTRACT_MODE = "sample" if AI_MAP_REDUCE_ENABLED else PDF_EXTRACT_MODE
+
 def log_ai(msg):
     print(f"[AI SERVICE] {msg}", flush=True)
 
-def call_ai(prompt: str, json_mode: bool = False) -> str:
+
+# =============================================================================
+# RESPONSE SCHEMAS - passed to the providers for constrained JSON decoding
+# =============================================================================
+
+ROADMAP_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "description": {"type": "string"},
+        "nodes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                    "level": {"type": "string", "enum": ["beginner", "intermediate", "advanced"]},
+                    "order": {"type": "integer"},
+                    "prerequisites": {"type": "array", "items": {"type": "integer"}},
+                },
+                "required": ["title", "description", "level", "order", "prerequisites"],
+            },
+        },
+    },
+    "required": ["description", "nodes"],
+}
+
+NODE_CONTENT_SCHEMA = {
+    "type": "object",
+    "properties": {"content": {"type": "string"}},
+    "required": ["content"],
+}
+
+NODES_CONTENT_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "nodes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer"},
+                    "content": {"type": "string"},
+                },
+                "required": ["index", "content"],
+            },
+        },
+    },
+    "required": ["nodes"],
+}
+
+
+class ParseStats:
+    """Per-provider count of JSON-mode responses and how many failed to parse."""
+
+    def __init__(self):
+        self._counts: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, ok: bool):
+        with self._lock:
+            counts = self._counts.setdefault(provider, {"responses": 0, "parse_failures": 0})
+            counts["responses"] += 1
+            if not ok:
+                counts["parse_failures"] += 1
+        if not ok:
+            ai_metrics.record_parse_failure(provider)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                provider: {
+                    **counts,
+                    "failure_rate": round(counts["parse_failures"] / counts["responses"], 4),
+                }
+                for provider, counts in self._counts.items()
+            }
+
+
+parse_stats = ParseStats()
+
+def log_ai_response(response_text: str, provider_name: str):
+    log_ai(f"Used Provider: {provider_name}")
+    log_ai(f"--- AI RESPONSE ({provider_name}) ---")
+    log_ai(response_text[:500] + "..." if len(response_text) > 500 else response_text)
+    log_ai("-------------------------------")
+
+async def acall_ai(prompt: str, json_mode: bool = False, use_cache: bool = True) -> str:
     """
-    Call AI using the Gateway.
+    Call AI using the Gateway, without blocking the event loop.
     Strategies: Gemini -> Ollama (handled by Gateway)
+    use_cache=False forces a fresh provider call (used by retries).
     """
     try:
-        response_text, provider_name = gateway.generate(prompt, json_mode)
-        
-        # LOGGING
-        log_ai(f"Used Provider: {provider_name}")
-        log_ai(f"--- AI RESPONSE ({provider_name}) ---")
-        log_ai(response_text[:500] + "..." if len(response_text) > 500 else response_text)
-        log_ai("-------------------------------")
-        
+        response_text, provider_name = await gateway.agenerate(prompt, json_mode, use_cache=use_cache)
+        log_ai_response(response_text, provider_name)
         return response_text
     except Exception as e:
         log_ai(f"CRITICAL AI FAILURE: {e}")
         raise e
 
-def call_ai_text(prompt: str) -> str:
+async def acall_ai_json(prompt: str, schema: dict | None = None, use_cache: bool = True) -> dict:
+    """
+    JSON-mode call parsed into a dict; parse outcomes are tracked per provider.
+    Only responses that parse are cached.
+    """
+    response_text, provider_name = await gateway.agenerate(
+        prompt, True, use_cache=use_cache, schema=schema, store=False
+    )
+    log_ai_response(response_text, provider_name)
+    try:
+        data = parse_json_response(response_text)
+    except Exception:
+        parse_stats.record(provider_name, ok=False)
+        raise
+    parse_stats.record(provider_name, ok=True)
+    gateway.cache_response(provider_name, prompt, True, response_text, schema)
+    return data
+
+async def acall_ai_text(prompt: str) -> str:
     """Call AI for plain text response (no JSON)."""
-    return call_ai(prompt, json_mode=False)
+    return await acall_ai(prompt, json_mode=False)
 
 
 # =============================================================================
-# PDF EXTRACTION - Using pdfplumber
+# PDF EXTRACTION - pdfplumber, page ranges in a process pool
 # =============================================================================
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF using pdfplumber (more robust than PyPDF2)."""
-    text_parts = []
-    
-    with pdfplumber.open(BytesIO(file_content)) as pdf:
-        for page in pdf.pages:
-            # Extract text with better handling of layouts
-            text = page.extract_text(layout=True)
-            if text:
-                text_parts.append(text)
-    
-    text = "\n\n".join(text_parts)
-    
-    # Clean invalid characters for PostgreSQL
-    text = text.replace('\x00', '')
-    text = ''.join(char for char in text if char.isprintable() or char in '\n\r\t')
-    
-    return text.strip()
+async def aextract_text_from_pdf(
+    source: PdfSource,
+    budget: int | None = SOURCE_BUDGET,
+    mode: str = SOURCE_EXTRACT_MODE
+) -> ExtractionResult:
+    """
+    Extract text from PDF using pdfplumber (more robust than PyPDF2), with
+    pages extracted in worker processes. Only enough pages to fill `budget`
+    characters are parsed (see SOURCE_EXTRACT_MODE); the result reports
+    which pages were used.
+    """
+    result = await aextract_pdf(source, budget=budget, mode=mode)
+    return result._replace(text=normalize_text(result.text))
 
 
 # =============================================================================
@@ -94,74 +223,169 @@ def truncate_content(content: str, max_length: int = MAX_CONTENT_LENGTH) -> str:
     return truncated
 
 
-def clean_json_text(text: str) -> str:
-    """Clean and repair malformed JSON from AI responses."""
-    # Remove markdown code blocks
-    if "```json" in text:
-        text = text.split("```json")[1].split("```")[0]
-    elif "```" in text:
-        parts = text.split("```")
-        if len(parts) >= 2:
-            text = parts[1]
-    
-    text = text.strip()
-    
-    # Extract JSON object
-    start = text.find("{")
-    end = text.rfind("}") + 1
-    if start != -1 and end > start:
-        text = text[start:end]
-    
-    # Fix common issues
-    text = re.sub(r',\s*}', '}', text)  # Trailing comma before }
-    text = re.sub(r',\s*]', ']', text)  # Trailing comma before ]
-    text = text.replace('\n', ' ')
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text
+# =============================================================================
+# JSON PARSING - single-pass, incremental
+# =============================================================================
+
+# One token per match: a whole string literal (group 1 = closing quote, None
+# if the string is still open), a bracket, or a trailing comma (one followed
+# only by whitespace and a closing bracket; group 2 is None if the buffer ends
+# before we know). Other commas are never visited.
+_JSON_TOKEN_RE = re.compile(
+    r'"[^"\\]*(?:\\.[^"\\]*)*(")?|[{}\[\]]|,(?=\s*(?:([}\]])|\Z))',
+    re.DOTALL
+)
+_JSON_DECODER = json.JSONDecoder(strict=False)
+
+
+class IncrementalJSONParser:
+    """
+    Locate and parse the first balanced JSON object in LLM output.
+    - Single left-to-right scan; a regex jumps from token to token, string
+      literals are consumed whole
+    - Markdown fences and chatter around the object are skipped
+    - Trailing commas before } or ] are dropped while scanning
+    - Raw newlines inside strings are accepted (json strict=False)
+    feed() can be called with streamed chunks; it returns True as soon as the
+    object closes, so the caller can stop generation early.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._dropped_commas: list[int] = []
+        self.complete = False
+        self.value: dict | None = None
+
+    def _finish(self, end: int) -> bool:
+        parts = []
+        cursor = self._start
+        for comma in self._dropped_commas:
+            parts.append(self._buffer[cursor:comma])
+            cursor = comma + 1
+        parts.append(self._buffer[cursor:end])
+        try:
+            value = json.loads("".join(parts), strict=False)
+        except json.JSONDecodeError:
+            value = None
+        if isinstance(value, dict):
+            self.value = value
+            self.complete = True
+            return True
+        # Not valid JSON (e.g. a "{placeholder}" in prose): keep looking after it
+        self._pos = self._start + 1
+        self._start = -1
+        return False
+
+    def feed(self, chunk: str) -> bool:
+        if self.complete:
+            return True
+        self._buffer += chunk
+        buffer = self._buffer
+
+        while True:
+            if self._start < 0:
+                start = buffer.find("{", self._pos)
+                if start < 0:
+                    self._pos = len(buffer)
+                    return False
+                self._start = start
+                self._depth = 1
+                self._dropped_commas = []
+                self._pos = start + 1
+
+            depth = self._depth
+            dropped = self._dropped_commas
+            for match in _JSON_TOKEN_RE.finditer(buffer, self._pos):
+                first = match.group()[0]
+                if first == '"':
+                    if match.group(1) is None:
+                        # String still open: resume here with the next chunk
+                        self._depth, self._pos = depth, match.start()
+                        return False
+                elif first == ",":
+                    if match.group(2) is None:
+                        # Can't tell yet whether this comma is trailing
+                        self._depth, self._pos = depth, match.start()
+                        return False
+                    dropped.append(match.start())
+                elif first in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        if self._finish(match.end()):
+                            return True
+                        break  # invalid candidate: _finish moved _pos past its "{"
+            else:
+                self._depth, self._pos = depth, len(buffer)
+                return False
+
+    @property
+    def chars_read(self) -> int:
+        return len(self._buffer)
+
+    def result(self) -> dict:
+        if not self.complete:
+            raise ValueError(f"Could not parse JSON: {self._buffer[:200]}...")
+        return self.value
 
 
 def parse_json_response(response_text: str) -> dict:
-    """Parse JSON response with multiple repair strategies."""
-    # Direct attempt
-    try:
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        pass
-    
-    # Clean and retry
-    try:
-        cleaned = clean_json_text(response_text)
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        pass
-    
-    # Aggressive regex extraction
-    try:
-        match = re.search(r'\{.*\}', response_text, re.DOTALL)
-        if match:
-            return json.loads(clean_json_text(match.group()))
-    except json.JSONDecodeError:
-        pass
-    
-    raise ValueError(f"Could not parse JSON: {response_text[:200]}...")
+    """
+    Parse the first JSON object in an AI response.
+    Fast path: decode straight from the first "{" (C decoder, ignores any text
+    after the object). Only malformed output goes through the repairing scanner.
+    """
+    start = response_text.find("{")
+    if start >= 0:
+        try:
+            value, _ = _JSON_DECODER.raw_decode(response_text, start)
+            if isinstance(value, dict):
+                return value
+        except json.JSONDecodeError:
+            pass
 
+    parser = IncrementalJSONParser()
+    parser.feed(response_text)
+    return parser.result()
 
-def call_ai_with_retry(prompt: str) -> dict:
-    """Call AI with retries for JSON parsing failures."""
+
+async def acall_ai_json_stream(prompt: str) -> dict:
+    """
+    Stream a plain-text response and stop reading as soon as the first JSON
+    object closes (skips any chatter the model adds after it).
+    """
+    parser = IncrementalJSONParser()
+    async with aclosing(gateway.astream(prompt, use_cache=False)) as stream:
+        async for token in stream:
+            if parser.feed(token):
+                break
+    log_ai(f"Streamed JSON ({parser.chars_read} chars read)")
+    return parser.result()
+
+
+async def acall_ai_with_retry(prompt: str, schema: dict | None = None) -> dict:
+    """
+    Call AI with retries for JSON parsing failures.
+    schema constrains decoding on both providers (Gemini response_schema,
+    Ollama format), so the first JSON-mode attempt normally parses.
+    The non-JSON-mode fallback is streamed and cut off once the object closes.
+    """
     last_error = None
     
     for attempt in range(MAX_RETRIES):
+        if attempt:
+            ai_metrics.record_retry()
         try:
-            # Try with JSON mode first (Gemini native)
-            response_text = call_ai(prompt, json_mode=True)
-            return parse_json_response(response_text)
+            return await acall_ai_json(prompt, schema, use_cache=attempt == 0)
         except Exception as e:
             last_error = e
-            # Retry without JSON mode
+            ai_metrics.record_retry()
             try:
-                response_text = call_ai(prompt, json_mode=False)
-                return parse_json_response(response_text)
+                return await acall_ai_json_stream(prompt)
             except Exception as e2:
                 last_error = e2
                 continue
@@ -175,15 +399,24 @@ def call_ai_with_retry(prompt: str) -> dict:
 # CONTENT SUMMARY (Optimized for storage)
 # =============================================================================
 
-def generate_content_summary(content: str, roadmap_title: str, nodes_info: list[dict]) -> str:
+@labelled("summary")
+async def generate_content_summary(content: str, roadmap_title: str, nodes_info: list[dict] | None = None) -> str:
     """
     Generate optimized summary for node content generation.
     Stored in DB instead of full content - max 2000 chars.
+    nodes_info is optional: without it the prompt does not depend on the
+    generated roadmap, so the summary can run in parallel with generate_roadmap().
     """
     processed_content = truncate_content(content, max_length=5000)
     
-    # Build topics list compactly
-    topics = "\n".join([f"• {n.get('title', '')}" for n in nodes_info[:12]])
+    if nodes_info:
+        # Build topics list compactly
+        topics = "\n".join([f"• {n.get('title', '')}" for n in nodes_info[:12]])
+        context = f"""Temas del roadmap "{roadmap_title}":
+{topics}"""
+    else:
+        context = f"""Roadmap: "{roadmap_title}"
+Cubre todos los temas principales del contenido."""
     
     prompt = f"""Genera un RESUMEN ESTRUCTURADO y CONCISO del contenido.
 
@@ -193,15 +426,14 @@ REGLAS:
 - Incluye definiciones y conceptos clave
 - NO incluyas opiniones
 
-Temas del roadmap "{roadmap_title}":
-{topics}
+{context}
 
 Contenido:
 {processed_content}
 
 RESUMEN:"""
 
-    summary = call_ai_text(prompt)
+    summary = await acall_ai_text(prompt)
     
     # Enforce max length
     if len(summary) > MAX_SUMMARY_LENGTH:
@@ -210,6 +442,83 @@ RESUMEN:"""
     return summary
 
 
+# =============================================================================
+# MAP-REDUCE DIGEST - full-document coverage for long sources
+# =============================================================================
+
+def spread(items: list, k: int) -> list:
+    """k items evenly spaced over the list, first and last included, in order."""
+    if k >= len(items):
+        return items
+    if k <= 1:
+        return items[:k]
+    return [items[round(index * (len(items) - 1) / (k - 1))] for index in range(k)]
+
+
+@labelled("map_chunk")
+async def summarize_chunk(chunk: str, title: str, part: int, parts: int, max_length: int) -> str:
+    """Map step: condense one chunk of the document, keeping its key topics."""
+    prompt = f"""Resume esta PARTE {part} de {parts} de un documento para construir un roadmap de aprendizaje.
+
+REGLAS:
+- Máximo {max_length} caracteres
+- Lista los temas, conceptos y definiciones clave en el orden en que aparecen
+- Usa bullet points cortos
+- NO inventes contenido
+
+Documento: {title}
+
+Parte {part}/{parts}:
+{chunk}
+
+RESUMEN:"""
+    summary = await acall_ai_text(prompt)
+    return summary[:max_length]
+
+
+async def build_digest(
+    content: str,
+    title: str,
+    chunk_size: int = AI_MAP_REDUCE_CHUNK_SIZE,
+    concurrency: int = AI_MAP_REDUCE_CONCURRENCY,
+    max_length: int = MAX_CONTENT_LENGTH
+) -> str:
+    """
+    Map-reduce: split a document longer than max_length into chunks, summarize
+    them concurrently (bounded by a semaphore) and merge the summaries in
+    document order, so the whole document fits in one roadmap prompt.
+    Shorter documents are returned unchanged. Past AI_MAP_REDUCE_MAX_CHARS,
+    chunks are picked evenly from start to end rather than cut at the end.
+    A chunk whose summary fails is truncated instead, so it still contributes
+    to the digest.
+    """
+    if not AI_MAP_REDUCE_ENABLED or len(content) <= max_length:
+        return content
+
+    chunks = chunk_text(content, chunk_size=chunk_size, overlap=0)
+    max_chunks = max(AI_MAP_REDUCE_MAX_CHARS // chunk_size, 1)
+    if len(chunks) > max_chunks:
+        log_ai(f"Map-reduce: sampling {max_chunks} of {len(chunks)} chunks over the whole document")
+        chunks = spread(chunks, max_chunks)
+    per_chunk = max(max_length // len(chunks) - 20, MIN_CHUNK_DIGEST_LENGTH)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(part: int, chunk: str) -> str:
+        async with semaphore:
+            try:
+                summary = await summarize_chunk(chunk, title, part, len(chunks), per_chunk)
+            except Exception as e:
+                log_ai(f"Map step failed for part {part}/{len(chunks)}: {e}")
+                summary = truncate_content(chunk, per_chunk)
+            return f"[Parte {part}/{len(chunks)}]\n{summary.strip()}"
+
+    log_ai(f"Map-reduce digest: {len(content)} chars -> {len(chunks)} chunks (concurrency {concurrency})")
+    summaries = await asyncio.gather(*(run(part, chunk) for part, chunk in enumerate(chunks, start=1)))
+    digest = "\n\n".join(summaries)
+    log_ai(f"Map-reduce digest ready: {len(digest)} chars")
+    return digest
+
+
 # =============================================================================
 # ROADMAP VALIDATION
 # =============================================================================
@@ -246,7 +555,8 @@ def validate_roadmap_structure(roadmap_data: dict, strict: bool = True) -> tuple
 # ROADMAP GENERATION - TOON-inspired compact prompts
 # =============================================================================
 
-def generate_roadmap(content: str, title: str) -> dict:
+@labelled("roadmap")
+async def generate_roadmap(content: str, title: str) -> dict:
     """
     Generate learning roadmap structured by levels.
     Uses compact prompts for token efficiency.
@@ -283,7 +593,7 @@ Contenido:
 JSON:"""
 
     # Attempt 1
-    roadmap_data = call_ai_with_retry(base_prompt)
+    roadmap_data = await acall_ai_with_retry(base_prompt, ROADMAP_SCHEMA)
     is_valid, counts = validate_roadmap_structure(roadmap_data, strict=True)
     
     if is_valid:
@@ -320,7 +630,7 @@ Contenido:
 
 JSON:"""
 
-    roadmap_data = call_ai_with_retry(retry_prompt)
+    roadmap_data = await acall_ai_with_retry(retry_prompt, ROADMAP_SCHEMA)
     is_valid, counts = validate_roadmap_structure(roadmap_data, strict=True)
     
     if is_valid:
@@ -396,11 +706,55 @@ def redistribute_nodes_levels(nodes: list[dict]) -> list[dict]:
 # NODE CONTENT GENERATION
 # =============================================================================
 
-def generate_node_content(source_content: str, node_title: str, node_description: str) -> dict:
-    """Generate detailed educational content for a specific node."""
-    processed_content = truncate_content(source_content)
+def cached_node_content(node_title: str, node_description: str) -> SemanticMatch | None:
+    """Semantic cache lookup for a node (see semantic_cache.py), recorded in the metrics."""
+    match = node_content_cache.lookup(node_title, node_description)
+    result = "miss" if match is None else "hit" if match.servable else "draft"
+    ai_metrics.record_semantic_lookup(result)
+    if match is not None:
+        log_ai(f"Semantic cache {result}: \"{node_title}\" ~ \"{match.title}\" ({match.score})")
+    return match
+
+
+def draft_block(match: SemanticMatch | None) -> str:
+    if match is None:
+        return ""
+    return f"""
+Borrador de un tema similar ("{match.title}"), adáptalo al material:
+{match.content[:MAX_DRAFT_LENGTH]}
+"""
+
+
+def material_prefix(material: str) -> str:
+    """
+    Head of every node content prompt. Node-specific text goes after it, so
+    prompts for nodes with the same material share a prefix the provider can
+    reuse (Ollama's KV cache, Gemini cached content; see shared_prefix()).
+    """
+    return f"Material:\n{material}\n\n"
+
+
+@labelled("node_content")
+async def generate_node_content(
+    source_content: str,
+    node_title: str,
+    node_description: str,
+    lookup: bool = True,
+    draft: SemanticMatch | None = None
+) -> dict:
+    """
+    Generate detailed educational content for a specific node.
+    A near-identical cached node is served as is; a similar one is given to
+    the model as a draft. lookup=False skips the semantic cache lookup (the
+    caller already did it) and uses `draft` instead.
+    """
+    match = cached_node_content(node_title, node_description) if lookup else draft
+    if match is not None and match.servable:
+        return {"content": match.content}
 
-    prompt = f"""Genera contenido educativo para "{node_title}".
+    prefix = material_prefix(truncate_content(source_content))
+
+    prompt = prefix + f"""Genera contenido educativo para "{node_title}".
 
 RESPONDE JSON:
 {{"content": "## Introducción\\n\\nTexto...\\n\\n## Conceptos\\n\\n- **Concepto**: explicación\\n\\n## Tips\\n\\n- Tip práctico"}}
@@ -413,10 +767,257 @@ Estructura Markdown:
 
 Tema: {node_title}
 Contexto: {node_description}
+{draft_block(match)}
+JSON:"""
 
-Material:
-{processed_content}
+    with shared_prefix(prefix):
+        content_data = await acall_ai_with_retry(prompt, NODE_CONTENT_SCHEMA)
+    node_content_cache.add(node_title, node_description, content_data.get("content", ""))
+    return content_data
+
+
+def strip_markdown_fence(text: str) -> str:
+    """Remove a wrapping ```markdown ... ``` block some models add anyway."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+async def stream_node_content(source_content: str, node_title: str, node_description: str):
+    """
+    Stream node content as plain Markdown (no JSON wrapper), so each token
+    can be forwarded to the client as soon as it arrives.
+    """
+    match = cached_node_content(node_title, node_description)
+    if match is not None and match.servable:
+        yield match.content
+        return
+
+    prefix = material_prefix(truncate_content(source_content))
+
+    prompt = prefix + f"""Genera contenido educativo para "{node_title}".
+
+RESPONDE SOLO MARKDOWN (sin JSON, sin bloques ```):
+## Introducción
+Texto...
+## Conceptos
+- **Concepto**: explicación
+## Tips
+- Tip práctico
+
+Estructura Markdown:
+- ## Headers
+- **Negritas** para conceptos
+- Listas con -
+- `código` si aplica
+
+Tema: {node_title}
+Contexto: {node_description}
+{draft_block(match)}
+MARKDOWN:"""
+
+    parts = []
+    with shared_prefix(prefix):
+        async for token in gateway.astream(prompt):
+            parts.append(token)
+            yield token
+    node_content_cache.add(node_title, node_description, strip_markdown_fence("".join(parts)))
+
+
+async def generate_nodes_content(
+    source_content: str,
+    nodes: list[dict],
+    concurrency: int = AI_CONTENT_CONCURRENCY
+):
+    """
+    Generate content for many nodes concurrently, bounded by a semaphore.
+    nodes: [{"id": ..., "title": ..., "description": ..., "material": optional}]
+    A node's "material" (retrieved chunks) replaces source_content in its prompt.
+    A node with a "draft" key was already looked up in the semantic cache.
+    Yields (node_id, content_data, error) in completion order, so callers can
+    persist each result as soon as it is ready.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(node: dict):
+        async with semaphore:
+            try:
+                content_data = await generate_node_content(
+                    source_content=node.get("material") or source_content,
+                    node_title=node["title"],
+                    node_description=node.get("description") or "",
+                    lookup="draft" not in node,
+                    draft=node.get("draft")
+                )
+                return node["id"], content_data, None
+            except Exception as e:
+                return node["id"], None, e
+
+    for task in asyncio.as_completed([run(node) for node in nodes]):
+        yield await task
+
+
+# =============================================================================
+# BATCHED NODE CONTENT - one call (and one Material block) for several nodes
+# =============================================================================
+
+class BatchSizer:
+    """
+    Nodes per batched call: what fits in the output token budget given the
+    observed tokens per node (moving average). A batch whose response does
+    not parse (usually cut off at the token limit) makes the estimate more
+    conservative, but never so much that batches shrink to a single node;
+    per-node successes move it back toward the default.
+    """
+
+    def __init__(
+        self,
+        output_tokens: int = AI_CONTENT_BATCH_OUTPUT_TOKENS,
+        tokens_per_node: int = AI_CONTENT_TOKENS_PER_NODE,
+        max_batch: int = AI_CONTENT_BATCH_MAX
+    ):
+        self.output_tokens = output_tokens
+        self.default_tokens_per_node = float(tokens_per_node)
+        self.tokens_per_node = float(tokens_per_node)
+        self.max_batch = max_batch
+
+    @property
+    def budget(self) -> float:
+        # 20% headroom for JSON syntax and estimate error
+        return self.output_tokens * 0.8
+
+    def size(self) -> int:
+        fits = int(self.budget // max(self.tokens_per_node, 1))
+        return max(1, min(self.max_batch, fits))
+
+    def observe(self, chars_per_node: float):
+        self.tokens_per_node = 0.7 * self.tokens_per_node + 0.3 * (chars_per_node / CHARS_PER_TOKEN)
+
+    def overflow(self):
+        # Capped so a batch of two still fits: single nodes are never batched,
+        # so observe() would get no more samples to correct the estimate
+        ceiling = max(self.budget / 2, self.default_tokens_per_node)
+        self.tokens_per_node = min(self.tokens_per_node * 1.5, ceiling)
+
+    def relax(self):
+        """A node generated on its own: decay the estimate toward the default."""
+        self.tokens_per_node = 0.8 * self.tokens_per_node + 0.2 * self.default_tokens_per_node
+
+
+content_batch_sizer = BatchSizer()
+
+
+def merge_materials(nodes: list[dict], fallback: str) -> str:
+    """Union of the nodes' retrieved chunks (first-seen order), or the fallback."""
+    chunks = dict.fromkeys(
+        chunk
+        for node in nodes if node.get("material")
+        for chunk in node["material"].split(MATERIAL_SEPARATOR)
+    )
+    return MATERIAL_SEPARATOR.join(chunks) if chunks else fallback
+
+
+@labelled("node_content_batch")
+async def agenerate_content_batch(source_content: str, nodes: list[dict]) -> dict[int, dict]:
+    """
+    Generate content for several nodes in one structured JSON call.
+    Returns {node_id: {"content": ...}} for the items the model answered.
+    """
+    prefix = material_prefix(truncate_content(merge_materials(nodes, source_content)))
+    topics = "\n".join(
+        f"{index}. {node['title']}: {node.get('description') or ''}"
+        for index, node in enumerate(nodes, start=1)
+    )
+
+    prompt = prefix + f"""Genera contenido educativo para {len(nodes)} temas del mismo roadmap.
+
+RESPONDE JSON, un elemento por tema con su "index":
+{{"nodes": [{{"index": 1, "content": "## Introducción\\n\\nTexto...\\n\\n## Conceptos\\n\\n- **Concepto**: explicación\\n\\n## Tips\\n\\n- Tip práctico"}}]}}
+
+Estructura Markdown de cada content:
+- ## Headers
+- **Negritas** para conceptos
+- Listas con -
+- `código` si aplica
+
+Temas:
+{topics}
 
 JSON:"""
 
-    return call_ai_with_retry(prompt)
+    with shared_prefix(prefix):
+        data = await acall_ai_json(prompt, NODES_CONTENT_BATCH_SCHEMA)
+    contents = {}
+    for item in data.get("nodes") or []:
+        index = item.get("index") if isinstance(item, dict) else None
+        content = item.get("content") if isinstance(item, dict) else None
+        if isinstance(index, int) and 1 <= index <= len(nodes) and isinstance(content, str) and content.strip():
+            contents[nodes[index - 1]["id"]] = {"content": content}
+    return contents
+
+
+async def generate_nodes_content_batch(
+    source_content: str,
+    nodes: list[dict],
+    concurrency: int = AI_CONTENT_CONCURRENCY,
+    sizer: BatchSizer = content_batch_sizer
+):
+    """
+    Batched version of generate_nodes_content(): nodes are grouped (in the
+    given order, so neighbours share material) into batches sized by
+    `sizer`, and each batch is one LLM call. Nodes the semantic cache can
+    serve skip the LLM. Nodes missing from a batch response, or from a failed
+    batch, fall back to per-node calls.
+    Yields (node_id, content_data, error) in completion order.
+    """
+    pending = []
+    for node in nodes:
+        match = cached_node_content(node["title"], node.get("description") or "")
+        if match is not None and match.servable:
+            yield node["id"], {"content": match.content}, None
+        else:
+            pending.append({**node, "draft": match})
+    nodes = pending
+    if not nodes:
+        return
+
+    size = sizer.size()
+    batches = [nodes[start:start + size] for start in range(0, len(nodes), size)]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(batch: list[dict]) -> tuple[dict[int, dict], list[dict]]:
+        if len(batch) == 1:
+            return {}, batch
+        async with semaphore:
+            try:
+                contents = await agenerate_content_batch(source_content, batch)
+            except Exception as e:
+                log_ai(f"Content batch of {len(batch)} failed, falling back per node: {e}")
+                if isinstance(e, ValueError):
+                    # Unparseable response, most likely cut off at the token
+                    # limit; transport errors say nothing about the batch size
+                    sizer.overflow()
+                return {}, batch
+        if contents:
+            sizer.observe(sum(len(data["content"]) for data in contents.values()) / len(contents))
+            for node in batch:
+                if node["id"] in contents:
+                    node_content_cache.add(node["title"], node.get("description") or "", contents[node["id"]]["content"])
+        return contents, [node for node in batch if node["id"] not in contents]
+
+    log_ai(f"Batched content: {len(nodes)} nodes in {len(batches)} calls (batch size {size})")
+    fallback_nodes = []
+    for task in asyncio.as_completed([run(batch) for batch in batches]):
+        contents, missing = await task
+        for node_id, content_data in contents.items():
+            yield node_id, content_data, None
+        fallback_nodes.extend(missing)
+
+    if fallback_nodes:
+        async for result in generate_nodes_content(source_content, fallback_nodes, concurrency):
+            if result[2] is None:
+                sizer.relax()
+            yield result
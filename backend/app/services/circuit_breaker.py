@@ -0,0 +1,169 @@
+"""
+Circuit Breaker
+Per-provider health state used by AIGateway.
+- CLOSED: requests flow; outcomes go into a sliding window
+- OPEN: provider is skipped until the cool-down elapses
+- HALF_OPEN: a limited number of trial calls (or a background probe)
+  decide whether to close again or re-open
+A call counts against the provider if it fails or is slower than the
+configured latency threshold.
+"""
+
+import enum
+import os
+import threading
+import time
+from collections import deque
+
+AI_BREAKER_WINDOW = int(os.getenv("AI_BREAKER_WINDOW", "20"))
+AI_BREAKER_MIN_CALLS = int(os.getenv("AI_BREAKER_MIN_CALLS", "5"))
+AI_BREAKER_FAILURE_RATE = float(os.getenv("AI_BREAKER_FAILURE_RATE", "0.5"))
+AI_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("AI_BREAKER_SLOW_CALL_SECONDS", "30"))
+AI_BREAKER_SLOW_CALL_RATE = float(os.getenv("AI_BREAKER_SLOW_CALL_RATE", "0.8"))
+AI_BREAKER_OPEN_SECONDS = float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30"))
+AI_BREAKER_HALF_OPEN_CALLS = int(os.getenv("AI_BREAKER_HALF_OPEN_CALLS", "1"))
+
+
+def log_breaker(msg):
+    print(f"[CIRCUIT BREAKER] {msg}", flush=True)
+
+
+class BreakerState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Sliding-window circuit breaker with error-rate and slow-call thresholds."""
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = AI_BREAKER_WINDOW,
+        min_calls: int = AI_BREAKER_MIN_CALLS,
+        failure_rate_threshold: float = AI_BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = AI_BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate_threshold: float = AI_BREAKER_SLOW_CALL_RATE,
+        open_seconds: float = AI_BREAKER_OPEN_SECONDS,
+        half_open_max_calls: int = AI_BREAKER_HALF_OPEN_CALLS,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = BreakerState.CLOSED
+        self._window: deque[tuple[bool, bool]] = deque(maxlen=window_size)  # (failed, slow)
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._lock = threading.Lock()
+        self._stats = {"successes": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "trips": 0}
+        self._last_error: str | None = None
+
+    @property
+    def state(self) -> BreakerState:
+        return self._state
+
+    def _transition(self, state: BreakerState):
+        if state == self._state:
+            return
+        log_breaker(f"{self.name}: {self._state.value} -> {state.value}")
+        self._state = state
+        if state == BreakerState.OPEN:
+            self._opened_at = time.monotonic()
+            self._stats["trips"] += 1
+        if state == BreakerState.CLOSED:
+            self._window.clear()
+        self._half_open_in_flight = 0
+
+    def _cooldown_elapsed(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.open_seconds
+
+    def probe_due(self) -> bool:
+        """True when the breaker is open and ready for a recovery probe."""
+        with self._lock:
+            return self._state == BreakerState.OPEN and self._cooldown_elapsed()
+
+    def allow_request(self) -> bool:
+        """Reserve a call slot. Open breakers move to half-open after the cool-down."""
+        with self._lock:
+            if self._state == BreakerState.OPEN:
+                if not self._cooldown_elapsed():
+                    self._stats["rejected"] += 1
+                    return False
+                self._transition(BreakerState.HALF_OPEN)
+
+            if self._state == BreakerState.HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    self._stats["rejected"] += 1
+                    return False
+                self._half_open_in_flight += 1
+
+            return True
+
+    def record_success(self, latency: float):
+        with self._lock:
+            slow = latency >= self.slow_call_seconds
+            self._stats["successes"] += 1
+            if slow:
+                self._stats["slow_calls"] += 1
+
+            if self._state == BreakerState.HALF_OPEN:
+                if slow:
+                    self._transition(BreakerState.OPEN)
+                else:
+                    self._transition(BreakerState.CLOSED)
+                return
+
+            self._window.append((False, slow))
+            self._evaluate()
+
+    def record_failure(self, error: Exception | None = None):
+        with self._lock:
+            self._stats["failures"] += 1
+            self._last_error = str(error) if error else None
+
+            if self._state == BreakerState.HALF_OPEN:
+                self._transition(BreakerState.OPEN)
+                return
+
+            self._window.append((True, False))
+            self._evaluate()
+
+    def _evaluate(self):
+        calls = len(self._window)
+        if self._state != BreakerState.CLOSED or calls < self.min_calls:
+            return
+        failure_rate = sum(1 for failed, _ in self._window if failed) / calls
+        slow_rate = sum(1 for _, slow in self._window if slow) / calls
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            log_breaker(
+                f"{self.name}: tripping (failure_rate={failure_rate:.2f}, slow_rate={slow_rate:.2f})"
+            )
+            self._transition(BreakerState.OPEN)
+
+    def release(self):
+        """Give back a reserved slot without recording an outcome (e.g. cancelled call)."""
+        with self._lock:
+            if self._state == BreakerState.HALF_OPEN and self._half_open_in_flight > 0:
+                self._half_open_in_flight -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = len(self._window)
+            failures = sum(1 for failed, _ in self._window if failed)
+            retry_in = 0.0
+            if self._state == BreakerState.OPEN:
+                retry_in = max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+            return {
+                "state": self._state.value,
+                "window_calls": calls,
+                "window_failure_rate": round(failures / calls, 4) if calls else 0.0,
+                "retry_in_seconds": round(retry_in, 1),
+                "last_error": self._last_error,
+                **self._stats,
+            }
@@ -0,0 +1,188 @@
+"""
+Adaptive Concurrency Limiter
+Per-provider AIMD limit on in-flight LLM calls, used by AIGateway (async path).
+- Additive increase: each call that finishes under the target latency while
+  the limit is in use adds 1/limit (about +1 per limit's worth of calls)
+- Multiplicative decrease: a timeout/overload error or a call slower than the
+  target multiplies the limit by the backoff factor (at most once per
+  typical call duration, so one burst of slow calls counts once)
+- Calls over the limit wait in a bounded FIFO queue; a call is rejected
+  right away if the queue is full or its deadline cannot be met given the
+  current queue, and rejected when its deadline passes while still queued
+Rejections are not provider failures: the gateway falls back to the next
+provider without touching the circuit breaker.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+
+AI_LIMITER_ENABLED = os.getenv("AI_LIMITER_ENABLED", "true").lower() == "true"
+AI_LIMITER_INITIAL_LIMIT = int(os.getenv("AI_LIMITER_INITIAL_LIMIT", "4"))
+AI_LIMITER_MIN_LIMIT = int(os.getenv("AI_LIMITER_MIN_LIMIT", "1"))
+AI_LIMITER_MAX_LIMIT = int(os.getenv("AI_LIMITER_MAX_LIMIT", "32"))
+AI_LIMITER_TARGET_LATENCY_SECONDS = float(os.getenv("AI_LIMITER_TARGET_LATENCY_SECONDS", "30"))
+AI_LIMITER_BACKOFF = float(os.getenv("AI_LIMITER_BACKOFF", "0.7"))
+AI_LIMITER_MAX_QUEUE = int(os.getenv("AI_LIMITER_MAX_QUEUE", "64"))
+AI_LIMITER_QUEUE_TIMEOUT_SECONDS = float(os.getenv("AI_LIMITER_QUEUE_TIMEOUT_SECONDS", "60"))
+
+# Exception class names that mean "the provider is overloaded", not "bad request"
+OVERLOAD_ERROR_NAMES = ("Timeout", "DeadlineExceeded", "ResourceExhausted", "TooManyRequests", "ServiceUnavailable")
+
+
+def log_limiter(msg):
+    print(f"[CONCURRENCY LIMITER] {msg}", flush=True)
+
+
+def is_overload_error(error: BaseException) -> bool:
+    if isinstance(error, TimeoutError):
+        return True
+    return any(name in type(error).__name__ for name in OVERLOAD_ERROR_NAMES)
+
+
+class LimiterRejected(ConnectionError):
+    """The provider is at its concurrency limit and the call cannot wait."""
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a bounded, deadline-aware wait queue."""
+
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = AI_LIMITER_ENABLED,
+        initial_limit: int = AI_LIMITER_INITIAL_LIMIT,
+        min_limit: int = AI_LIMITER_MIN_LIMIT,
+        max_limit: int = AI_LIMITER_MAX_LIMIT,
+        target_latency: float = AI_LIMITER_TARGET_LATENCY_SECONDS,
+        backoff: float = AI_LIMITER_BACKOFF,
+        max_queue: int = AI_LIMITER_MAX_QUEUE
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.max_queue = max_queue
+
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._latency: float | None = None  # moving average of call latency
+        self._last_decrease = 0.0
+        self._stats = {"admitted": 0, "waited": 0, "rejected": 0, "increases": 0, "decreases": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _has_capacity(self) -> bool:
+        return self._in_flight < int(self.limit)
+
+    def _reject(self, reason: str):
+        self._stats["rejected"] += 1
+        raise LimiterRejected(f"{self.name} at concurrency limit {int(self.limit)}: {reason}")
+
+    def _expected_wait(self, position: int) -> float:
+        """Rough wait for the `position`-th queued call: queue drains `limit` calls per latency."""
+        return position * (self._latency or 0.0) / max(int(self.limit), 1)
+
+    async def acquire(self, deadline: float | None = None):
+        """Take a slot, waiting in the queue until `deadline` (time.monotonic())."""
+        if not self.enabled or (self._has_capacity() and not self._waiters):
+            self._in_flight += 1
+            self._stats["admitted"] += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue full")
+        now = time.monotonic()
+        if deadline is not None and now + self._expected_wait(len(self._waiters) + 1) > deadline:
+            self._reject("deadline cannot be met")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["waited"] += 1
+        try:
+            timeout = max(deadline - now, 0) if deadline is not None else None
+            await asyncio.wait_for(waiter, timeout=timeout)
+        except asyncio.TimeoutError:
+            self._remove_waiter(waiter)
+            self._reject("deadline passed while queued")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just as we were cancelled: give it back
+                self._in_flight -= 1
+                self._wake()
+            self._remove_waiter(waiter)
+            raise
+        self._stats["admitted"] += 1
+
+    def _remove_waiter(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _wake(self):
+        """Hand free slots to queued calls in FIFO order."""
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def release(self, latency: float | None = None, error: BaseException | None = None):
+        """
+        Free a slot and adapt the limit. latency=None (and no error) means the
+        call did not really run (cancelled), so the limit is left alone.
+        """
+        saturated = self._in_flight >= int(self.limit)
+        self._in_flight -= 1
+        if not self.enabled:
+            return
+
+        if latency is not None:
+            self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+
+        overloaded = (error is not None and is_overload_error(error)) or (
+            error is None and latency is not None and latency > self.target_latency
+        )
+        if overloaded:
+            self._decrease()
+        elif error is None and latency is not None and saturated:
+            self._increase()
+        self._wake()
+
+    def _increase(self):
+        if self.limit < self.max_limit:
+            before = int(self.limit)
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            if int(self.limit) > before:
+                self._stats["increases"] += 1
+
+    def _decrease(self):
+        now = time.monotonic()
+        # One decrease per typical call duration: calls that were already in
+        # flight when the provider slowed down must not cut the limit again
+        if now - self._last_decrease < (self._latency or 0.0):
+            return
+        self._last_decrease = now
+        before = int(self.limit)
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self._stats["decreases"] += 1
+        if int(self.limit) < before:
+            log_limiter(f"{self.name}: limit {before} -> {int(self.limit)}")
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "limit": int(self.limit),
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "latency_avg_seconds": round(self._latency, 3) if self._latency is not None else None,
+            **self._stats,
+        }
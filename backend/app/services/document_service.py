@@ -0,0 +1,68 @@
+import zlib
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import SourceDocument
+from app.services.job_service import utcnow
+
+
+class SourceDocumentService:
+    """
+    Store of uploaded documents keyed by content hash.
+    Keeps the extracted (normalized) text zlib-compressed, so a repeat upload
+    skips extraction, and the roadmap generated from it, so it can be cloned.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_id(self, document_id: int) -> SourceDocument | None:
+        return self.db.query(SourceDocument).filter(SourceDocument.id == document_id).first()
+
+    def get_by_hash(self, sha256: str) -> SourceDocument | None:
+        return self.db.query(SourceDocument).filter(SourceDocument.sha256 == sha256).first()
+
+    def create(
+        self,
+        sha256: str,
+        extension: str,
+        size_bytes: int,
+        text: str,
+        filename: str | None = None,
+        extraction: dict | None = None
+    ) -> SourceDocument:
+        document = SourceDocument(
+            sha256=sha256,
+            filename=filename,
+            extension=extension,
+            size_bytes=size_bytes,
+            text_compressed=zlib.compress(text.encode("utf-8"), 6),
+            text_length=len(text),
+            extraction=extraction,
+            upload_count=1
+        )
+        self.db.add(document)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Same document stored concurrently by another job
+            self.db.rollback()
+            return self.get_by_hash(sha256)
+        self.db.refresh(document)
+        return document
+
+    def get_text(self, document: SourceDocument) -> str:
+        return zlib.decompress(document.text_compressed).decode("utf-8")
+
+    def mark_used(self, document: SourceDocument) -> SourceDocument:
+        document.upload_count = (document.upload_count or 0) + 1
+        document.last_used_at = utcnow()
+        self.db.commit()
+        self.db.refresh(document)
+        return document
+
+    def set_roadmap(self, document: SourceDocument, roadmap_id: int) -> SourceDocument:
+        document.roadmap_id = roadmap_id
+        self.db.commit()
+        self.db.refresh(document)
+        return document
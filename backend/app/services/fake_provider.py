@@ -0,0 +1,182 @@
+"""
+Fake AI Provider
+Deterministic stand-in for Gemini/Ollama, for load tests and benchmarks.
+Enabled with AI_FAKE_PROVIDER=true (it then replaces the real providers).
+- Answers are built from the prompt: a 12-node roadmap, node content (single
+  or batched), or a plain-text summary; the same prompt gives the same answer
+- Latency is log-normal (AI_FAKE_LATENCY_MS median, AI_FAKE_LATENCY_SIGMA)
+- AI_FAKE_FAILURE_RATE of calls raise, AI_FAKE_MALFORMED_RATE of JSON answers
+  come back truncated; both are drawn from a seeded RNG (AI_FAKE_SEED)
+- Optional prompt evaluation cost (AI_FAKE_PROMPT_MS_PER_1K_TOKENS) for the
+  part of the prompt not shared with one of the last AI_FAKE_PROMPT_CACHE_SLOTS
+  prompts, like a local model's KV cache reusing a common prefix
+"""
+
+import asyncio
+import hashlib
+from collections import deque
+import json
+import math
+import os
+import random
+import re
+import threading
+from typing import AsyncIterator
+
+from . import ai_metrics
+from .ai_provider import AIProvider
+
+AI_FAKE_LATENCY_MS = float(os.getenv("AI_FAKE_LATENCY_MS", "800"))
+AI_FAKE_LATENCY_SIGMA = float(os.getenv("AI_FAKE_LATENCY_SIGMA", "0.5"))
+AI_FAKE_FAILURE_RATE = float(os.getenv("AI_FAKE_FAILURE_RATE", "0"))
+AI_FAKE_MALFORMED_RATE = float(os.getenv("AI_FAKE_MALFORMED_RATE", "0"))
+AI_FAKE_SEED = int(os.getenv("AI_FAKE_SEED", "42"))
+AI_FAKE_PROMPT_MS_PER_1K_TOKENS = float(os.getenv("AI_FAKE_PROMPT_MS_PER_1K_TOKENS", "0"))
+AI_FAKE_PROMPT_CACHE_SLOTS = int(os.getenv("AI_FAKE_PROMPT_CACHE_SLOTS", "4"))
+AI_FAKE_STREAM_CHUNK_WORDS = 8
+
+LEVELS = ("beginner", "intermediate", "advanced")
+_WORD_RE = re.compile(r"[A-Za-zÁÉÍÓÚÑáéíóúñ]{5,}")
+
+
+class FakeProvider(AIProvider):
+    """Prompt-driven fake provider with configurable latency and failures."""
+
+    def __init__(
+        self,
+        latency_ms: float = AI_FAKE_LATENCY_MS,
+        latency_sigma: float = AI_FAKE_LATENCY_SIGMA,
+        failure_rate: float = AI_FAKE_FAILURE_RATE,
+        malformed_rate: float = AI_FAKE_MALFORMED_RATE,
+        seed: int = AI_FAKE_SEED,
+        prompt_ms_per_1k_tokens: float = AI_FAKE_PROMPT_MS_PER_1K_TOKENS,
+        prompt_cache_slots: int = AI_FAKE_PROMPT_CACHE_SLOTS
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.prompt_ms_per_1k_tokens = prompt_ms_per_1k_tokens
+        self._prompt_slots: deque[str] = deque(maxlen=max(prompt_cache_slots, 1))
+
+    @property
+    def name(self) -> str:
+        return "Fake"
+
+    @property
+    def model(self) -> str:
+        return "fake"
+
+    @property
+    def is_available(self) -> bool:
+        return True
+
+    # -------------------------------------------------------------------------
+    # Behaviour
+    # -------------------------------------------------------------------------
+
+    def _draw(self) -> tuple[float, bool, bool]:
+        """(latency seconds, fail?, malformed?) for one call."""
+        with self._rng_lock:
+            latency = self.latency_ms / 1000 * math.exp(self._rng.gauss(0, self.latency_sigma))
+            return latency, self._rng.random() < self.failure_rate, self._rng.random() < self.malformed_rate
+
+    def _prompt_eval(self, prompt: str) -> tuple[float, int]:
+        """(seconds, cached tokens): cost of the prompt beyond its longest prefix shared with a recent prompt."""
+        if not self.prompt_ms_per_1k_tokens:
+            return 0.0, 0
+        with self._rng_lock:
+            best = max(self._prompt_slots, key=lambda cached: len(os.path.commonprefix([cached, prompt])), default="")
+            cached_chars = len(os.path.commonprefix([best, prompt]))
+            if best and cached_chars:
+                self._prompt_slots.remove(best)
+            self._prompt_slots.append(prompt)
+        evaluated_tokens = (len(prompt) - cached_chars) / 4
+        seconds = evaluated_tokens / 1000 * self.prompt_ms_per_1k_tokens / 1000
+        ai_metrics.observe_prompt_eval(self.name, self.model, seconds)
+        return seconds, cached_chars // 4
+
+    @staticmethod
+    def _topics(prompt: str, count: int) -> list[str]:
+        """Distinct words from the prompt, rotated by its hash (deterministic)."""
+        words = list(dict.fromkeys(word.capitalize() for word in _WORD_RE.findall(prompt)))
+        if not words:
+            words = ["Fundamentos"]
+        offset = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % len(words)
+        return [words[(offset + index) % len(words)] for index in range(count)]
+
+    @staticmethod
+    def _markdown(topic: str) -> str:
+        return (
+            f"## Introducción\n\n{topic} es un concepto central del material.\n\n"
+            f"## Conceptos\n\n- **{topic}**: definición y ejemplos.\n- **Aplicación**: uso práctico.\n\n"
+            f"## Tips\n\n- Repasa {topic.lower()} con ejercicios cortos."
+        )
+
+    def _roadmap(self, prompt: str) -> dict:
+        topics = self._topics(prompt, 12)
+        nodes = []
+        for order, topic in enumerate(topics):
+            level_index = order // 4
+            nodes.append({
+                "title": f"{topic} {order + 1}",
+                "description": f"Qué aprenderás sobre {topic.lower()}",
+                "level": LEVELS[level_index],
+                "order": order,
+                "prerequisites": [order - 4] if level_index else [],
+            })
+        return {"description": "Roadmap generado por el proveedor de prueba", "nodes": nodes}
+
+    def _answer(self, prompt: str, json_mode: bool, schema: dict | None) -> str:
+        properties = (schema or {}).get("properties", {})
+        if "description" in properties or ('"nodes": [' in prompt and "prerequisites" in prompt):
+            return json.dumps(self._roadmap(prompt), ensure_ascii=False)
+        if "nodes" in properties or '{"nodes": [{"index"' in prompt:
+            topics_block = prompt.split("Temas:", 1)[-1].split("Material:", 1)[0]
+            count = max(len(re.findall(r"^\d+\. ", topics_block, re.M)), 1)
+            items = [
+                {"index": index, "content": self._markdown(topic)}
+                for index, topic in enumerate(self._topics(topics_block, count), start=1)
+            ]
+            return json.dumps({"nodes": items}, ensure_ascii=False)
+        if "content" in properties or '{"content"' in prompt:
+            return json.dumps({"content": self._markdown(self._topics(prompt, 1)[0])}, ensure_ascii=False)
+        if json_mode:
+            return json.dumps({"content": self._markdown(self._topics(prompt, 1)[0])}, ensure_ascii=False)
+        return "\n".join(f"• {topic}: concepto clave del contenido" for topic in self._topics(prompt, 8))
+
+    def _respond(
+        self, prompt: str, json_mode: bool, schema: dict | None, fail: bool, malformed: bool, cached_tokens: int = 0
+    ) -> str:
+        if fail:
+            raise ConnectionError("Fake provider: injected failure")
+        text = self._answer(prompt, json_mode, schema)
+        if malformed and text.startswith("{"):
+            text = text[:len(text) // 2]
+        ai_metrics.record_tokens(self.name, self.model, len(prompt) // 4, len(text) // 4, cached_tokens)
+        return text
+
+    # -------------------------------------------------------------------------
+    # AIProvider
+    # -------------------------------------------------------------------------
+
+    async def agenerate(self, prompt: str, json_mode: bool = False, schema: dict | None = None) -> str:
+        latency, fail, malformed = self._draw()
+        prompt_seconds, cached_tokens = self._prompt_eval(prompt)
+        await asyncio.sleep(latency + prompt_seconds)
+        return self._respond(prompt, json_mode, schema, fail, malformed, cached_tokens)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        latency, fail, malformed = self._draw()
+        prompt_seconds, cached_tokens = self._prompt_eval(prompt)
+        await asyncio.sleep(prompt_seconds)
+        words = self._respond(prompt, False, None, fail, malformed, cached_tokens).split(" ")
+        chunks = [
+            " ".join(words[start:start + AI_FAKE_STREAM_CHUNK_WORDS]) + " "
+            for start in range(0, len(words), AI_FAKE_STREAM_CHUNK_WORDS)
+        ]
+        for chunk in chunks:
+            await asyncio.sleep(latency / len(chunks))
+            yield chunk
@@ -0,0 +1,105 @@
+"""
+Request Hedging
+Optional tail-latency mitigation for AIGateway.
+If the primary provider has not answered after a delay derived from its
+recent latency percentile, the same prompt is sent to the secondary
+provider; the first successful answer wins and the other call is cancelled.
+"""
+
+import os
+import threading
+from collections import deque
+
+AI_HEDGING_ENABLED = os.getenv("AI_HEDGING_ENABLED", "false").lower() == "true"
+AI_HEDGE_PERCENTILE = float(os.getenv("AI_HEDGE_PERCENTILE", "95"))
+AI_HEDGE_MIN_SAMPLES = int(os.getenv("AI_HEDGE_MIN_SAMPLES", "20"))
+AI_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("AI_HEDGE_DEFAULT_DELAY_SECONDS", "20"))
+AI_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("AI_HEDGE_MIN_DELAY_SECONDS", "2"))
+AI_HEDGE_MAX_DELAY_SECONDS = float(os.getenv("AI_HEDGE_MAX_DELAY_SECONDS", "60"))
+AI_LATENCY_WINDOW = 200
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies (seconds) per provider. Failed calls
+    count too, and a call cancelled before it finished (e.g. the loser of a
+    hedge race) contributes the time it had run: a lower bound, but without
+    it a provider would be measured only by the calls it won.
+    """
+
+    def __init__(self, window_size: int = AI_LATENCY_WINDOW):
+        self._samples: dict[str, deque[float]] = {}
+        self._window_size = window_size
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, latency: float):
+        with self._lock:
+            self._samples.setdefault(provider, deque(maxlen=self._window_size)).append(latency)
+
+    def count(self, provider: str) -> int:
+        with self._lock:
+            return len(self._samples.get(provider, ()))
+
+    def percentile(self, provider: str, pct: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+class HedgingPolicy:
+    """Decides the hedge delay and keeps counters to tune it."""
+
+    def __init__(
+        self,
+        latencies: LatencyTracker,
+        enabled: bool = AI_HEDGING_ENABLED,
+        percentile: float = AI_HEDGE_PERCENTILE,
+        min_samples: int = AI_HEDGE_MIN_SAMPLES,
+        default_delay: float = AI_HEDGE_DEFAULT_DELAY_SECONDS,
+        min_delay: float = AI_HEDGE_MIN_DELAY_SECONDS,
+        max_delay: float = AI_HEDGE_MAX_DELAY_SECONDS,
+    ):
+        self.latencies = latencies
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._stats = {"hedged_requests": 0, "hedges_fired": 0, "hedge_wins": 0, "primary_wins": 0}
+
+    def delay_for(self, provider: str) -> float:
+        """Seconds to wait for the primary before firing the hedge."""
+        if self.latencies.count(provider) < self.min_samples:
+            return self.default_delay
+        delay = self.latencies.percentile(provider, self.percentile)
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def record_request(self):
+        with self._lock:
+            self._stats["hedged_requests"] += 1
+
+    def record_fired(self):
+        with self._lock:
+            self._stats["hedges_fired"] += 1
+
+    def record_winner(self, hedge_won: bool):
+        with self._lock:
+            self._stats["hedge_wins" if hedge_won else "primary_wins"] += 1
+
+    def stats(self, primary: str | None = None) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        fired = stats["hedges_fired"]
+        stats["fire_rate"] = round(fired / stats["hedged_requests"], 4) if stats["hedged_requests"] else 0.0
+        stats["hedge_win_rate"] = round(stats["hedge_wins"] / fired, 4) if fired else 0.0
+        stats["enabled"] = self.enabled
+        stats["percentile"] = self.percentile
+        if primary:
+            stats["primary"] = primary
+            stats["current_delay_seconds"] = round(self.delay_for(primary), 3)
+        return stats
@@ -0,0 +1,222 @@
+"""
+Job Queue
+Bounded pool of asyncio workers that run background generation jobs.
+- Jobs are rows in generation_jobs (see JobService); any replica may claim them
+- Each replica runs AI_JOB_WORKERS workers (0 = enqueue only, never execute)
+- Handlers are registered per job kind and report stage/progress as they go
+- Jobs left RUNNING by a dead worker are requeued after AI_JOB_STALE_SECONDS
+Uploaded files are streamed to AI_UPLOAD_DIR, which must be shared by all
+replicas that run workers. A job's upload (payload["upload_path"]) is
+removed once the job completes or fails, never when it is requeued.
+"""
+
+import asyncio
+import hashlib
+import os
+import socket
+from typing import Awaitable, BinaryIO, Callable
+
+from app.core.database import SessionLocal
+from app.services.job_service import JobService
+
+AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", "2"))
+AI_JOB_POLL_SECONDS = float(os.getenv("AI_JOB_POLL_SECONDS", "2"))
+AI_JOB_STALE_SECONDS = float(os.getenv("AI_JOB_STALE_SECONDS", "600"))
+AI_JOB_MAX_ATTEMPTS = int(os.getenv("AI_JOB_MAX_ATTEMPTS", "2"))
+AI_UPLOAD_DIR = os.getenv("AI_UPLOAD_DIR", ".cache/uploads")
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def log_jobs(msg):
+    print(f"[JOB QUEUE] {msg}", flush=True)
+
+
+def _with_jobs(method, *args):
+    """Run a JobService method in a short-lived session (called from a thread)."""
+    db = SessionLocal()
+    try:
+        return method(JobService(db), *args)
+    finally:
+        db.close()
+
+
+def _claim(worker_id: str) -> tuple[str, str, dict] | None:
+    db = SessionLocal()
+    try:
+        job = JobService(db).claim_next(worker_id)
+        return (job.id, job.kind, job.payload) if job else None
+    finally:
+        db.close()
+
+
+class UploadTooLarge(ValueError):
+    """The upload went over the size limit while it was being copied."""
+
+
+def save_upload(job_id: str, extension: str, source: BinaryIO, max_bytes: int) -> tuple[str, int, str]:
+    """
+    Copy an upload to AI_UPLOAD_DIR in UPLOAD_CHUNK_SIZE chunks, hashing it
+    on the way, so no more than one chunk is held in memory. Stops (and
+    removes the partial file) as soon as it is larger than max_bytes.
+    Returns (path, size in bytes, SHA-256 hex digest).
+    """
+    os.makedirs(AI_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(AI_UPLOAD_DIR, f"{job_id}.{extension}")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload larger than {max_bytes} bytes")
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        remove_upload(path)
+        raise
+    return path, size, digest.hexdigest()
+
+
+def remove_upload(path: str | None):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+class JobContext:
+    """What a handler sees: the job id, its payload and a progress reporter."""
+
+    def __init__(self, job_id: str, payload: dict):
+        self.job_id = job_id
+        self.payload = payload
+
+    async def report(self, stage: str, progress: int):
+        await asyncio.to_thread(_with_jobs, JobService.report_progress, self.job_id, stage, progress)
+
+
+JobHandler = Callable[[JobContext], Awaitable[dict]]
+
+
+class JobWorkerPool:
+    def __init__(
+        self,
+        workers: int = AI_JOB_WORKERS,
+        poll_seconds: float = AI_JOB_POLL_SECONDS,
+        stale_seconds: float = AI_JOB_STALE_SECONDS,
+        max_attempts: int = AI_JOB_MAX_ATTEMPTS,
+    ):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self._handlers: dict[str, JobHandler] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+        self._host = f"{socket.gethostname()}:{os.getpid()}"
+
+    def register(self, kind: str, handler: JobHandler):
+        self._handlers[kind] = handler
+
+    def notify(self):
+        """Wake idle local workers right away instead of waiting for the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        if self.workers <= 0:
+            log_jobs("Workers disabled on this replica")
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._janitor()))
+        log_jobs(f"Started {self.workers} workers ({self._host})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _wait(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _worker(self, index: int):
+        worker_id = f"{self._host}:{index}"
+        while True:
+            try:
+                claimed = await asyncio.to_thread(_claim, worker_id)
+            except Exception as e:
+                log_jobs(f"{worker_id}: claim failed: {e}")
+                claimed = None
+
+            if claimed is None:
+                await self._wait()
+                continue
+
+            await self._run(*claimed)
+
+    async def _run(self, job_id: str, kind: str, payload: dict):
+        handler = self._handlers.get(kind)
+        if handler is None:
+            await asyncio.to_thread(_with_jobs, JobService.fail, job_id, f"Tipo de trabajo desconocido: {kind}")
+            await asyncio.to_thread(remove_upload, payload.get("upload_path"))
+            return
+
+        log_jobs(f"Job {job_id} ({kind}) started")
+        beat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await handler(JobContext(job_id, payload))
+        except asyncio.CancelledError:
+            # Shutting down: let another worker (or replica) pick it up,
+            # so the upload must stay
+            await asyncio.to_thread(_with_jobs, JobService.requeue, job_id)
+            raise
+        except Exception as e:
+            log_jobs(f"Job {job_id} failed: {e}")
+            await asyncio.to_thread(_with_jobs, JobService.fail, job_id, str(e))
+            await asyncio.to_thread(remove_upload, payload.get("upload_path"))
+            return
+        finally:
+            beat.cancel()
+
+        await asyncio.to_thread(_with_jobs, JobService.complete, job_id, result)
+        await asyncio.to_thread(remove_upload, payload.get("upload_path"))
+        log_jobs(f"Job {job_id} done")
+
+    async def _heartbeat(self, job_id: str):
+        """Keep heartbeat_at fresh while a long stage (e.g. an LLM call) runs."""
+        while True:
+            await asyncio.sleep(self.stale_seconds / 4)
+            try:
+                await asyncio.to_thread(_with_jobs, JobService.heartbeat, job_id)
+            except Exception as e:
+                log_jobs(f"Heartbeat for job {job_id} failed: {e}")
+
+    async def _recover_stale(self):
+        """Requeue jobs abandoned by crashed workers; fail (and clean up) those out of attempts."""
+        requeued, failed = await asyncio.to_thread(
+            _with_jobs, JobService.recover_stale, self.stale_seconds, self.max_attempts
+        )
+        if requeued:
+            log_jobs(f"Requeued {requeued} stale jobs")
+            self.notify()
+        for job_id, payload in failed:
+            log_jobs(f"Job {job_id} failed: out of attempts")
+            await asyncio.to_thread(remove_upload, payload.get("upload_path"))
+
+    async def _janitor(self):
+        """Periodically recover jobs abandoned by crashed workers."""
+        while True:
+            try:
+                await self._recover_stale()
+            except Exception as e:
+                log_jobs(f"Stale job recovery failed: {e}")
+            await asyncio.sleep(max(self.stale_seconds / 4, self.poll_seconds))
+
+
+job_workers = JobWorkerPool()
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+from app.models import GenerationJob, JobStatus
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobService:
+    """
+    Persistence for background generation jobs.
+    The table doubles as the work queue: on PostgreSQL workers claim rows with
+    SELECT ... FOR UPDATE SKIP LOCKED, so several API replicas can share it;
+    on SQLite (local runs) a conditional UPDATE on the status does the claim.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_id(self, job_id: str) -> GenerationJob | None:
+        return self.db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+
+    def create(self, job_id: str, kind: str, payload: dict) -> GenerationJob:
+        job = GenerationJob(
+            id=job_id,
+            kind=kind,
+            status=JobStatus.QUEUED,
+            stage="queued",
+            progress=0,
+            payload=payload,
+            attempts=0
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def _queued(self):
+        return (
+            self.db.query(GenerationJob)
+            .filter(GenerationJob.status == JobStatus.QUEUED)
+            .order_by(GenerationJob.created_at, GenerationJob.id)
+        )
+
+    def claim_next(self, worker_id: str) -> GenerationJob | None:
+        """Atomically move the oldest queued job to RUNNING and return it."""
+        now = utcnow()
+        if self.db.get_bind().dialect.name == "postgresql":
+            job = self._queued().with_for_update(skip_locked=True).first()
+            if job is None:
+                self.db.rollback()
+                return None
+            job.status = JobStatus.RUNNING
+            job.worker_id = worker_id
+            job.attempts += 1
+            job.started_at = now
+            job.heartbeat_at = now
+            self.db.commit()
+            self.db.refresh(job)
+            return job
+
+        # SQLite: no row locks; whoever flips the status first owns the job
+        for (candidate_id,) in self._queued().with_entities(GenerationJob.id).limit(5).all():
+            claimed = (
+                self.db.query(GenerationJob)
+                .filter(GenerationJob.id == candidate_id, GenerationJob.status == JobStatus.QUEUED)
+                .update(
+                    {
+                        GenerationJob.status: JobStatus.RUNNING,
+                        GenerationJob.worker_id: worker_id,
+                        GenerationJob.attempts: GenerationJob.attempts + 1,
+                        GenerationJob.started_at: now,
+                        GenerationJob.heartbeat_at: now,
+                    },
+                    synchronize_session=False
+                )
+            )
+            self.db.commit()
+            if claimed:
+                return self.get_by_id(candidate_id)
+        return None
+
+    def _update(self, job_id: str, **values) -> bool:
+        updated = (
+            self.db.query(GenerationJob)
+            .filter(GenerationJob.id == job_id)
+            .update(values, synchronize_session=False)
+        )
+        self.db.commit()
+        return bool(updated)
+
+    def report_progress(self, job_id: str, stage: str, progress: int) -> bool:
+        """Update stage/progress; also serves as the worker heartbeat."""
+        return self._update(job_id, stage=stage, progress=progress, heartbeat_at=utcnow())
+
+    def heartbeat(self, job_id: str) -> bool:
+        return self._update(job_id, heartbeat_at=utcnow())
+
+    def complete(self, job_id: str, result: dict) -> bool:
+        return self._update(
+            job_id,
+            status=JobStatus.SUCCEEDED,
+            stage="done",
+            progress=100,
+            result=result,
+            error=None,
+            finished_at=utcnow()
+        )
+
+    def fail(self, job_id: str, error: str) -> bool:
+        return self._update(job_id, status=JobStatus.FAILED, error=error, finished_at=utcnow())
+
+    def requeue(self, job_id: str) -> bool:
+        """Hand a running job back to the queue (e.g. worker shutting down)."""
+        return self._update(job_id, status=JobStatus.QUEUED, stage="queued", worker_id=None)
+
+    def recover_stale(self, stale_seconds: float, max_attempts: int) -> tuple[int, list[tuple[str, dict]]]:
+        """
+        Running jobs whose heartbeat is older than stale_seconds belong to a
+        worker that died: requeue them, or fail them once out of attempts.
+        Returns (jobs requeued, [(job id, payload)] of the jobs failed), so the
+        caller can clean up what the failed jobs left behind.
+        """
+        cutoff = utcnow() - timedelta(seconds=stale_seconds)
+        stale = (
+            self.db.query(GenerationJob)
+            .filter(GenerationJob.status == JobStatus.RUNNING, GenerationJob.heartbeat_at < cutoff)
+        )
+        # Row locks (PostgreSQL) keep a late heartbeat from reviving a job
+        # between this select and the update below
+        exhausted = (
+            stale.filter(GenerationJob.attempts >= max_attempts)
+            .with_entities(GenerationJob.id, GenerationJob.payload)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if exhausted:
+            stale.filter(GenerationJob.id.in_([job_id for job_id, _ in exhausted])).update(
+                {
+                    GenerationJob.status: JobStatus.FAILED,
+                    GenerationJob.error: "El proceso que ejecutaba el trabajo dejó de responder",
+                    GenerationJob.finished_at: utcnow(),
+                },
+                synchronize_session=False
+            )
+        requeued = (
+            stale.filter(GenerationJob.attempts < max_attempts)
+            .update(
+                {
+                    GenerationJob.status: JobStatus.QUEUED,
+                    GenerationJob.stage: "queued",
+                    GenerationJob.worker_id: None,
+                },
+                synchronize_session=False
+            )
+        )
+        self.db.commit()
+        return requeued, [(job_id, payload or {}) for job_id, payload in exhausted]
@@ -0,0 +1,102 @@
+"""
+Model Warm-up
+Keeps the local Ollama model(s) resident so no request pays the load time.
+- At startup every model in OLLAMA_WARMUP_MODELS is loaded in the background
+- Every OLLAMA_KEEPALIVE_INTERVAL_SECONDS the models are pinged again, which
+  also reloads a model Ollama evicted (restart, memory pressure)
+- Calls pass OLLAMA_KEEP_ALIVE, so models also stay loaded between pings
+The load state is exposed on GET /ready: the instance only reports ready
+once every model is loaded, so the load balancer keeps traffic on warm ones.
+"""
+
+import asyncio
+import os
+import time
+
+from app.services.ai_provider import OllamaProvider
+from app.services.ai_service import gateway
+
+OLLAMA_WARMUP_ENABLED = os.getenv("OLLAMA_WARMUP_ENABLED", "false").lower() == "true"
+OLLAMA_WARMUP_MODELS = [m.strip() for m in os.getenv("OLLAMA_WARMUP_MODELS", "").split(",") if m.strip()]
+OLLAMA_WARMUP_TIMEOUT = float(os.getenv("OLLAMA_WARMUP_TIMEOUT", "180"))
+OLLAMA_KEEPALIVE_INTERVAL_SECONDS = float(os.getenv("OLLAMA_KEEPALIVE_INTERVAL_SECONDS", "240"))
+# Seconds between retries while a model fails to load
+OLLAMA_WARMUP_RETRY_SECONDS = 15
+
+
+def log_warmup(msg):
+    print(f"[MODEL WARMUP] {msg}", flush=True)
+
+
+class ModelWarmup:
+    """Loads models at startup, pings them periodically and tracks their state."""
+
+    def __init__(
+        self,
+        provider: OllamaProvider,
+        models: list[str] | None = None,
+        enabled: bool = OLLAMA_WARMUP_ENABLED,
+        interval: float = OLLAMA_KEEPALIVE_INTERVAL_SECONDS,
+        timeout: float = OLLAMA_WARMUP_TIMEOUT
+    ):
+        self.provider = provider
+        self.models = models or [provider.model]
+        self.enabled = enabled
+        self.interval = interval
+        self.timeout = timeout
+        # model -> {"state": pending|loading|ready|failed, "load_ms", "last_ping", "error"}
+        self._models: dict[str, dict] = {model: {"state": "pending"} for model in self.models}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        if not self.enabled:
+            return True
+        return all(info["state"] == "ready" for info in self._models.values())
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "models": {model: dict(info) for model, info in self._models.items()},
+        }
+
+    async def start(self):
+        if not self.enabled:
+            log_warmup("Disabled")
+            return
+        self._task = asyncio.create_task(self._run())
+        log_warmup(f"Warming up {', '.join(self.models)}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _load(self, model: str) -> bool:
+        info = self._models[model]
+        if info["state"] != "ready":
+            info["state"] = "loading"
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.provider.aload(model), timeout=self.timeout)
+        except Exception as e:
+            info.update(state="failed", error=str(e) or type(e).__name__)
+            log_warmup(f"{model}: load failed: {info['error']}")
+            return False
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        if info["state"] != "ready":
+            info["load_ms"] = elapsed_ms
+            log_warmup(f"{model}: ready in {elapsed_ms}ms")
+        info.update(state="ready", error=None, last_ping=time.time())
+        return True
+
+    async def _run(self):
+        while True:
+            results = await asyncio.gather(*(self._load(model) for model in self.models))
+            # Retry failed loads sooner than the regular keep-alive ping
+            await asyncio.sleep(self.interval if all(results) else min(self.interval, OLLAMA_WARMUP_RETRY_SECONDS))
+
+
+model_warmup = ModelWarmup(gateway.ollama, models=OLLAMA_WARMUP_MODELS)
@@ -0,0 +1,123 @@
+"""
+Source Retrieval
+Chunking + BM25 ranking over the extracted source document (pure Python).
+- At upload time the full text is split into overlapping chunks and each
+  chunk's term counts are persisted (RoadmapSourceChunk)
+- At node generation time the chunks are ranked against the node's
+  title + description and only the top-k are sent as prompt material
+"""
+
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+
+AI_RETRIEVAL_CHUNK_SIZE = int(os.getenv("AI_RETRIEVAL_CHUNK_SIZE", "1200"))
+AI_RETRIEVAL_CHUNK_OVERLAP = int(os.getenv("AI_RETRIEVAL_CHUNK_OVERLAP", "150"))
+AI_RETRIEVAL_TOP_K = int(os.getenv("AI_RETRIEVAL_TOP_K", "4"))
+MATERIAL_SEPARATOR = "\n\n[...]\n\n"
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = frozenset("""
+a al algo algunas algunos ante antes como con contra cual cuando de del desde donde durante e el
+ella ellas ellos en entre era es esa esas ese eso esos esta estas este esto estos fue fueron ha
+han hay la las le les lo los mas me mi mis mucho muy no nos o os otra otro para pero poco por porque
+que se ser si sin sobre su sus tambien te tiene todo todos tu un una unas uno unos y ya
+an and are as at be by for from has in is it its of on or that the this to was were which with
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, strip accents, split into words and drop stopwords/1-char tokens."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return [w for w in _WORD_RE.findall(text) if len(w) > 1 and w not in STOPWORDS]
+
+
+def chunk_text(
+    text: str,
+    chunk_size: int = AI_RETRIEVAL_CHUNK_SIZE,
+    overlap: int = AI_RETRIEVAL_CHUNK_OVERLAP
+) -> list[str]:
+    """
+    Split text into ~chunk_size chunks, preferring paragraph, then sentence
+    boundaries. Consecutive chunks share up to `overlap` characters.
+    """
+    text = text.strip()
+    if not text:
+        return []
+
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            window = text[start:end]
+            cut = window.rfind("\n\n")
+            if cut < chunk_size * 0.5:
+                cut = window.rfind(". ")
+            if cut >= chunk_size * 0.5:
+                end = start + cut + 1
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def term_counts(text: str) -> dict[str, int]:
+    return dict(Counter(tokenize(text)))
+
+
+class ChunkIndex:
+    """BM25 index over pre-tokenized chunks: [(content, term_counts)]."""
+
+    def __init__(self, chunks: list[tuple[str, dict[str, int]]]):
+        self.chunks = chunks
+        self.lengths = [sum(counts.values()) for _, counts in chunks]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        doc_freq: Counter = Counter()
+        for _, counts in chunks:
+            doc_freq.update(counts.keys())
+        n = len(chunks)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def search(self, query: str, k: int = AI_RETRIEVAL_TOP_K) -> list[tuple[int, float]]:
+        """Return [(chunk_position, score)] for the top-k chunks, best first."""
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        if not terms or not self.chunks:
+            return []
+
+        scores = []
+        for position, (_, counts) in enumerate(self.chunks):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[position] / (self.avg_length or 1))
+            score = 0.0
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            if score > 0:
+                scores.append((position, score))
+
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:k]
+
+    def material_for(self, query: str, k: int = AI_RETRIEVAL_TOP_K) -> str:
+        """Top-k chunks joined in document order (empty string if nothing matches)."""
+        positions = sorted(position for position, _ in self.search(query, k))
+        return MATERIAL_SEPARATOR.join(self.chunks[position][0] for position in positions)
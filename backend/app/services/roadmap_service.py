@@ -1,5 +1,7 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session, joinedload
-from app.models import Roadmap, RoadmapNode, NodeConnection, NodeLevel
+from app.models import Roadmap, RoadmapNode, NodeConnection, NodeLevel, RoadmapSourceChunk
+from app.services.retrieval import ChunkIndex, chunk_text, term_counts
 
 
 class RoadmapService:
@@ -49,6 +51,47 @@ class RoadmapService:
         self.db.refresh(roadmap)
         return roadmap
 
+    def create_graph(
+        self,
+        roadmap: Roadmap,
+        nodes: list[dict],
+        edges: list[tuple[int, int]],
+        source_text: str | None = None
+    ) -> Roadmap:
+        """
+        Insert a new roadmap with its nodes and connections (and, given
+        source_text, its retrieval chunks) in one transaction: all or nothing.
+        nodes: RoadmapNode column values (title, description, level,
+        position_x, position_y, order_index...).
+        edges: (from, to) positions in `nodes`.
+        Nodes go in one bulk INSERT ... RETURNING, connections and chunks
+        in one executemany each.
+        """
+        try:
+            self.db.add(roadmap)
+            self.db.flush()
+
+            node_ids = []
+            if nodes:
+                node_ids = self.db.scalars(
+                    insert(RoadmapNode).returning(RoadmapNode.id, sort_by_parameter_order=True),
+                    [{**node, "roadmap_id": roadmap.id} for node in nodes]
+                ).all()
+            if edges:
+                self.db.execute(
+                    insert(NodeConnection),
+                    [{"from_node_id": node_ids[start], "to_node_id": node_ids[end]} for start, end in edges]
+                )
+            if source_text:
+                chunk_rows = source_chunk_rows(roadmap.id, source_text)
+                if chunk_rows:
+                    self.db.execute(insert(RoadmapSourceChunk), chunk_rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return roadmap
+
     def update(self, roadmap_id: int, **kwargs) -> Roadmap | None:
         roadmap = self.get_by_id(roadmap_id)
         if not roadmap:
@@ -60,6 +103,65 @@ class RoadmapService:
         self.db.refresh(roadmap)
         return roadmap
 
+    def clone(self, roadmap_id: int, title: str, creator_id: int) -> Roadmap | None:
+        """
+        Copy a roadmap (nodes with their content, connections and source
+        chunks) in one transaction. Progress is not copied.
+        """
+        source = self.get_with_connections(roadmap_id)
+        if not source:
+            return None
+
+        try:
+            roadmap = Roadmap(
+                title=title,
+                description=source.description,
+                source_content=source.source_content,
+                creator_id=creator_id
+            )
+            self.db.add(roadmap)
+            self.db.flush()
+
+            node_ids: dict[int, RoadmapNode] = {}
+            for node in source.nodes:
+                node_ids[node.id] = RoadmapNode(
+                    roadmap_id=roadmap.id,
+                    title=node.title,
+                    description=node.description,
+                    content=node.content,
+                    level=node.level,
+                    position_x=node.position_x,
+                    position_y=node.position_y,
+                    order_index=node.order_index
+                )
+            self.db.add_all(node_ids.values())
+            self.db.flush()
+
+            self.db.add_all(
+                NodeConnection(
+                    from_node_id=node_ids[connection.from_node_id].id,
+                    to_node_id=node_ids[connection.to_node_id].id
+                )
+                for node in source.nodes
+                for connection in node.connections_from
+                if connection.to_node_id in node_ids
+            )
+            self.db.add_all(
+                RoadmapSourceChunk(
+                    roadmap_id=roadmap.id,
+                    position=chunk.position,
+                    content=chunk.content,
+                    term_counts=chunk.term_counts
+                )
+                for chunk in source.source_chunks
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.db.refresh(roadmap)
+        return roadmap
+
     def delete(self, roadmap_id: int) -> bool:
         roadmap = self.get_by_id(roadmap_id)
         if not roadmap:
@@ -151,3 +253,30 @@ class NodeService:
             .filter(RoadmapNode.roadmap_id == roadmap_id)
             .all()
         )
+
+
+def source_chunk_rows(roadmap_id: int, text: str) -> list[dict]:
+    """RoadmapSourceChunk column values for a document: its chunks with their term counts."""
+    return [
+        {"roadmap_id": roadmap_id, "position": position, "content": chunk, "term_counts": term_counts(chunk)}
+        for position, chunk in enumerate(chunk_text(text))
+    ]
+
+
+class SourceChunkService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_roadmap(self, roadmap_id: int) -> list[RoadmapSourceChunk]:
+        return (
+            self.db.query(RoadmapSourceChunk)
+            .filter(RoadmapSourceChunk.roadmap_id == roadmap_id)
+            .order_by(RoadmapSourceChunk.position)
+            .all()
+        )
+
+    def get_index(self, roadmap_id: int) -> ChunkIndex | None:
+        chunks = self.get_by_roadmap(roadmap_id)
+        if not chunks:
+            return None
+        return ChunkIndex([(chunk.content, chunk.term_counts) for chunk in chunks])
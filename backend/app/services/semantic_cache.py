@@ -0,0 +1,200 @@
+"""
+Semantic Cache
+Node content reused across roadmaps that share topics ("Variables y tipos",
+"Introducción a SQL"...).
+- Each node is embedded locally from its normalized title + description:
+  hashing-trick TF-IDF vectors in NumPy (title words, title bigrams and
+  description words), no external embedding service
+- Lookups rank cached nodes by cosine similarity: at or above
+  AI_SEMANTIC_CACHE_THRESHOLD the cached Markdown is served as is; above
+  AI_SEMANTIC_CACHE_DRAFT_THRESHOLD it is passed to the LLM as a draft
+- The cache is warmed from nodes that already have content in the database
+  and keeps the most recent AI_SEMANTIC_CACHE_MAX_ENTRIES nodes
+"""
+
+import hashlib
+import math
+import os
+import threading
+from collections import Counter
+from typing import NamedTuple
+
+import numpy as np
+
+from app.core.database import SessionLocal
+from app.models import RoadmapNode
+from app.services.retrieval import tokenize
+
+AI_SEMANTIC_CACHE_ENABLED = os.getenv("AI_SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+AI_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("AI_SEMANTIC_CACHE_THRESHOLD", "0.9"))
+AI_SEMANTIC_CACHE_DRAFT_THRESHOLD = float(os.getenv("AI_SEMANTIC_CACHE_DRAFT_THRESHOLD", "0.6"))
+AI_SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("AI_SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+AI_SEMANTIC_CACHE_DIMENSIONS = int(os.getenv("AI_SEMANTIC_CACHE_DIMENSIONS", "1024"))
+
+# Relative weight of each feature family in the embedding
+TITLE_WEIGHT = 2.0
+BIGRAM_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def log_semantic_cache(msg):
+    print(f"[SEMANTIC CACHE] {msg}", flush=True)
+
+
+class SemanticMatch(NamedTuple):
+    title: str
+    content: str
+    score: float
+    servable: bool  # similar enough to be served without calling the LLM
+
+
+def node_features(title: str, description: str = "") -> Counter:
+    """Weighted feature counts: title words, title bigrams, description words."""
+    features: Counter = Counter()
+    title_tokens = tokenize(title)
+    for token in title_tokens:
+        features[f"t:{token}"] += TITLE_WEIGHT
+    for first, second in zip(title_tokens, title_tokens[1:]):
+        features[f"b:{first}_{second}"] += BIGRAM_WEIGHT
+    for token in tokenize(description or ""):
+        features[f"d:{token}"] += DESCRIPTION_WEIGHT
+    return features
+
+
+def _bucket(feature: str, dimensions: int) -> tuple[int, float]:
+    """Stable hash of a feature -> (bucket index, sign)."""
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return value % dimensions, 1.0 if value >> 63 else -1.0
+
+
+def embed_tf(title: str, description: str = "", dimensions: int = AI_SEMANTIC_CACHE_DIMENSIONS) -> np.ndarray:
+    """Hashed, sublinear term-frequency vector (IDF is applied at query time)."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature, weight in node_features(title, description).items():
+        index, sign = _bucket(feature, dimensions)
+        vector[index] += sign * (1.0 + math.log(weight))
+    return vector
+
+
+class SemanticCache:
+    """
+    Fixed-capacity ring of node embeddings (oldest entry evicted first).
+    Document frequencies are kept per hash bucket, so IDF weights follow
+    the cached vocabulary without re-embedding anything.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = AI_SEMANTIC_CACHE_ENABLED,
+        max_entries: int = AI_SEMANTIC_CACHE_MAX_ENTRIES,
+        dimensions: int = AI_SEMANTIC_CACHE_DIMENSIONS,
+        threshold: float = AI_SEMANTIC_CACHE_THRESHOLD,
+        draft_threshold: float = AI_SEMANTIC_CACHE_DRAFT_THRESHOLD
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.dimensions = dimensions
+        self.threshold = threshold
+        self.draft_threshold = draft_threshold
+        self._matrix = np.zeros((max_entries, dimensions), dtype=np.float32)
+        self._squares = np.zeros((max_entries, dimensions), dtype=np.float32)  # _matrix ** 2, for row norms
+        self._document_frequency = np.zeros(dimensions, dtype=np.float32)
+        self._entries: list[tuple[str, str] | None] = [None] * max_entries  # (title, content)
+        self._keys: dict[tuple[str, ...], int] = {}  # normalized title+description -> row
+        self._row_keys: list[tuple[str, ...] | None] = [None] * max_entries
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "drafts": 0, "misses": 0, "stored": 0}
+
+    @staticmethod
+    def _key(title: str, description: str) -> tuple[str, ...]:
+        return tuple(tokenize(title)) + ("|",) + tuple(tokenize(description or ""))
+
+    def _idf(self) -> np.ndarray:
+        return np.log((1.0 + self._size) / (1.0 + self._document_frequency)) + 1.0
+
+    def add(self, title: str, description: str, content: str):
+        if not self.enabled or not content or not content.strip():
+            return
+        key = self._key(title, description)
+        vector = embed_tf(title, description, self.dimensions)
+        if not vector.any():
+            return
+        with self._lock:
+            row = self._keys.get(key)
+            if row is None:
+                row = self._next
+                self._next = (self._next + 1) % self.max_entries
+                old_key = self._row_keys[row]
+                if old_key is not None:
+                    self._keys.pop(old_key, None)
+                else:
+                    self._size += 1
+            self._document_frequency -= self._matrix[row] != 0
+            self._matrix[row] = vector
+            self._squares[row] = vector * vector
+            self._document_frequency += vector != 0
+            self._entries[row] = (title, content)
+            self._row_keys[row] = key
+            self._keys[key] = row
+            self._stats["stored"] += 1
+
+    def lookup(self, title: str, description: str = "") -> SemanticMatch | None:
+        """Best cached node at or above the draft threshold, or None."""
+        if not self.enabled:
+            return None
+        query = embed_tf(title, description, self.dimensions)
+        with self._lock:
+            if self._size == 0 or not query.any():
+                self._stats["misses"] += 1
+                return None
+            # cos(M * idf, q * idf) without materializing the weighted matrix
+            idf = self._idf()
+            idf_squared = idf * idf
+            row_norms = np.sqrt(self._squares[:self._size] @ idf_squared)
+            norms = row_norms * np.linalg.norm(query * idf)
+            scores = self._matrix[:self._size] @ (query * idf_squared) / np.where(norms > 0, norms, 1.0)
+            row = int(np.argmax(scores))
+            score = float(scores[row])
+            if score < self.draft_threshold:
+                self._stats["misses"] += 1
+                return None
+            servable = score >= self.threshold
+            self._stats["hits" if servable else "drafts"] += 1
+            cached_title, content = self._entries[row]
+        return SemanticMatch(cached_title, content, round(score, 4), servable)
+
+    def load_from_db(self, db) -> int:
+        """Warm the cache with the most recent nodes that already have content."""
+        if not self.enabled:
+            return 0
+        nodes = (
+            db.query(RoadmapNode.title, RoadmapNode.description, RoadmapNode.content)
+            .filter(RoadmapNode.content.isnot(None), RoadmapNode.content != "")
+            .order_by(RoadmapNode.id.desc())
+            .limit(self.max_entries)
+            .all()
+        )
+        # Oldest first, so the newest end up last in the ring
+        for title, description, content in reversed(nodes):
+            self.add(title, description or "", content)
+        log_semantic_cache(f"Warmed with {len(nodes)} nodes")
+        return len(nodes)
+
+    def warm(self):
+        """load_from_db() in its own session; startup must not fail if the DB is not ready."""
+        db = SessionLocal()
+        try:
+            self.load_from_db(db)
+        except Exception as e:
+            log_semantic_cache(f"Warm-up skipped: {e}")
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"enabled": self.enabled, "entries": self._size, **self._stats}
+
+
+node_content_cache = SemanticCache()
@@ -0,0 +1,64 @@
+import asyncio
+
+from app.services.ai_cache import AIResponseCache, make_cache_key
+
+
+def test_cache_key_depends_on_every_input():
+    base = make_cache_key("gemini", "flash", True, "prompt", {"type": "object"})
+    assert base == make_cache_key("gemini", "flash", True, "prompt", {"type": "object"})
+    assert base != make_cache_key("ollama", "flash", True, "prompt", {"type": "object"})
+    assert base != make_cache_key("gemini", "flash", False, "prompt", {"type": "object"})
+    assert base != make_cache_key("gemini", "flash", True, "prompt", None)
+
+
+def test_memory_tier_is_lru():
+    cache = AIResponseCache(enabled=True, cache_dir=None, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.stats()["memory_evictions"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    cache = AIResponseCache(enabled=True, cache_dir=str(tmp_path))
+    cache.set("a", "1")
+    cache.flush()
+    assert cache.stats()["pending_disk_writes"] == 0
+
+    reopened = AIResponseCache(enabled=True, cache_dir=str(tmp_path))
+    assert reopened.stats()["disk_entries"] == 1
+    assert asyncio.run(reopened.aget("a")) == "1"
+    assert reopened.stats()["disk_hits"] == 1
+    # Promoted to memory
+    assert reopened.get("a") == "1"
+    assert reopened.stats()["memory_hits"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = AIResponseCache(enabled=True, cache_dir=str(tmp_path), max_entries=2, disk_max_entries=3)
+    for key in "abcde":
+        cache.set(key, key)
+    cache.flush()
+    stats = cache.stats()
+    assert stats["disk_entries"] == 3 and stats["disk_evictions"] == 2
+    reopened = AIResponseCache(enabled=True, cache_dir=str(tmp_path), disk_max_entries=3)
+    assert reopened.get("a") is None and reopened.get("e") == "e"
+
+
+def test_expired_entries_are_misses():
+    cache = AIResponseCache(enabled=True, cache_dir=None, ttl_seconds=1)
+    cache._remember("old", 0.0, "value")
+    assert cache.get("old") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = AIResponseCache(enabled=True, cache_dir=str(tmp_path))
+    cache.set("a", "1")
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["disk_entries"] == 0
+    assert AIResponseCache(enabled=True, cache_dir=str(tmp_path)).get("a") is None
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db
+from app.main import app
+from app.models import JobStatus, Roadmap, User
+from app.routers import ai as ai_router
+from app.services import job_queue
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_service import gateway
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.concurrency_limiter import AdaptiveLimiter
+from app.services.fake_provider import FakeProvider
+from app.services.job_queue import job_workers
+from app.services.job_service import JobService
+from app.tests.conftest import TestingSessionLocal
+
+DOCUMENT = ("Los grafos modelan relaciones entre objetos. " * 10).encode()
+
+
+@pytest.fixture
+def api(db, tmp_path, monkeypatch):
+    """Client without the lifespan: the test runs each job itself."""
+    monkeypatch.setattr(ai_router, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(job_queue, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(job_queue, "AI_UPLOAD_DIR", str(tmp_path))
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Route every gateway call to a FakeProvider and count them."""
+    fake = FakeProvider(latency_ms=0)
+    calls = []
+    answer = fake.agenerate
+
+    async def agenerate(prompt, json_mode=False, schema=None):
+        calls.append(prompt)
+        return await answer(prompt, json_mode, schema)
+
+    monkeypatch.setattr(fake, "agenerate", agenerate)
+    monkeypatch.setattr(gateway, "fake", fake)
+    monkeypatch.setattr(gateway, "cache", AIResponseCache(enabled=False))
+    monkeypatch.setitem(gateway.breakers, fake.name, CircuitBreaker(fake.name))
+    monkeypatch.setitem(gateway.limiters, fake.name, AdaptiveLimiter(fake.name))
+    return calls
+
+
+@pytest.fixture
+def creator(db):
+    user = User(email="docente@example.com", username="docente", password="x", full_name="Docente")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def upload(api: TestClient, creator: User, title: str) -> dict:
+    response = api.post(
+        "/ai/generate-roadmap",
+        data={"title": title, "creator_id": str(creator.id)},
+        files={"file": ("grafos.txt", DOCUMENT, "text/plain")},
+    )
+    assert response.status_code == 202
+    return response.json()
+
+
+def run_job(db, job_id: str):
+    job = JobService(db).get_by_id(job_id)
+    asyncio.run(job_workers._run(job.id, job.kind, job.payload))
+    db.expire_all()
+    return JobService(db).get_by_id(job_id)
+
+
+def test_second_upload_clones_roadmap_without_ai(api, provider, creator, db, tmp_path):
+    first = upload(api, creator, "Grafos")
+    assert first["deduplicated"] is False
+    job = run_job(db, first["job_id"])
+    assert job.status == JobStatus.SUCCEEDED, job.error
+    assert job.result["deduplicated"] is False
+    ai_calls = len(provider)
+    assert ai_calls > 0
+    assert list(tmp_path.iterdir()) == []
+
+    second = upload(api, creator, "Grafos (copia)")
+    assert second["deduplicated"] is True
+    # The known document's text is stored: the duplicate file is gone before the job runs
+    assert JobService(db).get_by_id(second["job_id"]).payload["upload_path"] is None
+    assert list(tmp_path.iterdir()) == []
+
+    clone = run_job(db, second["job_id"])
+    assert clone.status == JobStatus.SUCCEEDED, clone.error
+    assert clone.result["deduplicated"] is True
+    assert clone.result["reused_from"] == job.result["roadmap_id"]
+    assert clone.result["roadmap_id"] != job.result["roadmap_id"]
+    assert clone.result["nodes_count"] == job.result["nodes_count"]
+    assert len(provider) == ai_calls
+    assert db.query(Roadmap).count() == 2
+
+
+def test_renamed_file_is_rejected_before_saving(api, creator, db, tmp_path):
+    response = api.post(
+        "/ai/generate-roadmap",
+        data={"title": "Grafos", "creator_id": str(creator.id)},
+        files={"file": ("grafos.pdf", DOCUMENT, "application/pdf")},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "El contenido del archivo no corresponde a un .pdf"
+    assert list(tmp_path.iterdir()) == []
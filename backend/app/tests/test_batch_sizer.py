@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.services import ai_service
+from app.services.ai_service import CHARS_PER_TOKEN, BatchSizer
+
+
+def make_sizer() -> BatchSizer:
+    return BatchSizer(output_tokens=8192, tokens_per_node=700, max_batch=8)
+
+
+def test_size_is_capped_by_max_batch_and_budget():
+    assert make_sizer().size() == 8
+    assert BatchSizer(output_tokens=1000, tokens_per_node=200, max_batch=8).size() == 4
+    # Never below one node, even when a single node does not fit
+    assert BatchSizer(output_tokens=100, tokens_per_node=700, max_batch=8).size() == 1
+
+
+def test_observe_moves_estimate_toward_samples():
+    sizer = make_sizer()
+    for _ in range(30):
+        sizer.observe(2000 * CHARS_PER_TOKEN)
+    assert sizer.tokens_per_node == pytest.approx(2000, rel=1e-3)
+    assert sizer.size() == 3
+
+
+def test_overflow_never_shrinks_batches_below_two():
+    sizer = make_sizer()
+    for _ in range(10):
+        sizer.overflow()
+    assert sizer.tokens_per_node == pytest.approx(sizer.budget / 2)
+    assert sizer.size() == 2
+
+
+def test_overflow_ceiling_is_at_least_the_default():
+    sizer = BatchSizer(output_tokens=1000, tokens_per_node=700, max_batch=8)
+    sizer.overflow()
+    assert sizer.tokens_per_node == 700
+
+
+def test_relax_decays_toward_default():
+    sizer = make_sizer()
+    for _ in range(10):
+        sizer.overflow()
+    for _ in range(5):
+        sizer.relax()
+    assert sizer.size() == 4
+    for _ in range(50):
+        sizer.relax()
+    assert sizer.tokens_per_node == pytest.approx(700, rel=1e-3)
+
+
+@pytest.fixture
+def fake_generation(monkeypatch):
+    """Batch and per-node generation without a provider or semantic cache."""
+    calls = {"batches": [], "single": []}
+
+    async def fake_batch(source_content, nodes):
+        calls["batches"].append([node["id"] for node in nodes])
+        if any(node["title"] == "truncated" for node in nodes):
+            raise ValueError("Could not parse JSON from response")
+        if any(node["title"] == "offline" for node in nodes):
+            raise ConnectionError("provider down")
+        # The model skips nodes titled "skip"
+        return {node["id"]: {"content": "x" * 400} for node in nodes if node["title"] != "skip"}
+
+    async def fake_single(source_content, node_title, node_description, lookup=True, draft=None):
+        calls["single"].append(node_title)
+        return {"content": "single"}
+
+    monkeypatch.setattr(ai_service, "agenerate_content_batch", fake_batch)
+    monkeypatch.setattr(ai_service, "generate_node_content", fake_single)
+    monkeypatch.setattr(ai_service, "cached_node_content", lambda title, description: None)
+    monkeypatch.setattr(ai_service.node_content_cache, "add", lambda *args: None)
+    return calls
+
+
+def run_batch(nodes: list[dict], sizer: BatchSizer) -> dict:
+    async def collect():
+        return {
+            node_id: (data, error)
+            async for node_id, data, error in ai_service.generate_nodes_content_batch("src", nodes, 2, sizer)
+        }
+
+    return asyncio.run(collect())
+
+
+def make_nodes(titles: list[str]) -> list[dict]:
+    return [{"id": index, "title": title, "description": ""} for index, title in enumerate(titles)]
+
+
+def test_batch_missing_nodes_fall_back_per_node(fake_generation):
+    sizer = BatchSizer(output_tokens=8192, tokens_per_node=700, max_batch=3)
+    results = run_batch(make_nodes(["a", "skip", "c", "d", "e"]), sizer)
+    assert sorted(results) == [0, 1, 2, 3, 4]
+    assert results[1] == ({"content": "single"}, None)
+    assert sorted(fake_generation["batches"]) == [[0, 1, 2], [3, 4]]
+    assert fake_generation["single"] == ["skip"]
+    # Answered nodes fed the estimate (400 chars = 100 tokens per node)
+    assert sizer.tokens_per_node < 700
+
+
+def test_unparseable_batch_overflows_the_sizer(fake_generation):
+    sizer = make_sizer()
+    results = run_batch(make_nodes(["a", "truncated", "c"]), sizer)
+    assert all(error is None for _, error in results.values())
+    assert sorted(fake_generation["single"]) == ["a", "c", "truncated"]
+    # One overflow (x1.5) followed by three relax() steps toward 700
+    assert sizer.tokens_per_node == pytest.approx(700 + 350 * 0.8 ** 3)
+
+
+def test_transport_error_does_not_overflow_the_sizer(fake_generation):
+    sizer = make_sizer()
+    run_batch(make_nodes(["a", "offline"]), sizer)
+    assert sizer.tokens_per_node == 700
+    assert len(fake_generation["single"]) == 2
+
+
+def test_single_node_batch_skips_the_batch_call(fake_generation):
+    sizer = BatchSizer(output_tokens=8192, tokens_per_node=700, max_batch=2)
+    run_batch(make_nodes(["a", "b", "c"]), sizer)
+    assert fake_generation["batches"] == [[0, 1]]
+    assert fake_generation["single"] == ["c"]
@@ -0,0 +1,123 @@
+import pytest
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import BreakerState, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        "test",
+        window_size=10,
+        min_calls=4,
+        failure_rate_threshold=0.5,
+        slow_call_seconds=5,
+        slow_call_rate_threshold=0.8,
+        open_seconds=30,
+        half_open_max_calls=1,
+    )
+
+
+def trip(breaker: CircuitBreaker):
+    for _ in range(breaker.min_calls):
+        assert breaker.allow_request()
+        breaker.record_failure(RuntimeError("boom"))
+    assert breaker.state == BreakerState.OPEN
+
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.allow_request()
+
+
+def test_stays_closed_below_failure_rate(clock):
+    breaker = make_breaker()
+    for failed in (True, False, False, False, True):
+        breaker.record_failure() if failed else breaker.record_success(0.1)
+    assert breaker.state == BreakerState.CLOSED
+
+
+def test_trips_on_failure_rate(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    snapshot = breaker.snapshot()
+    assert snapshot["trips"] == 1
+    assert snapshot["last_error"] == "boom"
+    assert snapshot["retry_in_seconds"] == 30
+
+
+def test_trips_on_slow_calls(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_success(6.0)
+    assert breaker.state == BreakerState.OPEN
+    assert breaker.snapshot()["slow_calls"] == 4
+
+
+def test_open_rejects_until_cooldown(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    assert not breaker.allow_request()
+    assert not breaker.probe_due()
+    clock.now += 30
+    assert breaker.probe_due()
+    assert breaker.allow_request()
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_limits_trial_calls(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    # A released slot (cancelled call) can be taken again
+    breaker.release()
+    assert breaker.allow_request()
+
+
+def test_half_open_success_closes_with_fresh_window(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_success(0.2)
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.snapshot()["window_calls"] == 0
+    # Old failures are forgotten: it takes a full window of failures to trip again
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == BreakerState.CLOSED
+
+
+@pytest.mark.parametrize("outcome", ["failure", "slow"])
+def test_half_open_failure_or_slow_call_reopens(clock, outcome):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30
+    assert breaker.allow_request()
+    if outcome == "failure":
+        breaker.record_failure()
+    else:
+        breaker.record_success(10.0)
+    assert breaker.state == BreakerState.OPEN
+    assert breaker.snapshot()["trips"] == 2
+    assert not breaker.allow_request()
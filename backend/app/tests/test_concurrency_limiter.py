@@ -0,0 +1,190 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.concurrency_limiter import AdaptiveLimiter, LimiterRejected, is_overload_error
+
+
+def test_is_overload_error():
+    class ResourceExhausted(Exception):
+        pass
+
+    assert is_overload_error(TimeoutError())
+    assert is_overload_error(asyncio.TimeoutError())
+    assert is_overload_error(ResourceExhausted())
+    assert not is_overload_error(ValueError("bad json"))
+
+
+def test_queued_calls_are_admitted_in_fifo_order():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=True, initial_limit=2, max_queue=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        order = []
+
+        async def queued(label):
+            await limiter.acquire()
+            order.append(label)
+
+        tasks = [asyncio.create_task(queued(label)) for label in ("first", "second")]
+        await asyncio.sleep(0)
+        assert limiter.snapshot()["queued"] == 2 and order == []
+
+        limiter.release(0.1)
+        await asyncio.sleep(0)
+        assert order == ["first"]
+        limiter.release(0.1)
+        await asyncio.gather(*tasks)
+        assert order == ["first", "second"]
+        assert limiter.in_flight == 2
+
+    asyncio.run(scenario())
+
+
+def test_rejects_when_queue_is_full():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=True, initial_limit=1, max_queue=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(LimiterRejected, match="queue full"):
+            await limiter.acquire()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert limiter.snapshot()["rejected"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_rejects_upfront_when_deadline_cannot_be_met():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=True, initial_limit=1)
+        limiter._latency = 10.0
+        await limiter.acquire()
+        with pytest.raises(LimiterRejected, match="cannot be met"):
+            await limiter.acquire(deadline=time.monotonic() + 1)
+        assert limiter.snapshot()["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejects_when_deadline_passes_while_queued():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=True, initial_limit=1)
+        await limiter.acquire()
+        with pytest.raises(LimiterRejected, match="passed while queued"):
+            await limiter.acquire(deadline=time.monotonic() + 0.05)
+        assert limiter.snapshot()["queued"] == 0
+        # The expired waiter does not take the slot once it frees up
+        limiter.release(0.1)
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=True, initial_limit=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert limiter.snapshot()["queued"] == 0
+        limiter.release(0.1)
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_additive_increase_only_when_saturated():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=True, initial_limit=2, target_latency=10)
+        await limiter.acquire()
+        limiter.release(0.1)
+        assert limiter.limit == 2
+
+        await limiter.acquire()
+        await limiter.acquire()
+        limiter.release(0.1)
+        assert limiter.limit == 2.5
+        await limiter.acquire()
+        limiter.release(0.1)
+        assert limiter.limit == 2.9
+        assert limiter.snapshot()["increases"] == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("latency, error", [(1.0, TimeoutError()), (20.0, None)])
+def test_multiplicative_decrease_on_overload_or_slow_call(latency, error):
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=True, initial_limit=8, target_latency=10, backoff=0.5)
+        await limiter.acquire()
+        limiter.release(latency, error=error)
+        assert limiter.limit == 4
+        assert limiter.snapshot()["decreases"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_decrease_at_most_once_per_call_duration():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=True, initial_limit=8, target_latency=10, backoff=0.5)
+        for _ in range(3):
+            await limiter.acquire()
+        for _ in range(3):
+            limiter.release(30.0)
+        # The calls were in flight together: one slowdown, one decrease
+        assert limiter.limit == 4
+        limiter._last_decrease -= 60
+        await limiter.acquire()
+        limiter.release(30.0)
+        assert limiter.limit == 2
+
+    asyncio.run(scenario())
+
+
+def test_limit_stays_within_bounds():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=True, initial_limit=1, min_limit=1, max_limit=2)
+        for _ in range(5):
+            limiter._last_decrease = 0.0
+            await limiter.acquire()
+            limiter.release(1.0, error=TimeoutError())
+        assert limiter.limit == 1
+
+        for _ in range(5):
+            for _ in range(int(limiter.limit)):
+                await limiter.acquire()
+            while limiter.in_flight:
+                limiter.release(0.1)
+        assert limiter.limit == 2
+
+    asyncio.run(scenario())
+
+
+def test_non_overload_error_and_cancelled_call_leave_limit():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=True, initial_limit=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        limiter.release(1.0, error=ValueError("bad json"))
+        limiter.release()
+        assert limiter.limit == 2
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_disabled_limiter_never_waits():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", enabled=False, initial_limit=1, max_queue=0)
+        for _ in range(5):
+            await limiter.acquire()
+        assert limiter.in_flight == 5
+        limiter.release(100.0, error=TimeoutError())
+        assert limiter.limit == 1 and limiter.in_flight == 4
+
+    asyncio.run(scenario())
@@ -0,0 +1,62 @@
+import pytest
+
+from app.utils import file_type
+from app.utils.file_type import PDF_MIME, detect_mime, matches_extension
+
+PDF_HEAD = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n"
+PNG_HEAD = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x10\x00\x00\x00\x10\x08\x06\x00\x00\x00"
+TEXT_HEAD = "Apuntes de grafos: recorridos en anchura y profundidad.\n".encode()
+
+
+@pytest.fixture
+def without_magic(monkeypatch):
+    monkeypatch.setattr(file_type, "magic", None)
+
+
+def test_pdf_is_accepted_as_pdf():
+    assert detect_mime(PDF_HEAD) == PDF_MIME
+    assert matches_extension(detect_mime(PDF_HEAD), "pdf")
+
+
+def test_renamed_file_is_rejected_as_pdf():
+    mime = detect_mime(PNG_HEAD)
+    assert mime != PDF_MIME
+    assert not matches_extension(mime, "pdf")
+    assert not matches_extension(detect_mime(TEXT_HEAD), "pdf")
+
+
+def test_plain_text_is_accepted_as_txt():
+    assert detect_mime(TEXT_HEAD).startswith("text/")
+    assert matches_extension(detect_mime(TEXT_HEAD), "txt")
+    assert not matches_extension(detect_mime(PDF_HEAD), "txt")
+
+
+def test_text_like_application_mimes_match_txt():
+    assert matches_extension("application/json", "txt")
+    assert not matches_extension("application/zip", "txt")
+    assert not matches_extension("text/plain", "docx")
+
+
+def test_fallback_detects_pdf_signature(without_magic):
+    assert detect_mime(PDF_HEAD) == PDF_MIME
+    assert detect_mime(b"\n\n" + PDF_HEAD) == PDF_MIME
+
+
+def test_fallback_detects_text(without_magic):
+    assert detect_mime(TEXT_HEAD) == "text/plain"
+
+
+def test_fallback_binary_is_octet_stream(without_magic):
+    assert detect_mime(PNG_HEAD) == "application/octet-stream"
+    assert not matches_extension(detect_mime(PNG_HEAD), "pdf")
+    assert not matches_extension(detect_mime(PNG_HEAD), "txt")
+
+
+def test_magic_error_falls_back(monkeypatch):
+    class BrokenMagic:
+        @staticmethod
+        def from_buffer(head, mime=False):
+            raise OSError("libmagic failed")
+
+    monkeypatch.setattr(file_type, "magic", BrokenMagic)
+    assert detect_mime(PDF_HEAD) == PDF_MIME
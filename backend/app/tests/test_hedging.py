@@ -0,0 +1,55 @@
+from app.services.hedging import HedgingPolicy, LatencyTracker
+
+
+def make_policy(latencies: LatencyTracker) -> HedgingPolicy:
+    return HedgingPolicy(
+        latencies, enabled=True, percentile=90, min_samples=5, default_delay=20, min_delay=2, max_delay=60
+    )
+
+
+def test_latency_tracker_percentile_and_window():
+    tracker = LatencyTracker(window_size=10)
+    assert tracker.percentile("gemini", 50) is None
+    for latency in range(1, 21):
+        tracker.record("gemini", float(latency))
+    # Only the last 10 samples (11..20) are kept
+    assert tracker.count("gemini") == 10
+    assert tracker.percentile("gemini", 0) == 11
+    assert tracker.percentile("gemini", 50) == 15
+    assert tracker.percentile("gemini", 100) == 20
+    assert tracker.count("ollama") == 0
+
+
+def test_delay_uses_default_until_enough_samples():
+    tracker = LatencyTracker()
+    policy = make_policy(tracker)
+    for _ in range(4):
+        tracker.record("gemini", 5.0)
+    assert policy.delay_for("gemini") == 20
+    tracker.record("gemini", 5.0)
+    assert policy.delay_for("gemini") == 5.0
+
+
+def test_delay_is_clamped():
+    tracker = LatencyTracker()
+    policy = make_policy(tracker)
+    for _ in range(5):
+        tracker.record("fast", 0.1)
+        tracker.record("slow", 300.0)
+    assert policy.delay_for("fast") == 2
+    assert policy.delay_for("slow") == 60
+
+
+def test_stats_rates():
+    policy = make_policy(LatencyTracker())
+    assert policy.stats()["fire_rate"] == 0.0
+    for _ in range(4):
+        policy.record_request()
+    policy.record_fired()
+    policy.record_fired()
+    policy.record_winner(hedge_won=True)
+    policy.record_winner(hedge_won=False)
+    stats = policy.stats(primary="gemini")
+    assert stats["fire_rate"] == 0.5
+    assert stats["hedge_win_rate"] == 0.5
+    assert stats["current_delay_seconds"] == 20
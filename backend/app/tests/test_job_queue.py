@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import io
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import JobStatus
+from app.services import job_queue
+from app.services.job_queue import JobWorkerPool, UploadTooLarge, save_upload
+from app.services.job_service import JobService
+from app.tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "AI_UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(job_queue, "UPLOAD_CHUNK_SIZE", 4)
+    return tmp_path
+
+
+@pytest.fixture
+def jobs(db, monkeypatch):
+    monkeypatch.setattr(job_queue, "SessionLocal", TestingSessionLocal)
+    return JobService(db)
+
+
+def test_save_upload_streams_and_hashes(upload_dir):
+    data = b"contenido del pdf"
+    path, size, digest = save_upload("job1", "pdf", io.BytesIO(data), max_bytes=100)
+    assert path == os.path.join(str(upload_dir), "job1.pdf")
+    assert size == len(data)
+    assert digest == hashlib.sha256(data).hexdigest()
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+
+def test_save_upload_too_large_removes_partial_file(upload_dir):
+    with pytest.raises(UploadTooLarge):
+        save_upload("job2", "pdf", io.BytesIO(b"x" * 20), max_bytes=10)
+    assert not os.path.exists(upload_dir / "job2.pdf")
+
+
+def make_upload(upload_dir, job_id: str) -> str:
+    path = upload_dir / f"{job_id}.txt"
+    path.write_bytes(b"texto")
+    return str(path)
+
+
+def run_job(jobs: JobService, job_id: str, kind: str, payload: dict, handler=None):
+    jobs.create(job_id, kind, payload)
+    pool = JobWorkerPool(workers=1, stale_seconds=60)
+    if handler is not None:
+        pool.register("roadmap", handler)
+    asyncio.run(pool._run(job_id, kind, payload))
+    jobs.db.expire_all()
+    return jobs.get_by_id(job_id)
+
+
+def test_completed_job_stores_result_and_removes_upload(jobs, upload_dir):
+    async def handler(ctx):
+        await ctx.report("generating", 50)
+        return {"roadmap_id": 7}
+
+    payload = {"upload_path": make_upload(upload_dir, "ok")}
+    job = run_job(jobs, "ok", "roadmap", payload, handler)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"roadmap_id": 7} and job.progress == 100
+    assert not os.path.exists(payload["upload_path"])
+
+
+def test_failed_job_records_error_and_removes_upload(jobs, upload_dir):
+    async def handler(ctx):
+        raise ValueError("PDF sin texto")
+
+    payload = {"upload_path": make_upload(upload_dir, "bad")}
+    job = run_job(jobs, "bad", "roadmap", payload, handler)
+    assert job.status == JobStatus.FAILED and job.error == "PDF sin texto"
+    assert not os.path.exists(payload["upload_path"])
+
+
+def test_unknown_kind_fails(jobs, upload_dir):
+    payload = {"upload_path": make_upload(upload_dir, "unknown")}
+    job = run_job(jobs, "unknown", "quiz", payload)
+    assert job.status == JobStatus.FAILED and "quiz" in job.error
+    assert not os.path.exists(payload["upload_path"])
+
+
+def test_cancelled_job_is_requeued_and_keeps_upload(jobs, upload_dir):
+    async def handler(ctx):
+        raise asyncio.CancelledError()
+
+    payload = {"upload_path": make_upload(upload_dir, "shutdown")}
+    with pytest.raises(asyncio.CancelledError):
+        run_job(jobs, "shutdown", "roadmap", payload, handler)
+    jobs.db.expire_all()
+    job = jobs.get_by_id("shutdown")
+    assert job.status == JobStatus.QUEUED and job.worker_id is None
+    assert os.path.exists(payload["upload_path"])
+
+
+def test_stale_jobs_are_requeued_or_failed_with_their_upload_removed(jobs, upload_dir):
+    for job_id in ("retry", "exhausted"):
+        jobs.create(job_id, "roadmap", {"upload_path": make_upload(upload_dir, job_id)})
+        jobs.claim_next("dead-worker")
+    long_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+    jobs._update("retry", heartbeat_at=long_ago)
+    jobs._update("exhausted", heartbeat_at=long_ago, attempts=2)
+
+    pool = JobWorkerPool(workers=1, stale_seconds=60, max_attempts=2)
+    asyncio.run(pool._recover_stale())
+    jobs.db.expire_all()
+
+    retry = jobs.get_by_id("retry")
+    assert retry.status == JobStatus.QUEUED and retry.worker_id is None
+    assert os.path.exists(retry.payload["upload_path"])
+
+    exhausted = jobs.get_by_id("exhausted")
+    assert exhausted.status == JobStatus.FAILED and exhausted.error
+    assert not os.path.exists(exhausted.payload["upload_path"])
@@ -0,0 +1,80 @@
+import pytest
+
+from app.services.ai_service import IncrementalJSONParser, parse_json_response
+
+
+def test_parse_plain_object():
+    assert parse_json_response('{"a": 1, "b": [1, 2]}') == {"a": 1, "b": [1, 2]}
+
+
+def test_parse_skips_fences_and_chatter():
+    text = 'Claro, aquí está:\n```json\n{"content": "## Intro"}\n```\nEspero que ayude {extra}'
+    assert parse_json_response(text) == {"content": "## Intro"}
+
+
+def test_parse_drops_trailing_commas():
+    assert parse_json_response('{"nodes": [{"index": 1,}, {"index": 2},],}') == {
+        "nodes": [{"index": 1}, {"index": 2}]
+    }
+
+
+def test_parse_accepts_raw_newlines_in_strings():
+    assert parse_json_response('{"content": "line 1\nline 2"}') == {"content": "line 1\nline 2"}
+
+
+def test_parse_skips_invalid_candidate_before_object():
+    assert parse_json_response('Usa {placeholder} así: {"ok": true}') == {"ok": True}
+
+
+def test_parse_ignores_braces_inside_strings():
+    assert parse_json_response('{"content": "usa } y { en texto, ]"}') == {"content": "usa } y { en texto, ]"}
+
+
+@pytest.mark.parametrize("text", ["", "sin json", '{"content": "cortado', "[1, 2, 3]"])
+def test_parse_failure_raises_value_error(text):
+    with pytest.raises(ValueError):
+        parse_json_response(text)
+
+
+def test_incremental_parser_char_by_char():
+    text = 'Respuesta: {"content": "a, b}", "items": [1, 2,],} y algo más'
+    parser = IncrementalJSONParser()
+    done_at = None
+    for position, char in enumerate(text):
+        if parser.feed(char):
+            done_at = position
+            break
+    assert parser.result() == {"content": "a, b}", "items": [1, 2]}
+    # Stops right at the closing brace, without reading the chatter after it
+    assert text[done_at] == "}" and text[done_at + 1:] == " y algo más"
+    assert parser.chars_read == done_at + 1
+
+
+def test_incremental_parser_comma_split_across_chunks():
+    parser = IncrementalJSONParser()
+    assert not parser.feed('{"a": [1,')
+    assert not parser.feed(" ")
+    assert parser.feed("]}")
+    assert parser.result() == {"a": [1]}
+
+
+def test_incremental_parser_escaped_quote_split_across_chunks():
+    parser = IncrementalJSONParser()
+    assert not parser.feed('{"a": "say \\')
+    assert parser.feed('"hi\\""}')
+    assert parser.result() == {"a": 'say "hi"'}
+
+
+def test_incremental_parser_incomplete_raises():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": {"b": 1}')
+    assert not parser.complete
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def test_incremental_parser_ignores_feed_after_complete():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"a": 1}')
+    assert parser.feed('{"b": 2}')
+    assert parser.result() == {"a": 1}
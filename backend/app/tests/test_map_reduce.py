@@ -0,0 +1,66 @@
+import asyncio
+
+from app.services import ai_service
+from app.services.ai_service import AI_MAP_REDUCE_MAX_CHARS, build_digest, spread
+from app.utils.pdf_extraction import plan_extraction
+
+
+def book(chapters: int, chapter_length: int) -> str:
+    paragraph = "Texto de relleno sobre el tema del capítulo. " * 20
+    return "\n\n".join(
+        f"Capítulo {number}\n\n" + (paragraph + "\n\n") * (chapter_length // len(paragraph))
+        for number in range(1, chapters + 1)
+    )
+
+
+def test_spread_keeps_first_and_last():
+    assert spread(list(range(10)), 4) == [0, 3, 6, 9]
+    assert spread(list(range(3)), 5) == [0, 1, 2]
+    assert spread(list(range(10)), 1) == [0]
+
+
+def test_digest_of_long_document_reaches_last_chapter(monkeypatch):
+    seen = []
+
+    async def fake_summary(chunk, title, part, parts, max_length):
+        seen.append(chunk)
+        return f"resumen {part}"
+
+    monkeypatch.setattr(ai_service, "summarize_chunk", fake_summary)
+    content = book(chapters=40, chapter_length=20000) + "\n\nEpílogo: conclusiones del libro."
+    assert len(content) > 2 * AI_MAP_REDUCE_MAX_CHARS
+
+    digest = asyncio.run(build_digest(content, "Libro", chunk_size=12000, max_length=5000))
+    assert len(seen) == AI_MAP_REDUCE_MAX_CHARS // 12000
+    assert seen[0].startswith("Capítulo 1\n")
+    assert seen[-1].endswith("Epílogo: conclusiones del libro.")
+    assert digest.endswith(f"resumen {len(seen)}")
+
+
+def test_short_document_is_not_digested():
+    assert asyncio.run(build_digest("Capítulo 1", "Libro", max_length=5000)) == "Capítulo 1"
+
+
+def test_pdf_source_is_sampled_when_map_reduce_is_on(monkeypatch):
+    calls = []
+
+    async def fake_extract(source, budget=None, mode=None):
+        calls.append((budget, mode))
+        return ai_service.ExtractionResult("texto", [1], 1, mode)
+
+    monkeypatch.setattr(ai_service, "aextract_pdf", fake_extract)
+    asyncio.run(ai_service.aextract_text_from_pdf("libro.pdf"))
+    assert calls == [(AI_MAP_REDUCE_MAX_CHARS, "sample")]
+
+
+def test_sample_extraction_fits_the_budget():
+    pages = [f"Página {number} " + "palabra " * 500 for number in range(1, 201)]
+    plan = plan_extraction(page_count=200, budget=50000, mode="sample", workers=1)
+    try:
+        wave = next(plan)
+        while True:
+            wave = plan.send([pages[index] for index in wave])
+    except StopIteration as done:
+        result = done.value
+    assert len(result.text) <= 50000 * 1.05
+    assert result.pages_used[0] == 1 and result.pages_used[-1] == 200
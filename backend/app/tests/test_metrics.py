@@ -0,0 +1,61 @@
+import pytest
+
+from app.utils.metrics import Counter, Histogram, Metric, Registry
+
+
+def test_metric_is_abstract():
+    with pytest.raises(TypeError):
+        Metric("base", "Not renderable")
+
+
+def test_counter_render():
+    counter = Counter("ai_calls_total", "AI calls", ("provider", "outcome"))
+    counter.inc(provider="gemini", outcome="ok")
+    counter.inc(2, provider="gemini", outcome="ok")
+    counter.inc(0.5, provider="ollama", outcome="error")
+    assert counter.value(provider="gemini", outcome="ok") == 3
+    assert counter.value(provider="none", outcome="ok") == 0
+    assert counter.render() == [
+        "# HELP ai_calls_total AI calls",
+        "# TYPE ai_calls_total counter",
+        'ai_calls_total{provider="gemini",outcome="ok"} 3',
+        'ai_calls_total{provider="ollama",outcome="error"} 0.5',
+    ]
+
+
+def test_counter_without_labels():
+    counter = Counter("jobs_total", "Jobs")
+    counter.inc()
+    assert counter.render()[-1] == "jobs_total 1"
+
+
+def test_label_values_are_escaped():
+    counter = Counter("errors_total", "Errors", ("message",))
+    counter.inc(message='bad "json"\nat \\n')
+    assert counter.render()[-1] == 'errors_total{message="bad \\"json\\"\\nat \\\\n"} 1'
+
+
+def test_histogram_render_is_cumulative():
+    histogram = Histogram("latency_seconds", "Latency", ("provider",), buckets=(1, 0.5, 5))
+    for value in (0.2, 0.5, 0.7, 3, 100):
+        histogram.observe(value, provider="gemini")
+    assert histogram.count(provider="gemini") == 5
+    assert histogram.sum(provider="gemini") == pytest.approx(104.4)
+    assert histogram.count(provider="ollama") == 0
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{provider="gemini",le="0.5"} 2',
+        'latency_seconds_bucket{provider="gemini",le="1"} 3',
+        'latency_seconds_bucket{provider="gemini",le="5"} 4',
+        'latency_seconds_bucket{provider="gemini",le="+Inf"} 5',
+        'latency_seconds_sum{provider="gemini"} 104.4',
+        'latency_seconds_count{provider="gemini"} 5',
+    ]
+
+
+def test_registry_render():
+    registry = Registry()
+    registry.counter("a_total", "A").inc()
+    registry.histogram("b_seconds", "B", buckets=(1,))
+    assert registry.render() == "# HELP a_total A\n# TYPE a_total counter\na_total 1\n# HELP b_seconds B\n# TYPE b_seconds histogram\n"
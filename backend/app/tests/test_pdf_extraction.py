@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from app.utils.pdf_extraction import (
+    PDF_EXTRACT_MIN_PAGES_PER_TASK,
+    aextract_pdf,
+    evenly_spaced,
+    format_page_ranges,
+    plan_extraction,
+    split_tasks,
+)
+from benchmarks.synthetic_pdf import build_pdf
+
+
+def page(number: int, words: int = 50) -> str:
+    """Page text whose content_length() is 10 * words."""
+    return f"p{number:08d} " + "palabra.. " * (words - 1)
+
+
+def drive(plan, pages: list[str]):
+    """Run a plan against in-memory page texts. Returns (waves, result)."""
+    waves = []
+    try:
+        wave = next(plan)
+        while True:
+            waves.append(wave)
+            wave = plan.send([pages[index] for index in wave])
+    except StopIteration as done:
+        return waves, done.value
+
+
+def test_full_mode_extracts_every_page_in_order():
+    pages = [page(number) for number in range(30)]
+    waves, result = drive(plan_extraction(30, budget=1000, mode="full", workers=2), pages)
+    assert waves == [list(range(30))]
+    assert result.pages_used == list(range(1, 31))
+    assert result.text == "\n\n".join(pages)
+    assert (result.page_count, result.mode) == (30, "full")
+
+
+def test_no_budget_means_full():
+    _, result = drive(plan_extraction(5, budget=None, mode="budget", workers=1), [page(n) for n in range(5)])
+    assert result.mode == "full" and result.pages_used == [1, 2, 3, 4, 5]
+
+
+def test_budget_mode_stops_once_the_budget_is_filled():
+    pages = [page(number) for number in range(100)]
+    # 500 chars per page; budget 5000 + 20% margin = 6000 chars = 12 pages
+    waves, result = drive(plan_extraction(100, budget=5000, mode="budget", workers=1), pages)
+    wave_size = PDF_EXTRACT_MIN_PAGES_PER_TASK
+    assert waves == [list(range(0, wave_size)), list(range(wave_size, 2 * wave_size))]
+    assert result.pages_used == list(range(1, 13))
+    assert result.text == "\n\n".join(pages[:12])
+    assert result.mode == "budget"
+
+
+def test_budget_mode_short_document_uses_every_page():
+    pages = [page(number) for number in range(3)]
+    _, result = drive(plan_extraction(3, budget=100000, mode="budget", workers=1), pages)
+    assert result.pages_used == [1, 2, 3]
+
+
+def test_sample_mode_spreads_pages_over_the_document():
+    pages = [page(number) for number in range(100)]
+    waves, result = drive(plan_extraction(100, budget=5000, mode="sample", workers=1), pages)
+    # Probe wave, then the pages the budget still needs
+    assert len(waves) == 2
+    assert waves[0] == evenly_spaced(100, PDF_EXTRACT_MIN_PAGES_PER_TASK)
+    used = result.pages_used
+    assert used == sorted(used) and used[0] == 1 and used[-1] == 100
+    # 500 chars per page: 6000 / 500 = 12 evenly spaced pages, plus the probes
+    assert waves[1] == [index for index in evenly_spaced(100, 12) if index not in waves[0]]
+    assert used == [index + 1 for index in sorted(waves[0] + waves[1])]
+    assert max(b - a for a, b in zip(used, used[1:])) <= 100 // 8 + 1
+    # Pages come back in document order and the text fits the budget
+    markers = [line.split()[0] for line in result.text.split("\n\n")]
+    assert markers == [f"p{number - 1:08d}" for number in used]
+    assert len(result.text) <= 5000 * 1.1
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        next(plan_extraction(10, budget=1000, mode="random", workers=1))
+
+
+def test_evenly_spaced():
+    assert evenly_spaced(10, 4) == [0, 3, 6, 9]
+    assert evenly_spaced(3, 10) == [0, 1, 2]
+    assert evenly_spaced(10, 1) == [0]
+    assert evenly_spaced(0, 4) == []
+
+
+def test_split_tasks_keeps_contiguous_order():
+    pages = list(range(40))
+    tasks = split_tasks(pages, workers=2, min_pages_per_task=8)
+    assert [index for task in tasks for index in task] == pages
+    assert len(tasks) == 4
+    assert split_tasks(list(range(5)), workers=4, min_pages_per_task=8) == [list(range(5))]
+
+
+def test_format_page_ranges():
+    assert format_page_ranges([1, 2, 3, 7, 9, 10]) == "1-3, 7, 9-10"
+    assert format_page_ranges([4]) == "4"
+    assert format_page_ranges([]) == ""
+
+
+def test_extract_real_pdf_in_process():
+    result = asyncio.run(aextract_pdf(build_pdf(3, lines_per_page=5), mode="full", workers=0))
+    assert result.pages_used == [1, 2, 3] and result.page_count == 3
+    text = result.text
+    assert text.index("Capitulo 1") < text.index("Capitulo 2") < text.index("Capitulo 3")
@@ -0,0 +1,90 @@
+from app.services.retrieval import MATERIAL_SEPARATOR, ChunkIndex, chunk_text, term_counts, tokenize
+
+
+def build_index(texts: list[str]) -> ChunkIndex:
+    return ChunkIndex([(text, term_counts(text)) for text in texts])
+
+
+def test_tokenize_strips_accents_case_and_stopwords():
+    assert tokenize("La Programación y el Diseño de Árboles") == ["programacion", "diseno", "arboles"]
+
+
+def test_tokenize_drops_one_char_tokens():
+    assert tokenize("x = a + bc") == ["bc"]
+
+
+def test_chunk_text_empty():
+    assert chunk_text("   \n ") == []
+
+
+def test_chunk_text_short_text_is_one_chunk():
+    assert chunk_text("  Un párrafo corto.  ") == ["Un párrafo corto."]
+
+
+def test_chunk_text_prefers_paragraph_boundaries():
+    first = "a" * 700
+    second = "b" * 700
+    chunks = chunk_text(f"{first}\n\n{second}", chunk_size=1000, overlap=0)
+    assert chunks == [first, second]
+
+
+def test_chunk_text_falls_back_to_sentence_boundaries():
+    sentence = "Frase de ejemplo con varias palabras. "
+    text = sentence * 60
+    chunks = chunk_text(text, chunk_size=500, overlap=0)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+
+
+def test_chunk_text_overlap_and_coverage():
+    text = " ".join(f"w{i}" for i in range(2000))
+    chunks = chunk_text(text, chunk_size=300, overlap=50)
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    # Consecutive chunks share text, and together they cover the document
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous[-20:] in current
+    assert chunks[0].startswith("w0 ") and chunks[-1].endswith("w1999")
+
+
+def test_search_ranks_matching_chunks_first():
+    index = build_index([
+        "Los grafos se recorren en anchura o en profundidad.",
+        "La memoria virtual usa paginación.",
+        "Grafos dirigidos y grafos ponderados: algoritmo de Dijkstra.",
+    ])
+    results = index.search("grafos ponderados", k=3)
+    assert [position for position, _ in results] == [2, 0]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_search_rare_terms_weigh_more():
+    index = build_index([
+        "procesos hilos",
+        "procesos semaforos",
+        "procesos memoria",
+    ])
+    # "procesos" appears everywhere, "semaforos" only once
+    assert index.search("procesos semaforos", k=1)[0][0] == 1
+
+
+def test_search_without_matches():
+    index = build_index(["redes y protocolos"])
+    assert index.search("compiladores") == []
+    assert index.search("de la el") == []
+    assert build_index([]).search("redes") == []
+
+
+def test_material_for_joins_top_chunks_in_document_order():
+    texts = [
+        "Introducción a bases de datos.",
+        "Índices en bases de datos relacionales.",
+        "Redes de computadoras.",
+        "Transacciones en bases de datos.",
+    ]
+    index = build_index(texts)
+    # Best match is the last chunk; of the two other "bases de datos" chunks
+    # the shorter one ranks higher (BM25 length normalization)
+    material = index.material_for("bases de datos transacciones", k=2)
+    assert material.split(MATERIAL_SEPARATOR) == [texts[0], texts[3]]
+    assert index.material_for("astronomía") == ""
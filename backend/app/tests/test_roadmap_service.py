@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models import NodeConnection, NodeLevel, Roadmap, RoadmapNode, RoadmapSourceChunk, User
+from app.services import roadmap_service
+from app.services.roadmap_service import RoadmapService
+
+SOURCE_TEXT = "Los grafos modelan relaciones.\n\nEl algoritmo de Dijkstra busca caminos mínimos."
+
+
+@pytest.fixture
+def creator(db):
+    user = User(email="docente@example.com", username="docente", password="x", full_name="Docente")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def graph_nodes() -> list[dict]:
+    return [
+        {"title": title, "description": f"Sobre {title}", "level": NodeLevel.BEGINNER, "order_index": index}
+        for index, title in enumerate(["Grafos", "Recorridos", "Dijkstra"])
+    ]
+
+
+def table_counts(db) -> dict:
+    return {
+        model.__name__: db.query(model).count()
+        for model in (Roadmap, RoadmapNode, NodeConnection, RoadmapSourceChunk)
+    }
+
+
+def test_create_graph_inserts_everything(db, creator):
+    roadmap = RoadmapService(db).create_graph(
+        Roadmap(title="Grafos", creator_id=creator.id), graph_nodes(), [(0, 1), (1, 2)], SOURCE_TEXT
+    )
+    assert table_counts(db) == {"Roadmap": 1, "RoadmapNode": 3, "NodeConnection": 2, "RoadmapSourceChunk": 1}
+    titles = {node.id: node.title for node in roadmap.nodes}
+    assert sorted(
+        (titles[edge.from_node_id], titles[edge.to_node_id]) for edge in db.query(NodeConnection)
+    ) == [("Grafos", "Recorridos"), ("Recorridos", "Dijkstra")]
+
+
+def test_create_graph_bad_edge_leaves_nothing(db, creator):
+    with pytest.raises(IndexError):
+        RoadmapService(db).create_graph(
+            Roadmap(title="Grafos", creator_id=creator.id), graph_nodes(), [(0, 1), (1, 7)], SOURCE_TEXT
+        )
+    assert table_counts(db) == {"Roadmap": 0, "RoadmapNode": 0, "NodeConnection": 0, "RoadmapSourceChunk": 0}
+
+
+def test_create_graph_bad_chunk_leaves_nothing(db, creator, monkeypatch):
+    monkeypatch.setattr(
+        roadmap_service,
+        "source_chunk_rows",
+        lambda roadmap_id, text: [{"roadmap_id": roadmap_id, "position": 0, "content": None, "term_counts": {}}]
+    )
+    with pytest.raises(IntegrityError):
+        RoadmapService(db).create_graph(
+            Roadmap(title="Grafos", creator_id=creator.id), graph_nodes(), [(0, 1)], SOURCE_TEXT
+        )
+    assert table_counts(db) == {"Roadmap": 0, "RoadmapNode": 0, "NodeConnection": 0, "RoadmapSourceChunk": 0}
+
+
+def test_clone_copies_the_graph_with_new_ids(db, creator):
+    service = RoadmapService(db)
+    nodes = graph_nodes()
+    nodes[2]["content"] = "## Dijkstra"
+    source = service.create_graph(
+        Roadmap(title="Grafos", description="Original", creator_id=creator.id), nodes, [(0, 1), (1, 2)], SOURCE_TEXT
+    )
+    source_node_ids = {node.id for node in source.nodes}
+
+    clone = service.clone(source.id, "Grafos (copia)", creator.id)
+    assert clone.id != source.id
+    assert (clone.title, clone.description) == ("Grafos (copia)", "Original")
+    assert {node.id for node in clone.nodes}.isdisjoint(source_node_ids)
+    by_title = {node.title: node for node in clone.nodes}
+    assert by_title["Dijkstra"].content == "## Dijkstra"
+
+    clone = service.get_with_connections(clone.id)
+    titles = {node.id: node.title for node in clone.nodes}
+    edges = sorted(
+        (titles[connection.from_node_id], titles[connection.to_node_id])
+        for node in clone.nodes
+        for connection in node.connections_from
+    )
+    assert edges == [("Grafos", "Recorridos"), ("Recorridos", "Dijkstra")]
+    assert [(chunk.position, chunk.content) for chunk in clone.source_chunks] == [
+        (chunk.position, chunk.content) for chunk in source.source_chunks
+    ]
+    assert table_counts(db) == {"Roadmap": 2, "RoadmapNode": 6, "NodeConnection": 4, "RoadmapSourceChunk": 2}
+
+
+def test_clone_of_missing_roadmap(db, creator):
+    assert RoadmapService(db).clone(999, "Nada", creator.id) is None
@@ -0,0 +1,46 @@
+from app.services.semantic_cache import SemanticCache
+
+
+def test_same_topic_is_served():
+    cache = SemanticCache(enabled=True, threshold=0.9, draft_threshold=0.5)
+    cache.add("Variables y tipos de datos", "Enteros, flotantes y cadenas", "## Variables")
+    cache.add("Redes de computadoras", "Modelo OSI", "## Redes")
+    match = cache.lookup("variables y tipos de datos", "enteros, flotantes y cadenas")
+    assert match is not None and match.servable
+    assert match.content == "## Variables" and match.score >= 0.9
+
+
+def test_similar_topic_is_a_draft_and_unrelated_is_a_miss():
+    cache = SemanticCache(enabled=True, threshold=0.9, draft_threshold=0.5)
+    cache.add("Variables y tipos de datos", "Enteros y cadenas", "## Variables")
+    cache.add("Redes de computadoras", "Modelo OSI", "## Redes")
+    draft = cache.lookup("Variables y tipos de datos en Python", "")
+    assert draft is not None and not draft.servable
+    assert draft.title == "Variables y tipos de datos"
+    assert cache.lookup("Astronomía estelar", "Galaxias") is None
+    assert cache.stats()["drafts"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_empty_cache_and_empty_content():
+    cache = SemanticCache(enabled=True)
+    assert cache.lookup("Variables") is None
+    cache.add("Variables", "", "   ")
+    assert cache.stats()["entries"] == 0
+
+
+def test_same_key_updates_in_place():
+    cache = SemanticCache(enabled=True)
+    cache.add("Variables", "", "old")
+    cache.add("variables", "", "new")
+    assert cache.stats()["entries"] == 1
+    assert cache.lookup("Variables").content == "new"
+
+
+def test_ring_evicts_oldest_entry():
+    cache = SemanticCache(enabled=True, max_entries=2)
+    cache.add("Grafos dirigidos", "", "## Grafos")
+    cache.add("Memoria virtual", "", "## Memoria")
+    cache.add("Compiladores modernos", "", "## Compiladores")
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup("Grafos dirigidos") is None
+    assert cache.lookup("Compiladores modernos").content == "## Compiladores"
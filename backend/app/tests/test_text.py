@@ -0,0 +1,51 @@
+import pytest
+
+from app.utils.text import normalize_text
+
+
+def test_whitespace_runs_collapse_and_lines_are_trimmed():
+    assert normalize_text("   Los  grafos\t\tse\x0b recorren   \n   en anchura  ") == "Los grafos se recorren\nen anchura"
+
+
+def test_unicode_spaces_become_spaces():
+    assert normalize_text("uno\xa0dos\u2009tres\x85cuatro\u3000fin") == "uno dos tres cuatro fin"
+
+
+def test_line_endings():
+    assert normalize_text("uno\r\ndos\rtres\nfin") == "uno\ndos\ntres\nfin"
+
+
+def test_ascii_controls_are_removed():
+    assert normalize_text("tex\x00to\x07 con\x1b con\x7ftroles") == "texto con controles"
+
+
+@pytest.mark.parametrize("char", ["\x9f", "\u200b", "\u200e", "\ufeff", "\ud800"])
+def test_non_ascii_non_printables_are_removed(char):
+    assert normalize_text(f"pala{char}bra ñandú") == "palabra ñandú"
+
+
+def test_soft_hyphens_are_removed_but_visible_hyphens_stay():
+    assert normalize_text("distri\xadbuidos\nauto-\nmático") == "distribuidos\nauto-\nmático"
+
+
+def test_form_feed_between_pages():
+    assert normalize_text("fin de página 1\n\n\x0c   inicio de página 2") == "fin de página 1\n\ninicio de página 2"
+
+
+def test_at_most_one_blank_line():
+    text = "título\n\n\n\n   \n\t\npárrafo\n \u200b \ncierre\n\n\n"
+    assert normalize_text(text) == "título\n\npárrafo\n\ncierre"
+
+
+def test_removed_characters_leave_no_double_spaces():
+    assert normalize_text("a \u200b b\n\u200b\nc") == "a b\n\nc"
+
+
+@pytest.mark.parametrize("text", ["", " \n\t\x00 ", "\u200b\xad"])
+def test_empty_results(text):
+    assert normalize_text(text) == ""
+
+
+def test_idempotent():
+    text = normalize_text("  uno \x00 dos\n\n\n\xa0tres\xad  ")
+    assert normalize_text(text) == text
@@ -0,0 +1,41 @@
+"""
+File type detection
+Uploads are checked by their first bytes, not by the extension they claim.
+- python-magic (libmagic) when it can be loaded
+- Otherwise a built-in check: PDF signature, or text (no NUL bytes)
+"""
+
+try:
+    import magic
+except ImportError:  # also raised when the libmagic system library is missing
+    magic = None
+
+# Bytes read from the start of an upload to detect its type
+SNIFF_BYTES = 8192
+
+PDF_MIME = "application/pdf"
+# libmagic reports some plain-text files under application/*
+TEXT_MIMES = ("application/json", "application/csv", "application/x-empty")
+
+
+def detect_mime(head: bytes) -> str:
+    """MIME type of a file from its first SNIFF_BYTES bytes."""
+    if magic is not None:
+        try:
+            return magic.from_buffer(head, mime=True)
+        except Exception:
+            pass
+    if head.lstrip()[:5] == b"%PDF-":
+        return PDF_MIME
+    if b"\x00" not in head:
+        return "text/plain"
+    return "application/octet-stream"
+
+
+def matches_extension(mime: str, extension: str) -> bool:
+    """Whether the detected type is what the extension says (pdf, txt)."""
+    if extension == "pdf":
+        return mime == PDF_MIME
+    if extension == "txt":
+        return mime.startswith("text/") or mime in TEXT_MIMES
+    return False
@@ -0,0 +1,297 @@
+"""
+PDF extraction
+Page-parallel text extraction with pdfplumber.
+- Pages are split into contiguous ranges; each range is extracted in a
+  worker process (the work is CPU-bound, so threads would not help)
+- Results are reassembled in page order
+- PDF_EXTRACT_WORKERS=0 extracts in-process (no pool)
+- Given a file path, each worker opens the file itself (pdfplumber reads
+  it lazily) instead of receiving a copy of the whole document
+- Each page's parsed objects are freed once its text is out, and worker
+  memory growth is capped (PDF_EXTRACT_WORKER_MAX_MB): a runaway PDF fails
+  its job with MemoryError instead of getting workers OOM-killed
+- A broken pool (a worker died) is rebuilt and the extraction continues
+  in-process; a timed-out extraction has its busy workers terminated
+Budgeted modes avoid parsing pages whose text would be truncated anyway:
+- full: every page
+- budget: pages in order, in waves, until the character budget is reached
+- sample: pages spread evenly over the document (keeps coverage of long books)
+"""
+
+import asyncio
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Generator, NamedTuple
+
+import pdfplumber
+
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(os.cpu_count() or 1, 4))))
+PDF_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "120"))
+# Below this many pages per range, reopening the PDF in another process costs more than it saves
+PDF_EXTRACT_MIN_PAGES_PER_TASK = int(os.getenv("PDF_EXTRACT_MIN_PAGES_PER_TASK", "8"))
+PDF_EXTRACT_MODE = os.getenv("PDF_EXTRACT_MODE", "budget")  # full | budget | sample
+# Extra characters extracted beyond the budget (fraction), so trimming still has choices
+PDF_EXTRACT_BUDGET_MARGIN = float(os.getenv("PDF_EXTRACT_BUDGET_MARGIN", "0.2"))
+# Max memory a worker may grow beyond its size at start-up (0 = no cap, Linux only)
+PDF_EXTRACT_WORKER_MAX_MB = int(os.getenv("PDF_EXTRACT_WORKER_MAX_MB", "1024"))
+EXTRACT_MODES = ("full", "budget", "sample")
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def log_pdf(msg):
+    print(f"[PDF EXTRACTION] {msg}", flush=True)
+
+# The document's bytes, or the path of the file
+PdfSource = bytes | str
+
+
+def open_pdf(source: PdfSource):
+    return pdfplumber.open(BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def count_pages(source: PdfSource) -> int:
+    with open_pdf(source) as pdf:
+        return len(pdf.pages)
+
+
+class ExtractionResult(NamedTuple):
+    text: str
+    pages_used: list[int]  # 1-based, document order
+    page_count: int
+    mode: str
+
+
+def extract_page_list(source: PdfSource, pages: list[int]) -> list[str]:
+    """Extract the given 0-based pages of the document. Runs inside a worker process."""
+    texts = []
+    with open_pdf(source) as pdf:
+        all_pages = pdf.pages
+        for index in pages:
+            page = all_pages[index]
+            texts.append(page.extract_text(layout=True) or "")
+            # Parsed layout objects are cached per page and never released otherwise
+            page.close()
+    return texts
+
+
+def split_tasks(
+    pages: list[int],
+    workers: int,
+    min_pages_per_task: int = PDF_EXTRACT_MIN_PAGES_PER_TASK
+) -> list[list[int]]:
+    """
+    Split a page list into contiguous slices. Two slices per worker keeps
+    the pool busy when some pages are much heavier than others.
+    """
+    if not pages:
+        return []
+    tasks = max(1, min(workers * 2, len(pages) // max(min_pages_per_task, 1)))
+    size = math.ceil(len(pages) / tasks)
+    return [pages[start:start + size] for start in range(0, len(pages), size)]
+
+
+def evenly_spaced(page_count: int, k: int) -> list[int]:
+    """k page indices spread over [0, page_count), always including the first and last pages."""
+    k = min(k, page_count)
+    if k <= 1:
+        return [0] if k == 1 else []
+    return sorted({round(index * (page_count - 1) / (k - 1)) for index in range(k)})
+
+
+def format_page_ranges(pages: list[int]) -> str:
+    """[1, 2, 3, 7, 9, 10] -> "1-3, 7, 9-10"."""
+    parts = []
+    start = prev = None
+    for page in pages:
+        if prev is not None and page == prev + 1:
+            prev = page
+            continue
+        if start is not None:
+            parts.append(f"{start}-{prev}" if prev != start else str(start))
+        start = prev = page
+    if start is not None:
+        parts.append(f"{start}-{prev}" if prev != start else str(start))
+    return ", ".join(parts)
+
+
+def content_length(text: str) -> int:
+    """Length ignoring layout padding (extract_text(layout=True) pads with spaces)."""
+    return sum(len(word) + 1 for word in text.split())
+
+
+def cap_page(text: str, limit: int) -> str:
+    """Keep roughly the first `limit` content characters of a page."""
+    length = content_length(text)
+    if length <= limit:
+        return text
+    return text[:int(len(text) * limit / length)]
+
+
+ExtractionPlan = Generator[list[int], list[str], ExtractionResult]
+
+
+def plan_extraction(page_count: int, budget: int | None, mode: str, workers: int) -> ExtractionPlan:
+    """
+    Decide which pages to extract. Yields waves of 0-based page indices, is
+    sent back their texts, and returns the ExtractionResult (driven by
+    aextract_pdf).
+    """
+    if mode not in EXTRACT_MODES:
+        raise ValueError(f"Unknown PDF extraction mode: {mode}")
+    texts: dict[int, str] = {}
+
+    if mode == "full" or not budget:
+        wave = list(range(page_count))
+        texts.update(zip(wave, (yield wave)))
+        return _build_result(texts, sorted(texts), page_count, "full")
+
+    target = int(budget * (1 + PDF_EXTRACT_BUDGET_MARGIN))
+    wave_size = max(workers, 1) * PDF_EXTRACT_MIN_PAGES_PER_TASK
+
+    if mode == "budget":
+        extracted = 0
+        next_page = 0
+        while next_page < page_count and extracted < target:
+            wave = list(range(next_page, min(next_page + wave_size, page_count)))
+            for index, text in zip(wave, (yield wave)):
+                texts[index] = text
+                extracted += content_length(text)
+            next_page = wave[-1] + 1
+
+        used, total = [], 0
+        for index in sorted(texts):
+            if total >= target:
+                break
+            used.append(index)
+            total += content_length(texts[index])
+        return _build_result(texts, used, page_count, mode)
+
+    # sample: probe evenly spaced pages to estimate chars/page, then add as
+    # many evenly spaced pages as the budget needs
+    wave = evenly_spaced(page_count, wave_size)
+    texts.update(zip(wave, (yield wave)))
+    average = sum(content_length(text) for text in texts.values()) / max(len(texts), 1)
+    needed = min(page_count, math.ceil(target / max(average, 1)))
+    wave = [index for index in evenly_spaced(page_count, needed) if index not in texts]
+    if wave:
+        texts.update(zip(wave, (yield wave)))
+
+    used = sorted(texts)
+    # Cap each page so the text fits the budget itself: later truncation
+    # cannot drop the end of the document
+    per_page = max(budget // max(len(used), 1), 1)
+    return _build_result({index: cap_page(texts[index], per_page) for index in used}, used, page_count, mode)
+
+
+def _build_result(texts: dict[int, str], used: list[int], page_count: int, mode: str) -> ExtractionResult:
+    return ExtractionResult(
+        text="\n\n".join(texts[index] for index in used if texts[index]),
+        pages_used=[index + 1 for index in used],
+        page_count=page_count,
+        mode=mode
+    )
+
+
+def _limit_worker_memory(max_mb: int = PDF_EXTRACT_WORKER_MAX_MB):
+    """Pool initializer: cap the worker's address space at its current size + max_mb."""
+    if max_mb <= 0:
+        return
+    try:
+        import resource
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (ImportError, OSError, ValueError):
+        return
+    limit = current + max_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+
+
+def get_pool(workers: int = PDF_EXTRACT_WORKERS) -> ProcessPoolExecutor:
+    """The shared pool, (re)built if missing or sized for another worker count."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and _pool_workers != workers:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_limit_worker_memory)
+            _pool_workers = workers
+        return _pool
+
+
+def discard_pool(pool: ProcessPoolExecutor, terminate: bool = False):
+    """
+    Drop a broken or stuck pool so the next get_pool() builds a fresh one.
+    terminate=True also kills workers still running a task (after a timeout).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    if terminate:
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    with _pool_lock:
+        pool = _pool
+    if pool is not None:
+        discard_pool(pool)
+
+
+async def aextract_pdf(
+    source: PdfSource,
+    budget: int | None = None,
+    mode: str = PDF_EXTRACT_MODE,
+    workers: int = PDF_EXTRACT_WORKERS,
+    timeout: float | None = PDF_EXTRACT_TIMEOUT_SECONDS
+) -> ExtractionResult:
+    """
+    Extract the document's text (within `budget` characters unless mode is
+    "full"). The event loop only waits on the workers. Raises TimeoutError
+    if the job exceeds `timeout`.
+    """
+    page_count = await asyncio.to_thread(count_pages, source)
+    plan = plan_extraction(page_count, budget, mode, workers)
+    loop = asyncio.get_running_loop()
+    pool = get_pool(workers) if workers > 0 else None
+
+    async def run_wave(wave: list[int]) -> list[str]:
+        nonlocal pool
+        if pool is not None:
+            try:
+                futures = [
+                    loop.run_in_executor(pool, extract_page_list, source, task)
+                    for task in split_tasks(wave, workers)
+                ]
+                results = await asyncio.gather(*futures)
+                return [text for chunk in results for text in chunk]
+            except BrokenProcessPool as e:
+                log_pdf(f"Worker pool broken ({e}), extracting in-process")
+                discard_pool(pool)
+                pool = None
+        return await asyncio.to_thread(extract_page_list, source, wave)
+
+    async def run_plan() -> ExtractionResult:
+        try:
+            wave = next(plan)
+            while True:
+                wave = plan.send(await run_wave(wave))
+        except StopIteration as done:
+            return done.value
+
+    try:
+        return await asyncio.wait_for(run_plan(), timeout=timeout)
+    except asyncio.TimeoutError:
+        if pool is not None:
+            discard_pool(pool, terminate=True)
+        raise TimeoutError(f"PDF extraction exceeded {timeout}s ({page_count} pages)")
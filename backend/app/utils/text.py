@@ -0,0 +1,51 @@
+"""
+Text normalization
+Sanitize extracted document text (PDF and TXT uploads) before it reaches
+the prompts and PostgreSQL.
+- normalize_text: drop NULs and every other non-printable character
+  (control, format, surrogates; tabs, form feeds and Unicode spaces become
+  spaces), collapse whitespace runs into one space, trim every line and
+  keep at most one blank line
+The per-character work runs in C: one bytes.translate for ASCII controls,
+one str.replace per distinct non-ASCII offender, str.split/join per line;
+Python only loops over lines.
+"""
+
+# ASCII controls never occur inside multi-byte UTF-8 sequences, so they can be
+# mapped/deleted on the encoded bytes in a single translate() pass
+_ASCII_TABLE = bytes.maketrans(b"\t\x0b\x0c\r", b"   \n")
+_ASCII_DELETE = bytes(b for b in [*range(0x20), 0x7F] if b not in b"\t\n\x0b\x0c\r")
+
+
+def _strip_ascii_controls(text: str) -> str:
+    """Delete ASCII control chars (and lone surrogates); tabs -> spaces, CR/CRLF -> LF."""
+    text = text.replace("\r\n", "\n")
+    return text.encode("utf-8", "ignore").translate(_ASCII_TABLE, _ASCII_DELETE).decode("utf-8")
+
+
+def _strip_non_ascii_controls(text: str) -> str:
+    """
+    Unicode spaces -> spaces; other non-printable chars (C1 controls, soft
+    hyphens, zero-width and other format chars) removed. Each round takes the
+    offenders of the first line that fails isprintable() and replaces them
+    document-wide, so the cost grows with the number of distinct offenders,
+    not with the document size.
+    """
+    while True:
+        dirty = next((line for line in text.split("\n") if not line.isprintable()), None)
+        if dirty is None:
+            return text
+        for char in {char for char in dirty if not char.isprintable()}:
+            text = text.replace(char, " " if char.isspace() else "")
+
+
+def normalize_text(text: str) -> str:
+    """Sanitize and compact document text (see module docstring)."""
+    text = _strip_ascii_controls(text)
+    if not text.isascii():
+        text = _strip_non_ascii_controls(text)
+    # split() with no argument also breaks on Unicode spaces
+    lines = [" ".join(line.split()) for line in text.split("\n")]
+    # Keep a blank line only after a non-blank one
+    lines = [line for previous, line in zip([""] + lines, lines) if line or previous]
+    return "\n".join(lines).strip()
@@ -0,0 +1,31 @@
+"""
+Stage timing helpers
+Measure pipeline stages (sync blocks and awaitables) into a shared dict.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+def log_timing(msg):
+    print(f"[TIMING] {msg}", flush=True)
+
+
+@contextmanager
+def stage_timer(stage: str, timings: dict[str, float]):
+    """Record the duration of a block (ms) under timings[stage]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000, 1)
+        log_timing(f"{stage}: {timings[stage]} ms")
+
+
+async def timed(stage: str, awaitable: Awaitable[T], timings: dict[str, float]) -> T:
+    """Await and record the duration (ms) under timings[stage]."""
+    with stage_timer(stage, timings):
+        return await awaitable
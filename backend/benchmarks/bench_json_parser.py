@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: single-pass IncrementalJSONParser vs. the previous
+multi-strategy parser (json.loads x3 + clean_json_text + greedy regex).
+
+Run from backend/:
+    python -m benchmarks.bench_json_parser
+"""
+
+import json
+import re
+import timeit
+
+from app.services.ai_service import parse_json_response
+
+
+# -----------------------------------------------------------------------------
+# Previous implementation (kept here only as the baseline)
+# -----------------------------------------------------------------------------
+
+def legacy_clean_json_text(text: str) -> str:
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0]
+    elif "```" in text:
+        parts = text.split("```")
+        if len(parts) >= 2:
+            text = parts[1]
+    text = text.strip()
+    start = text.find("{")
+    end = text.rfind("}") + 1
+    if start != -1 and end > start:
+        text = text[start:end]
+    text = re.sub(r',\s*}', '}', text)
+    text = re.sub(r',\s*]', ']', text)
+    text = text.replace('\n', ' ')
+    text = re.sub(r'\s+', ' ', text)
+    return text
+
+
+def legacy_parse_json_response(response_text: str) -> dict:
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(legacy_clean_json_text(response_text))
+    except json.JSONDecodeError:
+        pass
+    try:
+        match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if match:
+            return json.loads(legacy_clean_json_text(match.group()))
+    except json.JSONDecodeError:
+        pass
+    raise ValueError("Could not parse JSON")
+
+
+# -----------------------------------------------------------------------------
+# Samples
+# -----------------------------------------------------------------------------
+
+def roadmap_payload(nodes: int = 12) -> dict:
+    levels = ["beginner", "intermediate", "advanced"]
+    return {
+        "description": "Roadmap de ejemplo para el benchmark",
+        "nodes": [
+            {
+                "title": f"Tema {i}",
+                "description": "Qué aprenderás en este tema, con algo de detalle. " * 3,
+                "level": levels[i * 3 // nodes],
+                "order": i,
+                "prerequisites": [] if i < nodes // 3 else [i - 1],
+            }
+            for i in range(nodes)
+        ],
+    }
+
+
+def node_content_payload() -> str:
+    body = "\n\n".join(
+        f"## Sección {i}\n\n- **Concepto {i}**: explicación, con comas y \"comillas\".\n- `codigo_{i}()`"
+        for i in range(40)
+    )
+    return json.dumps({"content": body}, ensure_ascii=False)
+
+
+def samples() -> dict[str, str]:
+    roadmap = json.dumps(roadmap_payload(), ensure_ascii=False, indent=2)
+    content = node_content_payload()
+    trailing = roadmap.replace("]\n    }", "],\n    }").replace("}\n  ]", "},\n  ]")
+    return {
+        "clean roadmap JSON": roadmap,
+        "fenced + chatter": f"Claro, aquí está el roadmap:\n```json\n{roadmap}\n```\nEspero que sirva.",
+        "trailing commas": f"```json\n{trailing}\n```",
+        "node content (large)": f"```json\n{content}\n```",
+    }
+
+
+def main(number: int = 2000):
+    print(f"{'sample':<24}{'legacy (us)':>14}{'single-pass (us)':>18}{'speedup':>10}")
+    for name, text in samples().items():
+        assert parse_json_response(text) == legacy_parse_json_response(text)
+        legacy = timeit.timeit(lambda: legacy_parse_json_response(text), number=number) / number * 1e6
+        current = timeit.timeit(lambda: parse_json_response(text), number=number) / number * 1e6
+        print(f"{name:<24}{legacy:>14.1f}{current:>18.1f}{legacy / current:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark: serial vs. page-parallel (process pool) PDF extraction on a
+synthetic multi-hundred-page PDF.
+
+Run from backend/:
+    python -m benchmarks.bench_pdf_extraction [pages]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from app.utils.pdf_extraction import aextract_pdf, shutdown_pool
+from benchmarks.synthetic_pdf import build_pdf
+
+
+def run(file_content: bytes, workers: int) -> tuple[float, str]:
+    shutdown_pool()
+    if workers > 0:
+        # Warm the pool so process start-up is not charged to the first run
+        asyncio.run(aextract_pdf(build_pdf(1), mode="full", workers=workers))
+    start = time.perf_counter()
+    result = asyncio.run(aextract_pdf(file_content, mode="full", workers=workers, timeout=None))
+    return time.perf_counter() - start, result.text
+
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    file_content = build_pdf(page_count)
+    cpus = os.cpu_count() or 1
+    print(f"Synthetic PDF: {page_count} pages, {len(file_content) / 1024:.0f} KiB, {cpus} CPUs")
+
+    baseline, expected = run(file_content, workers=0)
+    print(f"  serial (in-process)  {baseline:7.2f}s")
+
+    if cpus == 1:
+        print("  (1 CPU: workers can only add process overhead here, timings are not a speedup)")
+    for workers in sorted({2, 4, cpus}):
+        elapsed, text = run(file_content, workers=workers)
+        assert text == expected, "page order / content mismatch"
+        speedup = f"  x{baseline / elapsed:.2f}" if cpus > 1 else ""
+        print(f"  pool, {workers:2d} workers     {elapsed:7.2f}s{speedup}")
+
+    shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+End-to-end benchmark: upload -> roadmap job -> bulk node content, driven
+through the ASGI app against a throwaway SQLite database and the
+FakeProvider (no Gemini quota, no GPU).
+
+Run from backend/:
+    python -m benchmarks.bench_pipeline [--concurrency 1,4,8] [--pipelines 16]
+        [--latency-ms 200] [--failure-rate 0.05] [--malformed-rate 0.05]
+        [--doc-chars 20000] [--pdf-pages 0]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic_pdf import PARAGRAPH, build_pdf
+
+VOCABULARY = (
+    "algoritmos estructuras grafos arboles ordenamiento busqueda recursion complejidad "
+    "memoria procesos hilos concurrencia sincronizacion redes protocolos seguridad "
+    "criptografia bases datos indices transacciones consultas compiladores lenguajes"
+).split()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,4,8", help="comma-separated concurrency levels")
+    parser.add_argument("--pipelines", type=int, default=16, help="pipelines per concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=200, help="fake provider median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--doc-chars", type=int, default=20000, help="TXT upload size")
+    parser.add_argument("--pdf-pages", type=int, default=0, help="upload a synthetic PDF instead of TXT")
+    parser.add_argument("--timeout", type=float, default=300, help="per-pipeline timeout (s)")
+    return parser.parse_args()
+
+
+def configure_environment(args, database_path: str):
+    """Must run before the app is imported: settings are read at import time."""
+    levels = [int(level) for level in args.concurrency.split(",")]
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{database_path}",
+        "AI_FAKE_PROVIDER": "true",
+        "AI_FAKE_LATENCY_MS": str(args.latency_ms),
+        "AI_FAKE_LATENCY_SIGMA": str(args.latency_sigma),
+        "AI_FAKE_FAILURE_RATE": str(args.failure_rate),
+        "AI_FAKE_MALFORMED_RATE": str(args.malformed_rate),
+        # Every pipeline must reach the provider
+        "AI_CACHE_ENABLED": "false",
+        "AI_SEMANTIC_CACHE_ENABLED": "false",
+        "AI_JOB_WORKERS": str(max(levels)),
+        "AI_JOB_POLL_SECONDS": "0.2",
+        "OLLAMA_WARMUP_ENABLED": "false",
+    })
+    return levels
+
+
+def make_document(index: int, args) -> tuple[str, bytes]:
+    """A distinct document per pipeline (distinct hash, so no dedup/clone)."""
+    if args.pdf_pages:
+        return "libro.pdf", build_pdf(args.pdf_pages) + f"%pipeline {index}\n".encode()
+    words = VOCABULARY[index % len(VOCABULARY):] + VOCABULARY[:index % len(VOCABULARY)]
+    paragraphs = []
+    while sum(map(len, paragraphs)) < args.doc_chars:
+        topic = words[len(paragraphs) % len(words)]
+        paragraphs.append(f"Capitulo {len(paragraphs) + 1} ({index}): {topic}. {PARAGRAPH}")
+    return "apuntes.txt", "\n\n".join(paragraphs).encode()
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def run_pipeline(client, index: int, creator_id: int, args, bulk_in_progress: set[int]) -> dict:
+    filename, content = make_document(index, args)
+    start = time.perf_counter()
+    result = {"ok": False, "nodes": 0, "with_content": 0}
+    deadline = start + args.timeout
+
+    response = await client.post(
+        "/ai/generate-roadmap",
+        files={"file": (filename, content)},
+        data={"title": f"Pipeline {index}", "creator_id": str(creator_id)},
+    )
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+
+    while True:
+        job = (await client.get(f"/ai/jobs/{job_id}")).json()
+        if job["status"] in ("succeeded", "failed") or time.perf_counter() > deadline:
+            break
+        await asyncio.sleep(0.05)
+    result["roadmap_s"] = time.perf_counter() - start
+    if job["status"] != "succeeded":
+        result["error"] = job.get("error") or "timeout"
+        return result
+
+    roadmap_id = job["result"]["roadmap_id"]
+    content_start = time.perf_counter()
+    response = await client.post(f"/ai/{roadmap_id}/generate-all-content")
+    response.raise_for_status()
+    while roadmap_id in bulk_in_progress and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    nodes = (await client.get(f"/roadmaps/{roadmap_id}")).json()["nodes"]
+
+    result.update(
+        ok=True,
+        content_s=time.perf_counter() - content_start,
+        total_s=time.perf_counter() - start,
+        nodes=len(nodes),
+        with_content=sum(1 for node in nodes if node["content"]),
+    )
+    return result
+
+
+async def run_level(app, concurrency: int, args, creator_id: int, first_index: int) -> dict:
+    import httpx
+    from app.routers.ai import _bulk_generation_in_progress
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+        async def bounded(index: int) -> dict:
+            async with semaphore:
+                return await run_pipeline(client, index, creator_id, args, _bulk_generation_in_progress)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded(first_index + i) for i in range(args.pipelines)))
+        elapsed = time.perf_counter() - start
+    return {"elapsed": elapsed, "results": results}
+
+
+def counter_total(counter) -> float:
+    """Sum of a counter over all its label sets, read from its /metrics lines."""
+    return sum(float(line.rsplit(" ", 1)[1]) for line in counter.render() if not line.startswith("#"))
+
+
+def report(concurrency: int, level: dict):
+    results = level["results"]
+    done = [result for result in results if result["ok"]]
+    totals = [result["total_s"] for result in done]
+    nodes = sum(result["nodes"] for result in done)
+    with_content = sum(result["with_content"] for result in done)
+    print(
+        f"concurrency {concurrency:3d}: {len(done)}/{len(results)} ok in {level['elapsed']:6.2f}s"
+        f" -> {len(done) / level['elapsed'] * 60:6.1f} pipelines/min"
+    )
+    print(
+        f"    total     p50 {percentile(totals, 50):6.2f}s  p95 {percentile(totals, 95):6.2f}s"
+        f"  p99 {percentile(totals, 99):6.2f}s  max {max(totals, default=float('nan')):6.2f}s"
+    )
+    for stage in ("roadmap_s", "content_s"):
+        values = [result[stage] for result in done]
+        print(
+            f"    {stage[:-2]:<9} p50 {percentile(values, 50):6.2f}s  p95 {percentile(values, 95):6.2f}s"
+        )
+    print(f"    nodes with content: {with_content}/{nodes}")
+    errors = [result["error"] for result in results if not result["ok"]]
+    if errors:
+        print(f"    failures: {errors[:3]}{' ...' if len(errors) > 3 else ''}")
+
+
+async def main_async(args, levels: list[int]):
+    from app.core.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models import User
+    from app.services.ai_metrics import COMPLETION_TOKENS, PARSE_FAILURES, RETRIES
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    user = User(email="bench@merq.local", username="bench", password="x", full_name="Bench")
+    db.add(user)
+    db.commit()
+    creator_id = user.id
+    db.close()
+
+    print(
+        f"Fake provider: median {args.latency_ms:.0f}ms, sigma {args.latency_sigma},"
+        f" failures {args.failure_rate:.0%}, malformed {args.malformed_rate:.0%};"
+        f" {args.pipelines} pipelines per level"
+    )
+    async with app.router.lifespan_context(app):
+        first_index = 0
+        for concurrency in levels:
+            level = await run_level(app, concurrency, args, creator_id, first_index)
+            first_index += args.pipelines
+            report(concurrency, level)
+        print(
+            f"AI layer: {counter_total(RETRIES):.0f} retries, {counter_total(PARSE_FAILURES):.0f} parse failures,"
+            f" {counter_total(COMPLETION_TOKENS):.0f} completion tokens"
+        )
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        levels = configure_environment(args, os.path.join(tmp, "bench.db"))
+        os.environ["AI_UPLOAD_DIR"] = os.path.join(tmp, "uploads")
+        asyncio.run(main_async(args, levels))
+
+
+if __name__ == "__main__":
+    main()
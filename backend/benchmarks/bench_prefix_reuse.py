@@ -0,0 +1,138 @@
+"""
+Benchmark: prompt evaluation time per node with the material as a stable
+prompt prefix vs. the previous layout (node instructions first, material
+last), on the FakeProvider's simulated prefix cache.
+
+Both layouts send the same material per node: either a summary-sized
+excerpt (the same for every node, like roadmaps without a chunk index) or
+the BM25-retrieved chunks for each node.
+
+Run from backend/:
+    python -m benchmarks.bench_prefix_reuse [--nodes 12] [--doc-chars 60000]
+        [--ms-per-1k-tokens 400] [--slots 4]
+"""
+
+import argparse
+import asyncio
+import os
+
+from benchmarks.synthetic_pdf import PARAGRAPH
+
+TOPICS = (
+    "algoritmos estructuras grafos arboles ordenamiento busqueda recursion complejidad "
+    "memoria procesos hilos concurrencia sincronizacion redes protocolos seguridad"
+).split()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=12)
+    parser.add_argument("--doc-chars", type=int, default=60000)
+    parser.add_argument("--summary-chars", type=int, default=6000)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=400, help="simulated prompt evaluation cost")
+    parser.add_argument("--slots", type=int, default=4, help="simulated KV cache slots")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Must run before the app is imported: settings are read at import time."""
+    os.environ.update({
+        "AI_FAKE_PROVIDER": "true",
+        "AI_FAKE_LATENCY_MS": "1",
+        "AI_FAKE_PROMPT_MS_PER_1K_TOKENS": str(args.ms_per_1k_tokens),
+        "AI_FAKE_PROMPT_CACHE_SLOTS": str(args.slots),
+        "AI_CACHE_ENABLED": "false",
+        "AI_SEMANTIC_CACHE_ENABLED": "false",
+    })
+
+
+# -----------------------------------------------------------------------------
+# Previous prompt layout (kept here only as the baseline)
+# -----------------------------------------------------------------------------
+
+def legacy_node_prompt(material: str, title: str, description: str) -> str:
+    return f"""Genera contenido educativo para "{title}".
+
+RESPONDE JSON:
+{{"content": "## Introducción\\n\\nTexto...\\n\\n## Conceptos\\n\\n- **Concepto**: explicación\\n\\n## Tips\\n\\n- Tip práctico"}}
+
+Estructura Markdown:
+- ## Headers
+- **Negritas** para conceptos
+- Listas con -
+- `código` si aplica
+
+Tema: {title}
+Contexto: {description}
+
+Material:
+{material}
+
+JSON:"""
+
+
+def build_document(chars: int) -> str:
+    paragraphs = []
+    while sum(map(len, paragraphs)) < chars:
+        topic = TOPICS[len(paragraphs) % len(TOPICS)]
+        paragraphs.append(f"Capitulo {len(paragraphs) + 1}: {topic}. {PARAGRAPH}")
+    return "\n\n".join(paragraphs)
+
+
+async def run_layouts(args, nodes: list[dict], materials: list[str]) -> tuple[float, float]:
+    """Total simulated prompt evaluation seconds: (legacy layout, prefix layout)."""
+    from app.services import ai_metrics
+    from app.services.ai_service import generate_node_content, truncate_content
+    from app.services.fake_provider import FakeProvider
+
+    def prompt_seconds(task: str) -> float:
+        return ai_metrics.PROMPT_EVAL_SECONDS.sum(provider="Fake", model="fake", task=task)
+
+    before = prompt_seconds("bench_legacy"), prompt_seconds("node_content")
+    legacy = FakeProvider(latency_ms=1, prompt_ms_per_1k_tokens=args.ms_per_1k_tokens, prompt_cache_slots=args.slots)
+    with ai_metrics.ai_task("bench_legacy"):
+        for node, material in zip(nodes, materials):
+            await legacy.agenerate(legacy_node_prompt(truncate_content(material), node["title"], node["description"]))
+    for node, material in zip(nodes, materials):
+        await generate_node_content(material, node["title"], node["description"])
+
+    return prompt_seconds("bench_legacy") - before[0], prompt_seconds("node_content") - before[1]
+
+
+def report(label: str, nodes: int, legacy: float, current: float):
+    print(
+        f"{label:<20}{legacy / nodes * 1000:>14.0f}{current / nodes * 1000:>14.0f}"
+        f"{legacy / current if current else float('inf'):>9.1f}x"
+    )
+
+
+async def main_async(args):
+    from app.services.ai_service import truncate_content
+    from app.services.retrieval import ChunkIndex, chunk_text, term_counts
+
+    document = build_document(args.doc_chars)
+    nodes = [
+        {"title": f"{TOPICS[i % len(TOPICS)].capitalize()} {i + 1}", "description": f"Fundamentos de {TOPICS[i % len(TOPICS)]}"}
+        for i in range(args.nodes)
+    ]
+    summary = truncate_content(document, args.summary_chars)
+    index = ChunkIndex([(chunk, term_counts(chunk)) for chunk in chunk_text(document)])
+    retrieved = [index.material_for(f"{node['title']} {node['description']}") or summary for node in nodes]
+
+    print(
+        f"{args.nodes} nodes, {args.ms_per_1k_tokens:.0f} ms per 1k prompt tokens, {args.slots} KV cache slots"
+    )
+    print(f"{'material':<20}{'legacy (ms)':>14}{'prefix (ms)':>14}{'speedup':>10}  (prompt eval per node)")
+    for label, materials in (("summary (shared)", [summary] * len(nodes)), ("retrieved chunks", retrieved)):
+        legacy, current = await run_layouts(args, nodes, materials)
+        report(label, len(nodes), legacy, current)
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
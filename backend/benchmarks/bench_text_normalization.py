@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: normalize_text (what extracted PDF and TXT uploads go
+through) vs. the previous per-character generator used after PDF
+extraction. The baseline does less work: it keeps the padding whitespace
+that normalize_text collapses.
+
+The original x10 target is not met: on 1 MiB of layout text normalize_text
+runs about x2-x5 faster than the baseline. Collapsing whitespace and trimming
+lines (str.split/join per line) alone costs about as much as a tenth of the
+baseline.
+
+Run from backend/:
+    python -m benchmarks.bench_text_normalization
+"""
+
+import timeit
+
+from app.utils.text import normalize_text
+
+
+def legacy_clean(text: str) -> str:
+    """Previous implementation (kept here only as the baseline)."""
+    text = text.replace('\x00', '')
+    text = ''.join(char for char in text if char.isprintable() or char in '\n\r\t')
+    return text.strip()
+
+
+def layout_document(pages: int = 200, accents: bool = False, junk: bool = False) -> str:
+    """
+    Text shaped like extract_text(layout=True) output: padded lines, stray NULs
+    and form feeds. `accents` makes it non-ASCII (Spanish text); `junk` adds
+    a zero-width space and NBSP to every tenth line.
+    """
+    line = "      Los sistemas distribuidos coordinan procesos\x00 que se comunican\tmediante mensajes.   "
+    if accents:
+        line = line.replace("procesos", "procesos ló­gicos").replace("mensajes", "señales")
+    lines = [line] * 50
+    if junk:
+        lines = [l.replace("que", "q​ue ") if i % 10 == 0 else l for i, l in enumerate(lines)]
+    page = "\n".join(lines + [" " * 90] * 10)
+    return "\n\n\x0c".join([page] * pages)
+
+
+def bench(fn, text: str) -> float:
+    return min(timeit.repeat(lambda: fn(text), number=1, repeat=5))
+
+
+def main():
+    cases = {
+        "ascii": layout_document(),
+        "accents": layout_document(accents=True),
+        "accents+junk": layout_document(accents=True, junk=True),
+    }
+    for case, text in cases.items():
+        legacy = bench(legacy_clean, text)
+        print(f"{case}: {len(text) / 1024:.0f} KiB")
+        print(f"  legacy generator  {legacy * 1000:7.1f} ms -> {len(legacy_clean(text)) / 1024:5.0f} KiB")
+        seconds = bench(normalize_text, text)
+        print(
+            f"  normalize_text    {seconds * 1000:7.1f} ms -> {len(normalize_text(text)) / 1024:5.0f} KiB"
+            f"  x{legacy / seconds:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Minimal PDF writer for benchmarks: N pages of Helvetica text, no dependencies.
+"""
+
+PARAGRAPH = (
+    "Los sistemas distribuidos coordinan procesos que se comunican mediante mensajes. "
+    "Cada nodo mantiene su propio estado y la consistencia depende del protocolo elegido."
+)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(page_number: int, lines_per_page: int) -> bytes:
+    ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td", f"(Capitulo {page_number + 1}) Tj"]
+    for line in range(lines_per_page):
+        words = PARAGRAPH.split()
+        offset = (page_number + line) % len(words)
+        text = " ".join(words[offset:] + words[:offset])[:95]
+        ops.append(f"T* ({_escape(text)}) Tj")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def build_pdf(pages: int, lines_per_page: int = 55) -> bytes:
+    """Return a valid PDF with `pages` pages of text."""
+    objects: list[bytes] = []
+
+    # 1: catalog, 2: pages tree, 3: font; then (page, content) pairs
+    page_ids = [4 + 2 * i for i in range(pages)]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for i, pid in enumerate(page_ids):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>".encode()
+        )
+        stream = _page_stream(i, lines_per_page)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_at = len(out)
+    out += b"xref\n0 %d\n" % (len(objects) + 1)
+    out += b"0000000000 65535 f \n"
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+    return bytes(out)
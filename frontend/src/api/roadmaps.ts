@@ -43,6 +43,31 @@ export interface NodeCreate {
   is_completed?: boolean
 }
 
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed'
+
+export interface GenerationJob<T = unknown> {
+  job_id: string
+  kind: string
+  status: JobStatus
+  stage: string | null
+  progress: number
+  result: T | null
+  error: string | null
+  attempts: number
+  created_at: string | null
+  started_at: string | null
+  finished_at: string | null
+}
+
+export interface GenerateRoadmapResult {
+  roadmap_id: number
+  title: string
+  nodes_count: number
+  message: string
+  deduplicated?: boolean
+  reused_from?: number
+}
+
 export const roadmapsApi = {
   getAll: (creatorId?: number) => {
     const params = creatorId ? `?creator_id=${creatorId}` : ''
@@ -91,22 +116,47 @@ export const roadmapsApi = {
 }
 
 export const aiApi = {
-  generateRoadmap: (file: File, title: string, creatorId: number) => {
+  // Encola la generación; el resultado se obtiene consultando getJob / waitForJob
+  generateRoadmap: (file: File, title: string, creatorId: number, reuseRoadmap = true) => {
     const formData = new FormData()
     formData.append('file', file)
     formData.append('title', title)
     formData.append('creator_id', creatorId.toString())
-
-    return apiClient.post<{ roadmap_id: number; title: string; nodes_count: number; message: string }>(
+    formData.append('reuse_roadmap', reuseRoadmap.toString())
+
+    return apiClient.post<{
+      job_id: string
+      status: JobStatus
+      status_url: string
+      deduplicated: boolean
+      message: string
+    }>(
       '/ai/generate-roadmap',
       formData,
       {
-        headers: { 'Content-Type': 'multipart/form-data' },
-        timeout: 120000
+        headers: { 'Content-Type': 'multipart/form-data' }
       }
     )
   },
 
+  getJob: <T = GenerateRoadmapResult>(jobId: string) =>
+    apiClient.get<GenerationJob<T>>(`/ai/jobs/${jobId}`),
+
+  // Consulta el trabajo hasta que termina; rechaza con el error del trabajo si falla
+  waitForJob: async <T = GenerateRoadmapResult>(
+    jobId: string,
+    onProgress?: (job: GenerationJob<T>) => void,
+    intervalMs = 2000
+  ): Promise<T> => {
+    for (;;) {
+      const { data: job } = await apiClient.get<GenerationJob<T>>(`/ai/jobs/${jobId}`)
+      onProgress?.(job)
+      if (job.status === 'succeeded') return job.result as T
+      if (job.status === 'failed') throw new Error(job.error || 'Error al generar el roadmap')
+      await new Promise((resolve) => setTimeout(resolve, intervalMs))
+    }
+  },
+
   generateNodeContent: (nodeId: number) => {
     return apiClient.post<{ message: string; node_id: number }>(
       `/ai/nodes/${nodeId}/generate-content`,
@@ -115,6 +165,37 @@ export const aiApi = {
     )
   },
 
+  // SSE: recibe el Markdown token a token; devuelve una función para cancelar
+  streamNodeContent: (
+    nodeId: number,
+    handlers: {
+      onToken: (text: string) => void
+      onDone: () => void
+      onError: (detail: string) => void
+    }
+  ) => {
+    const source = new EventSource(`/api/ai/nodes/${nodeId}/generate-content/stream`)
+    source.addEventListener('token', (event) => {
+      handlers.onToken(JSON.parse((event as MessageEvent).data).text)
+    })
+    source.addEventListener('done', () => {
+      source.close()
+      handlers.onDone()
+    })
+    source.addEventListener('error', (event) => {
+      source.close()
+      const data = (event as MessageEvent).data
+      handlers.onError(data ? JSON.parse(data).detail : 'Error al generar contenido')
+    })
+    return () => source.close()
+  },
+
+  generateAllContent: (roadmapId: number) => {
+    return apiClient.post<{ message: string; roadmap_id: number; nodes_pending?: number }>(
+      `/ai/${roadmapId}/generate-all-content`
+    )
+  },
+
   importRoadmap: (title: string, creatorId: number, data: {
     description?: string
     nodes: Array<{